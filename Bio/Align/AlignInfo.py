@@ -73,6 +73,7 @@ class SummaryInfo(object):
 
         # find the length of the consensus we are creating
         con_len = self.alignment.get_alignment_length()
+        column_counts = self._get_column_counts()
 
         # go through each seq item
         for n in range(con_len):
@@ -80,17 +81,23 @@ class SummaryInfo(object):
             atom_dict = {}
             num_atoms = 0
 
-            for record in self.alignment:
-                # make sure we haven't run past the end of any sequences
-                # if they are of different lengths
-                if n < len(record.seq):
-                    if record.seq[n] != '-' and record.seq[n] != '.':
-                        if record.seq[n] not in atom_dict:
-                            atom_dict[record.seq[n]] = 1
-                        else:
-                            atom_dict[record.seq[n]] += 1
-
-                        num_atoms = num_atoms + 1
+            if column_counts is not None:
+                for atom, count in column_counts[n].items():
+                    if atom != '-' and atom != '.':
+                        atom_dict[atom] = count
+                        num_atoms += count
+            else:
+                for record in self.alignment:
+                    # make sure we haven't run past the end of any sequences
+                    # if they are of different lengths
+                    if n < len(record.seq):
+                        if record.seq[n] != '-' and record.seq[n] != '.':
+                            if record.seq[n] not in atom_dict:
+                                atom_dict[record.seq[n]] = 1
+                            else:
+                                atom_dict[record.seq[n]] += 1
+
+                            num_atoms = num_atoms + 1
 
             max_atoms = []
             max_size = 0
@@ -131,6 +138,7 @@ class SummaryInfo(object):
 
         # find the length of the consensus we are creating
         con_len = self.alignment.get_alignment_length()
+        column_counts = self._get_column_counts()
 
         # go through each seq item
         for n in range(con_len):
@@ -138,16 +146,20 @@ class SummaryInfo(object):
             atom_dict = {}
             num_atoms = 0
 
-            for record in self.alignment:
-                # make sure we haven't run past the end of any sequences
-                # if they are of different lengths
-                if n < len(record.seq):
-                    if record.seq[n] not in atom_dict:
-                        atom_dict[record.seq[n]] = 1
-                    else:
-                        atom_dict[record.seq[n]] += 1
+            if column_counts is not None:
+                atom_dict = column_counts[n]
+                num_atoms = sum(atom_dict.values())
+            else:
+                for record in self.alignment:
+                    # make sure we haven't run past the end of any sequences
+                    # if they are of different lengths
+                    if n < len(record.seq):
+                        if record.seq[n] not in atom_dict:
+                            atom_dict[record.seq[n]] = 1
+                        else:
+                            atom_dict[record.seq[n]] += 1
 
-                    num_atoms += 1
+                        num_atoms += 1
 
             max_atoms = []
             max_size = 0
@@ -174,6 +186,17 @@ class SummaryInfo(object):
 
         return Seq(consensus, consensus_alpha)
 
+    def _get_column_counts(self):
+        """Return the letter counts for each column, if available (PRIVATE).
+
+        This uses the get_column_counts method of a MultipleSeqAlignment,
+        which can count all the rows at once using NumPy. For other
+        alignment objects this returns None.
+        """
+        if hasattr(self.alignment, "get_column_counts"):
+            return self.alignment.get_column_counts()
+        return None
+
     def _guess_consensus_alphabet(self, ambiguous):
         """Pick an (ungapped) alphabet for an alignment consesus sequence.
 
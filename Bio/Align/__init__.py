@@ -16,6 +16,7 @@ __docformat__ = "restructuredtext en"  # Don't just use plain text in epydoc API
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio import Alphabet
+from Bio._py3k import _as_bytes, _bytes_to_string
 
 # We only import this and subclass it for some limited backward compatibility.
 from Bio.Align.Generic import Alignment as _Alignment
@@ -108,6 +109,11 @@ class MultipleSeqAlignment(_Alignment):
     reference sequence with special status.
     """
 
+    # NumPy array of the letters, built on demand (see as_array). Declared
+    # here too for objects unpickled from older versions or made by
+    # subclasses which skip __init__.
+    _array = None
+
     def __init__(self, records, alphabet=None,
                  annotations=None):
         """Initialize a new MultipleSeqAlignment object.
@@ -170,6 +176,7 @@ class MultipleSeqAlignment(_Alignment):
             self._alphabet = Alphabet.single_letter_alphabet
 
         self._records = []
+        self._array = None
         if records:
             self.extend(records)
             if alphabet is None:
@@ -311,6 +318,7 @@ class MultipleSeqAlignment(_Alignment):
         if not Alphabet._check_type_compatible([self._alphabet, record.seq.alphabet]):
             raise ValueError("New sequence's alphabet is incompatible")
         self._records.append(record)
+        self._array = None
 
     def __add__(self, other):
         """Combines to alignments with the same number of rows by adding them.
@@ -391,7 +399,12 @@ class MultipleSeqAlignment(_Alignment):
         for k, v in self.annotations.items():
             if k in other.annotations and other.annotations[k] == v:
                 annotations[k] = v
-        return MultipleSeqAlignment(merged, alpha, annotations)
+        combined = MultipleSeqAlignment(merged, alpha, annotations)
+        if self._array is not None and other._array is not None:
+            import numpy
+            combined._array = numpy.hstack([self._array, other._array])
+            combined._array.flags.writeable = False
+        return combined
 
     def __getitem__(self, index):
         """Access part of the alignment.
@@ -504,6 +517,10 @@ class MultipleSeqAlignment(_Alignment):
 
         This should all seem familiar to anyone who has used the NumPy
         array or matrix objects.
+
+        If the NumPy array of the alignment has been built (see the as_array
+        method), columns are taken from the array rather than from each row
+        in turn, and sub-alignments share the relevant part of the array.
         """
         if isinstance(index, int):
             # e.g. result = align[x]
@@ -511,7 +528,10 @@ class MultipleSeqAlignment(_Alignment):
             return self._records[index]
         elif isinstance(index, slice):
             # e.g. sub_align = align[i:j:k]
-            return MultipleSeqAlignment(self._records[index], self._alphabet)
+            sub_align = MultipleSeqAlignment(self._records[index], self._alphabet)
+            if self._array is not None:
+                sub_align._array = self._array[index]
+            return sub_align
         elif len(index) != 2:
             raise TypeError("Invalid index type.")
 
@@ -522,11 +542,16 @@ class MultipleSeqAlignment(_Alignment):
             return self._records[row_index][col_index]
         elif isinstance(col_index, int):
             # e.g. col_or_part_col = align[1:5, 6], gives a string
+            if self._array is not None:
+                return _bytes_to_string(self._array[row_index, col_index].tobytes())
             return "".join(rec[col_index] for rec in self._records[row_index])
         else:
             # e.g. sub_align = align[1:4, 5:7], gives another alignment
-            return MultipleSeqAlignment((rec[col_index] for rec in self._records[row_index]),
-                                        self._alphabet)
+            sub_align = MultipleSeqAlignment((rec[col_index] for rec in self._records[row_index]),
+                                             self._alphabet)
+            if self._array is not None:
+                sub_align._array = self._array[row_index, col_index]
+            return sub_align
 
     def sort(self, key=None, reverse=False):
         """Sort the rows (SeqRecord objects) of the alignment in place.
@@ -605,6 +630,151 @@ class MultipleSeqAlignment(_Alignment):
             self._records.sort(key=lambda r: r.id, reverse=reverse)
         else:
             self._records.sort(key=key, reverse=reverse)
+        self._array = None
+
+    def __getstate__(self):
+        """Return the state for pickling, without the NumPy array (PRIVATE).
+
+        The array is rebuilt if needed after unpickling, which keeps the
+        pickle small and loadable without NumPy.
+        """
+        state = self.__dict__.copy()
+        state.pop("_array", None)
+        return state
+
+    def as_array(self):
+        """Return the alignment letters as a 2D NumPy array of bytes.
+
+        The array has one row per sequence and one column per alignment
+        column, holding the ASCII code of each letter (NumPy dtype uint8).
+        This requires NumPy. The array is built when this method is first
+        called, and then kept until rows are added or the rows are sorted.
+        While it is kept, taking a column or a slice of columns uses the
+        array, and the get_column_counts and remove_gap_columns methods work
+        on it rather than building a temporary array of their own.
+
+        The array is read only. Note that if you modify the SeqRecord objects
+        of the alignment in place (e.g. replacing the sequence of a row), the
+        array will not reflect this.
+        """
+        if self._array is None:
+            try:
+                import numpy
+            except ImportError:
+                from Bio import MissingPythonDependencyError
+                raise MissingPythonDependencyError(
+                    "Install NumPy if you want to use as_array")
+            self._array = self._build_array(numpy)
+        return self._array
+
+    def _build_array(self, numpy):
+        """Return a new read only NumPy array of the letters (PRIVATE)."""
+        length = self.get_alignment_length()
+        data = _as_bytes("".join(str(rec.seq) for rec in self._records))
+        if len(data) != len(self._records) * length:
+            raise ValueError("Sequences must all be the same length")
+        array = numpy.frombuffer(data, dtype=numpy.uint8)
+        return array.reshape((len(self._records), length))
+
+    def _array_or_none(self):
+        """Return a NumPy array of the alignment, or None without NumPy (PRIVATE).
+
+        This uses the array kept by as_array if there is one, otherwise it
+        builds a temporary array which is not kept (so later changes to the
+        rows are not hidden by it).
+        """
+        if self._array is not None:
+            return self._array
+        try:
+            import numpy
+        except ImportError:
+            return None
+        return self._build_array(numpy)
+
+    def get_column_counts(self):
+        """Return a list of the letter counts in each column of the alignment.
+
+        Each column gives a dictionary mapping the letters (including any
+        gap characters) to the number of times they occur in that column:
+
+        >>> from Bio.Alphabet import generic_dna
+        >>> from Bio.Seq import Seq
+        >>> from Bio.SeqRecord import SeqRecord
+        >>> from Bio.Align import MultipleSeqAlignment
+        >>> a = SeqRecord(Seq("AAAACGT", generic_dna), id="Alpha")
+        >>> b = SeqRecord(Seq("AAA-CGT", generic_dna), id="Beta")
+        >>> c = SeqRecord(Seq("AAAAGGT", generic_dna), id="Gamma")
+        >>> align = MultipleSeqAlignment([a, b, c])
+        >>> counts = align.get_column_counts()
+        >>> len(counts)
+        7
+        >>> sorted(counts[3].items())
+        [('-', 1), ('A', 2)]
+
+        If NumPy is installed, the counts are taken from an array of the
+        alignment (see the as_array method), one letter at a time.
+        """
+        array = self._array_or_none()
+        if array is None:
+            columns = zip(*[str(rec.seq) for rec in self._records])
+            return [_count_letters(column) for column in columns]
+        import numpy
+        counts = [{} for col in range(array.shape[1])]
+        for code in numpy.unique(array):
+            letter = chr(code)
+            totals = (array == code).sum(axis=0)
+            for col in numpy.flatnonzero(totals):
+                counts[col][letter] = int(totals[col])
+        return counts
+
+    def remove_gap_columns(self, gap_char="-"):
+        """Return a copy of the alignment without the columns of only gaps.
+
+        This is useful after taking some of the rows of a larger alignment,
+        for example:
+
+        >>> from Bio.Alphabet import generic_dna
+        >>> from Bio.Seq import Seq
+        >>> from Bio.SeqRecord import SeqRecord
+        >>> from Bio.Align import MultipleSeqAlignment
+        >>> a = SeqRecord(Seq("AAAACGT", generic_dna), id="Alpha")
+        >>> b = SeqRecord(Seq("AA--CG-", generic_dna), id="Beta")
+        >>> c = SeqRecord(Seq("AA--GG-", generic_dna), id="Gamma")
+        >>> align = MultipleSeqAlignment([a, b, c])
+        >>> print(align[1:].remove_gap_columns())
+        DNAAlphabet() alignment with 2 rows and 4 columns
+        AACG Beta
+        AAGG Gamma
+
+        Each row is made by adding slices of the original SeqRecord, so the
+        annotation is handled as for the addition of two alignments.
+        If NumPy is installed, the gap columns are found using an array of
+        the alignment (see the as_array method).
+        """
+        if not self._records:
+            return self[:]
+        array = self._array_or_none()
+        if array is None:
+            columns = zip(*[str(rec.seq) for rec in self._records])
+            keep = [set(column) != set([gap_char]) for column in columns]
+        else:
+            keep = (array != ord(gap_char)).any(axis=0).tolist()
+        # Add up the runs of columns to keep
+        blocks = []
+        start = None
+        for col, wanted in enumerate(keep + [False]):
+            if wanted and start is None:
+                start = col
+            elif not wanted and start is not None:
+                blocks.append(self[:, start:col])
+                start = None
+        if not blocks:
+            return self[:, 0:0]
+        result = blocks[0]
+        for block in blocks[1:]:
+            result += block
+        result.annotations = self.annotations.copy()
+        return result
 
     def get_column(self, col):
         """Returns a string containing a given column (DEPRECATED).
@@ -617,6 +787,8 @@ class MultipleSeqAlignment(_Alignment):
         import warnings
         import Bio
         warnings.warn("This method is deprecated and is provided for backwards compatibility with the old Bio.Align.Generic.Alignment object. Please use the slice notation instead, as get_column is likely to be removed in a future release of Biopython.", Bio.BiopythonDeprecationWarning)
+        if self._array is not None:
+            return self[:, col]
         return _Alignment.get_column(self, col)
 
     def add_sequence(self, descriptor, sequence, start=None, end=None,
@@ -643,6 +815,14 @@ class MultipleSeqAlignment(_Alignment):
                               id=descriptor, description=descriptor))
 
 
+def _count_letters(letters):
+    """Return a dictionary of the number of times each letter occurs (PRIVATE)."""
+    counts = {}
+    for letter in letters:
+        counts[letter] = counts.get(letter, 0) + 1
+    return counts
+
+
 if __name__ == "__main__":
     from Bio._utils import run_doctest
     run_doctest()
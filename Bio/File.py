@@ -24,6 +24,7 @@ import os
 import sys
 import contextlib
 import itertools
+from array import array
 
 from Bio._py3k import basestring
 
@@ -234,6 +235,283 @@ class _IndexedSeqFileProxy(object):
         raise NotImplementedError("Not available for this file format.")
 
 
+def _file_signature(filename):
+    """Return the size, modification time and a content hash of a file (PRIVATE).
+
+    Used to spot if a file has changed since a cached index was made. To
+    keep this fast on very large files, the MD5 hash covers the file size
+    and the first and last megabyte of data only (or the whole file if it
+    is small).
+    """
+    import hashlib
+    sample = 1024 * 1024
+    size = os.path.getsize(filename)
+    mtime = repr(os.path.getmtime(filename))
+    md5 = hashlib.md5(str(size).encode("ascii"))
+    with open(filename, "rb") as handle:
+        md5.update(handle.read(sample))
+        if size > sample:
+            handle.seek(max(sample, size - sample))
+            md5.update(handle.read(sample))
+    return str(size), mtime, md5.hexdigest()
+
+
+def _load_offset_cache(cache_filename, format, signature):
+    """Iterate over the (key, offset, length) tuples in a cached index (PRIVATE).
+
+    Returns None if the cache does not exist, was left unfinished, or was
+    made for a different format or a different version of the file (in
+    which case it can be replaced). Raises a ValueError if the file exists
+    but is not an index cache, including SQLite files such as those from
+    the index_db function, so these are never overwritten.
+    """
+    if not os.path.isfile(cache_filename):
+        return None
+    con = _sqlite.connect(cache_filename)
+    try:
+        meta_data = dict(con.execute("SELECT key, value FROM meta_data;"))
+    except _sqlite.DatabaseError as err:
+        con.close()
+        raise ValueError("Not a Biopython index cache? %s" % err)
+    if meta_data.get("offset_cache") != "1":
+        con.close()
+        raise ValueError("Not a Biopython index cache (perhaps an index_db "
+                         "database?): %r" % cache_filename)
+    if meta_data.get("format") != format \
+            or meta_data.get("count", "-1") == "-1" \
+            or (meta_data.get("size"), meta_data.get("mtime"),
+                meta_data.get("hash")) != signature:
+        con.close()
+        return None
+
+    def offsets():
+        """Iterate over cached offsets, then close the database (PRIVATE)."""
+        try:
+            for row in con.execute("SELECT key, offset, length "
+                                   "FROM offset_data ORDER BY rowid;"):
+                yield row
+        finally:
+            con.close()
+    return offsets()
+
+
+def _cached_offsets(random_access_proxy, cache_filename):
+    """Iterate over (key, offset, length) tuples, using an index cache (PRIVATE).
+
+    If the SQLite cache file is present and up to date, the offsets are
+    read from it. Otherwise the file is scanned using the proxy as usual,
+    and the offsets are recorded in a temporary file which replaces the
+    cache once the scan is complete (so an interrupted scan, or one which
+    found duplicate keys, never leaves a partial cache behind). Only a file
+    marked as an index cache (by an "offset_cache" entry in its meta_data
+    table) is ever replaced.
+
+    The raw record identifiers are cached (not any keys from a key
+    function), so one cache can be used with different key functions.
+    """
+    if not _sqlite:
+        # Hack for Jython (of if Python is compiled without it)
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError("Requires sqlite3, which is "
+                                           "included Python 2.5+")
+    filename = random_access_proxy._filename
+    format = random_access_proxy._format
+    signature = _file_signature(filename)
+    offsets = _load_offset_cache(cache_filename, format, signature)
+    if offsets is not None:
+        for entry in offsets:
+            yield entry
+        return
+
+    tmp_filename = "%s.%i.tmp" % (cache_filename, os.getpid())
+    try:
+        con = _sqlite.connect(tmp_filename)
+        con.execute("PRAGMA synchronous=OFF")
+        con.execute("CREATE TABLE meta_data (key TEXT, value TEXT);")
+        con.executemany("INSERT INTO meta_data (key, value) VALUES (?,?);",
+                        [("offset_cache", "1"),
+                         ("count", -1), ("format", format),
+                         ("size", signature[0]), ("mtime", signature[1]),
+                         ("hash", signature[2])])
+        con.execute("CREATE TABLE offset_data "
+                    "(key TEXT, offset INTEGER, length INTEGER);")
+    except (_sqlite.Error, IOError, OSError) as err:
+        import warnings
+        from Bio import BiopythonWarning
+        warnings.warn("Could not create index cache %r: %s"
+                      % (cache_filename, err), BiopythonWarning)
+        for entry in random_access_proxy:
+            yield entry
+        return
+
+    finished = False
+    try:
+        count = 0
+        batch = []
+        for entry in random_access_proxy:
+            yield entry
+            batch.append(entry)
+            if len(batch) >= 1000:
+                con.executemany("INSERT INTO offset_data (key, offset, length) "
+                                "VALUES (?,?,?);", batch)
+                count += len(batch)
+                batch = []
+        con.executemany("INSERT INTO offset_data (key, offset, length) "
+                        "VALUES (?,?,?);", batch)
+        count += len(batch)
+        con.execute("UPDATE meta_data SET value = ? WHERE key = ?;",
+                    (count, "count"))
+        con.commit()
+        con.close()
+        if os.path.isfile(cache_filename):
+            # Can't rename over an existing file on Windows
+            os.remove(cache_filename)
+        os.rename(tmp_filename, cache_filename)
+        finished = True
+    finally:
+        if not finished:
+            con.close()
+            if os.path.isfile(tmp_filename):
+                os.remove(tmp_filename)
+
+
+try:
+    array("Q")
+    _offset_typecode = "Q"
+except ValueError:
+    # Python 2 lacks unsigned long long arrays, but on most 64 bit
+    # platforms unsigned long is 64 bits too
+    _offset_typecode = "L"
+
+
+class _CompactOffsets(object):
+    """Memory efficient mapping of string keys to file offsets (PRIVATE).
+
+    Used by _IndexedSeqFileDict in place of a Python dictionary when
+    indexing a very large number of records. Rather than a separate
+    string object per key (plus the dictionary's own overhead), the keys
+    are packed end to end in a single bytearray, with the key end points
+    and the offsets held in arrays of 64 bit integers. Lookups use an open
+    addressing hash table holding 32 bit entry numbers. This comes to
+    about 25 bytes per record plus the key itself, compared to about 150
+    bytes for a dictionary of short strings.
+
+    Only string keys are supported. The keys are kept in insertion order.
+    """
+    def __init__(self):
+        self._arena = bytearray()
+        self._ends = array(_offset_typecode)
+        self._values = array(_offset_typecode)
+        # Hash table of entry number plus one, with zero for an empty slot
+        self._table = array("i", [0]) * 8
+        self._mask = 7
+
+    if sys.version_info[0] >= 3:
+        def _encode(self, key):
+            """Turn a string key into bytes (PRIVATE)."""
+            if not isinstance(key, str):
+                raise TypeError("Compact key storage needs string keys, "
+                                "not %r" % (key,))
+            return key.encode("utf-8")
+
+        def _decode(self, data):
+            """Turn bytes back into a string key (PRIVATE)."""
+            return data.decode("utf-8")
+    else:
+        def _encode(self, key):
+            """Check the key is a (byte) string (PRIVATE)."""
+            if not isinstance(key, str):
+                raise TypeError("Compact key storage needs string keys, "
+                                "not %r" % (key,))
+            return key
+
+        def _decode(self, data):
+            """Turn a bytearray slice back into a string key (PRIVATE)."""
+            return str(data)
+
+    def _find(self, data):
+        """Return the hash table slot and entry number for a key (PRIVATE).
+
+        If the key is not present, the entry number is -1 and the slot is
+        the empty one where it would be added.
+        """
+        table = self._table
+        mask = self._mask
+        arena = self._arena
+        ends = self._ends
+        i = hash(data) & mask
+        while True:
+            entry = table[i]
+            if not entry:
+                return i, -1
+            entry -= 1
+            if entry:
+                start = ends[entry - 1]
+            else:
+                start = 0
+            if arena[start:ends[entry]] == data:
+                return i, entry
+            i = (i + 1) & mask
+
+    def _resize(self, size):
+        """Rebuild the hash table with the given number of slots (PRIVATE)."""
+        table = array("i", [0]) * size
+        mask = size - 1
+        arena = self._arena
+        start = 0
+        for entry, end in enumerate(self._ends):
+            i = hash(bytes(arena[start:end])) & mask
+            while table[i]:
+                i = (i + 1) & mask
+            table[i] = entry + 1
+            start = end
+        self._table = table
+        self._mask = mask
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        try:
+            return self._find(self._encode(key))[1] != -1
+        except TypeError:
+            return False
+
+    def __getitem__(self, key):
+        try:
+            data = self._encode(key)
+        except TypeError:
+            raise KeyError(key)
+        entry = self._find(data)[1]
+        if entry == -1:
+            raise KeyError(key)
+        return self._values[entry]
+
+    def __setitem__(self, key, offset):
+        data = self._encode(key)
+        slot, entry = self._find(data)
+        if entry != -1:
+            self._values[entry] = offset
+            return
+        if len(self._values) >= 2147483646:
+            raise ValueError("Too many keys for compact key storage")
+        self._arena.extend(data)
+        self._ends.append(len(self._arena))
+        self._values.append(offset)
+        self._table[slot] = len(self._values)
+        # Keep the load factor below two thirds
+        if 3 * len(self._values) >= 2 * len(self._table):
+            self._resize(2 * len(self._table))
+
+    def __iter__(self):
+        arena = self._arena
+        decode = self._decode
+        start = 0
+        for end in self._ends:
+            yield decode(arena[start:end])
+            start = end
+
+
 class _IndexedSeqFileDict(_dict_base):
     """Read only dictionary interface to a sequential record file.
 
@@ -257,20 +535,35 @@ class _IndexedSeqFileDict(_dict_base):
 
     Note that this dictionary is essentially read only. You cannot
     add or change values, pop values, nor clear the dictionary.
+
+    If given a cache_filename, the offsets are loaded from (or saved to)
+    an SQLite file there, rather than scanning the file every time. This
+    requires the proxy to record its _filename and _format.
+
+    With compact=True, the keys (which must then be strings) and offsets
+    are held in a _CompactOffsets object rather than a dictionary. This
+    needs far less memory, at the cost of slower indexing and lookups.
     """
     def __init__(self, random_access_proxy, key_function,
-                 repr, obj_repr):
+                 repr, obj_repr, cache_filename=None, compact=False):
         # Use key_function=None for default value
         self._proxy = random_access_proxy
         self._key_function = key_function
         self._repr = repr
         self._obj_repr = obj_repr
+        if cache_filename:
+            raw_iter = _cached_offsets(random_access_proxy, cache_filename)
+        else:
+            raw_iter = random_access_proxy
         if key_function:
             offset_iter = (
-                (key_function(k), o, l) for (k, o, l) in random_access_proxy)
+                (key_function(k), o, l) for (k, o, l) in raw_iter)
+        else:
+            offset_iter = raw_iter
+        if compact:
+            offsets = _CompactOffsets()
         else:
-            offset_iter = random_access_proxy
-        offsets = {}
+            offsets = {}
         for key, offset, length in offset_iter:
             # Note - we don't store the length because I want to minimise the
             # memory requirements. With the SQLite backend the length is kept
@@ -282,6 +575,9 @@ class _IndexedSeqFileDict(_dict_base):
             #       "%s at offset %i given length %r (%s format %s)" \
             #       % (key, offset, length, filename, format)
             if key in offsets:
+                if cache_filename:
+                    # Discard the partial cache
+                    raw_iter.close()
                 self._proxy._handle.close()
                 raise ValueError("Duplicate key '%s'" % key)
             else:
@@ -383,6 +679,72 @@ class _IndexedSeqFileDict(_dict_base):
         # Pass the offset to the proxy
         return self._proxy.get_raw(self._offsets[key])
 
+    def get_many(self, keys, file_order=False):
+        """Iterate over (key, record) pairs for the given keys.
+
+        This is faster than looking up each key in turn, as the records are
+        read in batches sorted by their position in the file, so the disk
+        is read sequentially. By default the pairs are returned in the same
+        order as the keys, but with file_order=True they are returned in
+        the order they appear in the file(s).
+
+        If any key is not found, a KeyError exception is raised.
+        """
+        return self._get_many(keys, file_order, self._fetch)
+
+    def get_raw_many(self, keys, file_order=False):
+        """Iterate over (key, raw record) pairs for the given keys.
+
+        This is the batched equivalent of the get_raw method, see the
+        get_many method for details.
+
+        NOTE - This functionality is not supported for every file format.
+        """
+        return self._get_many(keys, file_order, self._fetch_raw)
+
+    def _locate_many(self, keys):
+        """Return a (file number, offset, length, key) tuple per key (PRIVATE)."""
+        offsets = self._offsets
+        return [(0, offsets[key], None, key) for key in keys]
+
+    def _fetch(self, key, file_number, offset, length):
+        """Parse the record at the given location, checking the key (PRIVATE)."""
+        record = self._proxy.get(offset)
+        if self._key_function:
+            key2 = self._key_function(record.id)
+        else:
+            key2 = record.id
+        if key != key2:
+            raise ValueError("Key did not match (%s vs %s)" % (key, key2))
+        return record
+
+    def _fetch_raw(self, key, file_number, offset, length):
+        """Return the raw record at the given location (PRIVATE)."""
+        return self._proxy.get_raw(offset)
+
+    def _get_many(self, keys, file_order, fetch):
+        """Iterate over (key, object) pairs using the fetch method (PRIVATE)."""
+        def position(location):
+            # Sort on file and offset only, the keys may not be comparable
+            return location[:2]
+        if file_order:
+            for location in sorted(self._locate_many(keys), key=position):
+                yield location[3], fetch(location[3], *location[:3])
+            return
+        keys = iter(keys)
+        while True:
+            # Read each batch in file order, then return in request order
+            batch = list(itertools.islice(keys, 10000))
+            if not batch:
+                break
+            locations = self._locate_many(batch)
+            results = [None] * len(batch)
+            for i in sorted(range(len(batch)),
+                            key=lambda i: position(locations[i])):
+                results[i] = fetch(batch[i], *locations[i][:3])
+            for key, result in zip(batch, results):
+                yield key, result
+
     def __setitem__(self, key, value):
         """Would allow setting or replacing records, but not implemented."""
         raise NotImplementedError("An indexed a sequence file is read only.")
@@ -424,6 +786,29 @@ class _IndexedSeqFileDict(_dict_base):
         self._proxy._handle.close()
 
 
+def _scan_in_pool(scan_function, filenames, workers):
+    """Iterate over scan_function(filename) results from a process pool (PRIVATE).
+
+    The results (lists of (key, offset, length) tuples) are returned in the
+    same order as the filenames. Only a limited number of files are scanned
+    ahead of the caller to bound the memory used.
+    """
+    import multiprocessing
+    from collections import deque
+    pool = multiprocessing.Pool(workers)
+    try:
+        pending = deque()
+        for filename in filenames:
+            pending.append(pool.apply_async(scan_function, (filename,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
 class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
     """Read only dictionary interface to many sequential record files.
 
@@ -437,10 +822,18 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
     There are OS limits on the number of files that can be open at once,
     so a pool are kept. If a record is required from a closed file, then
     one of the open handles is closed first.
+
+    When building a new index, the files can be scanned in parallel by a
+    pool of worker processes if given a picklable scan_function which maps
+    a filename to a list of (key, offset, length) tuples. The offsets are
+    still written to the database by this process only. The optional
+    progress callback is called after each file is added, with the number
+    of files done, the total number of files, and the number of records.
     """
     def __init__(self, index_filename, filenames,
                  proxy_factory, format,
-                 key_function, repr, max_open=10):
+                 key_function, repr, max_open=10,
+                 scan_function=None, workers=None, progress=None):
         """Loads or creates an SQLite based index."""
         # TODO? - Don't keep filename list in memory (just in DB)?
         # Should save a chunk of memory if dealing with 1000s of files.
@@ -464,6 +857,9 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         self._repr = repr
         self._max_open = max_open
         self._proxies = {}
+        self._scan_function = scan_function
+        self._workers = workers
+        self._progress = progress
 
         # Note if using SQLite :memory: trick index filename, this will
         # give $PWD as the relative path (which is fine).
@@ -567,6 +963,12 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         proxy_factory = self._proxy_factory
         max_open = self._max_open
         random_access_proxies = self._proxies
+        progress = self._progress
+        if self._scan_function and self._workers and self._workers > 1:
+            scans = _scan_in_pool(self._scan_function, filenames,
+                                  self._workers)
+        else:
+            scans = None
 
         if not format or not filenames:
             raise ValueError("Filenames to index and format required to build %r" % index_filename)
@@ -595,47 +997,63 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             "CREATE TABLE file_data (file_number INTEGER, name TEXT);")
         con.execute("CREATE TABLE offset_data (key TEXT, file_number INTEGER, offset INTEGER, length INTEGER);")
         count = 0
-        for i, filename in enumerate(filenames):
-            # Default to storing as an absolute path,
-            f = os.path.abspath(filename)
-            if not os.path.isabs(filename) and not os.path.isabs(index_filename):
-                # Since user gave BOTH filename & index as relative paths,
-                # we will store this relative to the index file even though
-                # if it may now start ../ (meaning up a level)
-                # Note for cross platform use (e.g. shared data drive over SAMBA),
-                # convert any Windows slash into Unix style / for relative paths.
-                f = os.path.relpath(filename, relative_path).replace(os.path.sep, "/")
-            elif (os.path.dirname(os.path.abspath(filename)) + os.path.sep).startswith(relative_path + os.path.sep):
-                # Since sequence file is in same directory or sub directory,
-                # might as well make this into a relative path:
-                f = os.path.relpath(filename, relative_path).replace(os.path.sep, "/")
-                assert not f.startswith("../"), f
-            # print("DEBUG - storing %r as [%r] %r" % (filename, relative_path, f))
-            con.execute(
-                "INSERT INTO file_data (file_number, name) VALUES (?,?);",
-                (i, f))
-            random_access_proxy = proxy_factory(format, filename)
-            if key_function:
-                offset_iter = ((key_function(k), i, o, l)
-                               for (k, o, l) in random_access_proxy)
-            else:
-                offset_iter = ((k, i, o, l)
-                               for (k, o, l) in random_access_proxy)
-            while True:
-                batch = list(itertools.islice(offset_iter, 100))
-                if not batch:
-                    break
-                # print("Inserting batch of %i offsets, %s ... %s"
-                #       % (len(batch), batch[0][0], batch[-1][0]))
-                con.executemany(
-                    "INSERT INTO offset_data (key,file_number,offset,length) VALUES (?,?,?,?);",
-                    batch)
+        try:
+            for i, filename in enumerate(filenames):
+                # Default to storing as an absolute path,
+                f = os.path.abspath(filename)
+                if not os.path.isabs(filename) and not os.path.isabs(index_filename):
+                    # Since user gave BOTH filename & index as relative paths,
+                    # we will store this relative to the index file even though
+                    # if it may now start ../ (meaning up a level)
+                    # Note for cross platform use (e.g. shared data drive over SAMBA),
+                    # convert any Windows slash into Unix style / for relative paths.
+                    f = os.path.relpath(filename, relative_path).replace(os.path.sep, "/")
+                elif (os.path.dirname(os.path.abspath(filename)) + os.path.sep).startswith(relative_path + os.path.sep):
+                    # Since sequence file is in same directory or sub directory,
+                    # might as well make this into a relative path:
+                    f = os.path.relpath(filename, relative_path).replace(os.path.sep, "/")
+                    assert not f.startswith("../"), f
+                # print("DEBUG - storing %r as [%r] %r" % (filename, relative_path, f))
+                con.execute(
+                    "INSERT INTO file_data (file_number, name) VALUES (?,?);",
+                    (i, f))
+                if scans is None:
+                    random_access_proxy = proxy_factory(format, filename)
+                    raw_iter = random_access_proxy
+                else:
+                    # Already scanned in a worker process, will open the
+                    # file later if a record is requested from it
+                    random_access_proxy = None
+                    raw_iter = next(scans)
+                if key_function:
+                    offset_iter = ((key_function(k), i, o, l)
+                                   for (k, o, l) in raw_iter)
+                else:
+                    offset_iter = ((k, i, o, l)
+                                   for (k, o, l) in raw_iter)
+                while True:
+                    batch = list(itertools.islice(offset_iter, 10000))
+                    if not batch:
+                        break
+                    # print("Inserting batch of %i offsets, %s ... %s"
+                    #       % (len(batch), batch[0][0], batch[-1][0]))
+                    con.executemany(
+                        "INSERT INTO offset_data (key,file_number,offset,length) VALUES (?,?,?,?);",
+                        batch)
+                    count += len(batch)
+                # One transaction per file
                 con.commit()
-                count += len(batch)
-            if len(random_access_proxies) < max_open:
-                random_access_proxies[i] = random_access_proxy
-            else:
-                random_access_proxy._handle.close()
+                if random_access_proxy is not None:
+                    if len(random_access_proxies) < max_open:
+                        random_access_proxies[i] = random_access_proxy
+                    else:
+                        random_access_proxy._handle.close()
+                if progress:
+                    progress(i + 1, len(filenames), count)
+        finally:
+            if scans is not None:
+                # Stop the worker processes
+                scans.close()
         self._length = count
         # print("About to index %i entries" % count)
         try:
@@ -755,6 +1173,57 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             else:
                 return proxy.get_raw(offset)
 
+    def _get_proxy(self, file_number):
+        """Return the proxy for a file, opening it if needed (PRIVATE)."""
+        proxies = self._proxies
+        if file_number in proxies:
+            return proxies[file_number]
+        if len(proxies) >= self._max_open:
+            # Close an old handle...
+            proxies.popitem()[1]._handle.close()
+        # Open a new handle...
+        proxy = self._proxy_factory(self._format, self._filenames[file_number])
+        proxies[file_number] = proxy
+        return proxy
+
+    def _locate_many(self, keys):
+        """Return a (file number, offset, length, key) tuple per key (PRIVATE).
+
+        Uses one SQL query per batch of keys.
+        """
+        keys = list(keys)
+        locations = {}
+        unique_keys = list(set(keys))
+        # Keep below the SQLite default limit of 999 parameters
+        for i in range(0, len(unique_keys), 500):
+            batch = unique_keys[i:i + 500]
+            for key, file_number, offset, length in self._con.execute(
+                    "SELECT key, file_number, offset, length FROM offset_data "
+                    "WHERE key IN (%s);" % ",".join("?" * len(batch)), batch):
+                locations[key] = (file_number, offset, length, key)
+        return [locations[key] for key in keys]
+
+    def _fetch(self, key, file_number, offset, length):
+        """Parse the record at the given location, checking the key (PRIVATE)."""
+        record = self._get_proxy(file_number).get(offset)
+        if self._key_function:
+            key2 = self._key_function(record.id)
+        else:
+            key2 = record.id
+        if key != key2:
+            raise ValueError("Key did not match (%s vs %s)" % (key, key2))
+        return record
+
+    def _fetch_raw(self, key, file_number, offset, length):
+        """Return the raw record at the given location (PRIVATE)."""
+        proxy = self._get_proxy(file_number)
+        if length:
+            # Shortcut if we have the length
+            h = proxy._handle
+            h.seek(offset)
+            return h.read(length)
+        return proxy.get_raw(offset)
+
     def close(self):
         """Close any open file handles."""
         proxies = self._proxies
@@ -332,8 +332,12 @@ class InsdcScanner(object):
             raise ValueError("Problem with '%s' feature:\n%s"
                              % (feature_key, "\n".join(lines)))
 
-    def parse_footer(self):
-        """returns a tuple containing a list of any misc strings, and the sequence"""
+    def parse_footer(self, skip=False):
+        """returns a tuple containing a list of any misc strings, and the sequence
+
+        If skip is True, the sequence lines are scanned over without being
+        stored, and the sequence length is returned instead of the sequence.
+        """
         # This is a basic bit of code to scan and discard the sequence,
         # which was useful when developing the sub classes.
         if self.line in self.FEATURE_END_MARKERS:
@@ -353,6 +357,8 @@ class InsdcScanner(object):
             if line == "//":
                 break
         self.line = line
+        if skip:
+            return ([], 0)  # Dummy values!
         return ([], "")  # Dummy values!
 
     def _feed_first_line(self, consumer, line):
@@ -397,7 +403,7 @@ class InsdcScanner(object):
         """
         pass
 
-    def feed(self, handle, consumer, do_features=True):
+    def feed(self, handle, consumer, do_features=True, do_sequence=True):
         """Feed a set of data into the consumer.
 
         This method is intended for use with the "old" code in Bio.GenBank
@@ -408,6 +414,9 @@ class InsdcScanner(object):
             - consumer - The consumer that should be informed of events.
             - do_features - Boolean, should the features be parsed?
                           Skipping the features can be much faster.
+            - do_sequence - Boolean, should the sequence be parsed?
+                          Skipping the sequence can be much faster, and
+                          only its length is given to the consumer.
 
         Return values:
 
@@ -437,10 +446,17 @@ class InsdcScanner(object):
             self.parse_features(skip=True)  # ignore the data
 
         # Footer and sequence
-        misc_lines, sequence_string = self.parse_footer()
-        self._feed_misc_lines(consumer, misc_lines)
-
-        consumer.sequence(sequence_string)
+        if do_sequence:
+            misc_lines, sequence_string = self.parse_footer()
+            self._feed_misc_lines(consumer, misc_lines)
+            consumer.sequence(sequence_string)
+        else:
+            misc_lines, sequence_length = self.parse_footer(skip=True)
+            self._feed_misc_lines(consumer, misc_lines)
+            if sequence_length:
+                # Use the length found rather than any length given in
+                # the header, as the full parser would do
+                consumer.size(str(sequence_length))
         # Calls to consumer.base_number() do nothing anyway
         consumer.record_end("//")
 
@@ -449,9 +465,12 @@ class InsdcScanner(object):
         # And we are done
         return True
 
-    def parse(self, handle, do_features=True):
+    def parse(self, handle, do_features=True, do_sequence=True):
         """Returns a SeqRecord (with SeqFeatures if do_features=True)
 
+        If do_sequence=False, the sequence lines are skipped over and the
+        record's sequence is an UnknownSeq of the correct length.
+
         See also the method parse_records() for use on multi-record files.
         """
         from Bio.GenBank import _FeatureConsumer
@@ -460,23 +479,31 @@ class InsdcScanner(object):
         consumer = _FeatureConsumer(use_fuzziness=1,
                                     feature_cleaner=FeatureValueCleaner())
 
-        if self.feed(handle, consumer, do_features):
+        if self.feed(handle, consumer, do_features, do_sequence):
             return consumer.data
         else:
             return None
 
-    def parse_records(self, handle, do_features=True):
+    def parse_records(self, handle, do_features=True, do_sequence=True):
         """Returns a SeqRecord object iterator
 
         Each record (from the ID/LOCUS line to the // line) becomes a SeqRecord
 
         The SeqRecord objects include SeqFeatures if do_features=True
 
+        If do_sequence=False, the sequence lines are skipped over and each
+        record's sequence is an UnknownSeq of the correct length. This is
+        useful when only the annotation is wanted, as it saves the time
+        and memory needed to load the sequences. The sequence length is
+        taken from the base numbering on the last sequence line. Note that
+        for records with an RNA molecule type, the alphabet cannot be
+        corrected to DNA based on the sequence letters.
+
         This method is intended for use in Bio.SeqIO
         """
         # This is a generator function
         while True:
-            record = self.parse(handle, do_features)
+            record = self.parse(handle, do_features, do_sequence)
             if record is None:
                 break
             if record.id is None:
@@ -580,8 +607,12 @@ class EmblScanner(InsdcScanner):
     FEATURE_QUALIFIER_SPACER = "FT" + " " * (FEATURE_QUALIFIER_INDENT - 2)
     SEQUENCE_HEADERS = ["SQ", "CO"]  # Remove trailing spaces
 
-    def parse_footer(self):
-        """returns a tuple containing a list of any misc strings, and the sequence"""
+    def parse_footer(self, skip=False):
+        """returns a tuple containing a list of any misc strings, and the sequence
+
+        If skip is True, the sequence lines are scanned over without being
+        stored, and the sequence length is returned instead of the sequence.
+        """
         assert self.line[:self.HEADER_WIDTH].rstrip() in self.SEQUENCE_HEADERS, \
             "Eh? '%s'" % self.line
 
@@ -598,8 +629,15 @@ class EmblScanner(InsdcScanner):
             or self.line.strip() == '//', "Unexpected content after SQ or CO line: %r" % self.line
 
         seq_lines = []
+        last = None
         line = self.line
         while True:
+            if skip:
+                # Fast scan over the sequence lines (which start with spaces),
+                # just keeping the last one as it ends with the length
+                while line[:1] == " ":
+                    last = line
+                    line = self.handle.readline()
             if not line:
                 raise ValueError("Premature end of file in sequence data")
             line = line.strip()
@@ -609,10 +647,20 @@ class EmblScanner(InsdcScanner):
                 break
             assert self.line[:self.HEADER_WIDTH] == " " * self.HEADER_WIDTH, \
                 repr(self.line)
-            # Remove tailing number now, remove spaces later
-            seq_lines.append(line.rsplit(None, 1)[0])
+            if skip:
+                last = line
+            else:
+                # Remove tailing number now, remove spaces later
+                seq_lines.append(line.rsplit(None, 1)[0])
             line = self.handle.readline()
         self.line = line
+        if skip:
+            if last is None:
+                return (misc_lines, 0)
+            try:
+                return (misc_lines, int(last.split()[-1]))
+            except ValueError:
+                raise ValueError("Sequence line mal-formed, %r" % last)
         return (misc_lines, "".join(seq_lines).replace(" ", ""))
 
     def _feed_first_line(self, consumer, line):
@@ -977,8 +1025,12 @@ class GenBankScanner(InsdcScanner):
     FEATURE_QUALIFIER_SPACER = " " * FEATURE_QUALIFIER_INDENT
     SEQUENCE_HEADERS = ["CONTIG", "ORIGIN", "BASE COUNT", "WGS"]  # trailing spaces removed
 
-    def parse_footer(self):
-        """returns a tuple containing a list of any misc strings, and the sequence"""
+    def parse_footer(self, skip=False):
+        """returns a tuple containing a list of any misc strings, and the sequence
+
+        If skip is True, the sequence lines are scanned over without being
+        stored, and the sequence length is returned instead of the sequence.
+        """
         assert self.line[:self.HEADER_WIDTH].rstrip() in self.SEQUENCE_HEADERS, \
             "Eh? '%s'" % self.line
 
@@ -998,8 +1050,15 @@ class GenBankScanner(InsdcScanner):
         # Now just consume the sequence lines until reach the // marker
         # or a CONTIG line
         seq_lines = []
+        last = None
         line = self.line
         while True:
+            if skip:
+                # Fast scan over the well formed sequence lines, just keeping
+                # the last one as it starts with the position of its first base
+                while line[9:10] == " " and line[:6] != "CONTIG":
+                    last = line
+                    line = self.handle.readline()
             if not line:
                 warnings.warn("Premature end of file in sequence data",
                               BiopythonParserWarning)
@@ -1023,10 +1082,22 @@ class GenBankScanner(InsdcScanner):
                 line = line[1:]
                 if len(line) > 9 and line[9:10] != ' ':
                     raise ValueError("Sequence line mal-formed, '%s'" % line)
-            seq_lines.append(line[10:])  # remove spaces later
+            if skip:
+                last = line
+            else:
+                seq_lines.append(line[10:])  # remove spaces later
             line = self.handle.readline()
 
         self.line = line
+        if skip:
+            if last is None:
+                return (misc_lines, 0)
+            fields = last.split()
+            try:
+                return (misc_lines,
+                        int(fields[0]) - 1 + sum(len(f) for f in fields[1:]))
+            except (ValueError, IndexError):
+                raise ValueError("Sequence line mal-formed, '%s'" % last)
         # Seq("".join(seq_lines), self.alphabet)
         return (misc_lines, "".join(seq_lines).replace(" ", ""))
 
@@ -1257,6 +1257,73 @@ class _FeatureConsumer(_BaseGenBankConsumer):
             self.data.seq = Seq(sequence, seq_alphabet)
 
 
+class _SimpleRecordConsumer(_BaseGenBankConsumer):
+    """Record just the identifier, description and sequence string (PRIVATE).
+
+    This is used for the lightweight parsing mode in Bio.SeqIO, and follows
+    the same rules as the _FeatureConsumer for picking the record identifier,
+    but does not build any SeqRecord, Seq or Alphabet objects. After the
+    record_end call, the attribute data holds a tuple of the identifier,
+    description, and sequence string (or None if the sequence was omitted).
+    """
+    def __init__(self):
+        _BaseGenBankConsumer.__init__(self)
+        self.data = None
+        self._name = None
+        self._id = None
+        self._accessions = []
+        self._version = None
+        self._description = ""
+        self._expected_size = None
+        self._seq_data = []
+
+    def locus(self, locus_name):
+        self._name = locus_name
+
+    def size(self, content):
+        self._expected_size = int(content)
+
+    def definition(self, definition):
+        if self._description:
+            self._description += " " + definition
+        else:
+            self._description = definition
+
+    def accession(self, acc_num):
+        for acc in self._split_accessions(acc_num):
+            if acc not in self._accessions:
+                self._accessions.append(acc)
+        if not self._id and self._accessions:
+            # Use the FIRST accession as the ID, as in _FeatureConsumer
+            self._id = self._accessions[0]
+
+    def version(self, version_id):
+        if version_id.count(".") == 1 and version_id.split(".")[1].isdigit():
+            self.accession(version_id.split(".")[0])
+            self.version_suffix(version_id.split(".")[1])
+        elif version_id:
+            self._id = version_id
+
+    def version_suffix(self, version):
+        assert version.isdigit()
+        self._version = int(version)
+
+    def sequence(self, content):
+        assert ' ' not in content
+        self._seq_data.append(content.upper())
+
+    def record_end(self, content):
+        if not self._id:
+            self._id = self._name
+        elif self._id.count('.') == 0 and self._version is not None:
+            self._id += '.%i' % self._version
+        sequence = "".join(self._seq_data)
+        if not sequence and self._expected_size:
+            # Sequence not given in the file
+            sequence = None
+        self.data = (self._id, self._description, sequence)
+
+
 class _RecordConsumer(_BaseGenBankConsumer):
     """Create a GenBank Record object from scanner generated information (PRIVATE).
     """
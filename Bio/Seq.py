@@ -21,11 +21,15 @@ __docformat__ = "restructuredtext en"  # Don't just use plain text in epydoc API
 
 import string  # for maketrans only
 import array
+import itertools
+import re
 import sys
 import warnings
+import weakref
 
 from Bio._py3k import range
 from Bio._py3k import basestring
+from Bio._py3k import _as_bytes, _bytes_to_string
 
 from Bio import BiopythonWarning
 from Bio import Alphabet
@@ -34,12 +38,14 @@ from Bio.Data.IUPACData import ambiguous_dna_complement, ambiguous_rna_complemen
 from Bio.Data import CodonTable
 
 
-def _maketrans(complement_mapping):
+def _maketrans(complement_mapping, as_bytes=False):
     """Makes a python string translation table (PRIVATE).
 
     Arguments:
         - complement_mapping - a dictionary such as ambiguous_dna_complement
           and ambiguous_rna_complement from Data.IUPACData.
+        - as_bytes - Boolean, make a table for bytes rather than unicode
+          strings (only makes a difference under Python 3).
 
     Returns a translation table (a string of length 256) for use with the
     python string's translate method to use in a (reverse) complement.
@@ -53,12 +59,16 @@ def _maketrans(complement_mapping):
     before += before.lower()
     after += after.lower()
     if sys.version_info[0] == 3:
+        if as_bytes:
+            return bytes.maketrans(_as_bytes(before), _as_bytes(after))
         return str.maketrans(before, after)
     else:
         return string.maketrans(before, after)
 
 _dna_complement_table = _maketrans(ambiguous_dna_complement)
 _rna_complement_table = _maketrans(ambiguous_rna_complement)
+_dna_complement_bytes = _maketrans(ambiguous_dna_complement, as_bytes=True)
+_rna_complement_bytes = _maketrans(ambiguous_rna_complement, as_bytes=True)
 
 
 class Seq(object):
@@ -1531,6 +1541,246 @@ class UnknownSeq(Seq):
             return Seq("", s.alphabet)
 
 
+class BufferSeq(Seq):
+    """A read-only sequence object backed by a bytes like buffer.
+
+    Where a Seq object holds its sequence as a string, a BufferSeq wraps any
+    bytes like object supporting slicing, such as bytes, bytearray, memoryview
+    or a memory mapped file (mmap). Slicing a BufferSeq (with a step of one)
+    gives another BufferSeq sharing the same buffer, so taking a subsequence
+    of a chromosome sized sequence does not copy the data:
+
+    >>> from Bio.Seq import BufferSeq
+    >>> from Bio.Alphabet import generic_dna
+    >>> my_seq = BufferSeq(b"CCCCCGATAGNRACGTTTAGCC", generic_dna)
+    >>> my_seq
+    BufferSeq('CCCCCGATAGNRACGTTTAGCC', DNAAlphabet())
+    >>> sub_seq = my_seq[5:20]
+    >>> sub_seq
+    BufferSeq('GATAGNRACGTTTAG', DNAAlphabet())
+    >>> print(sub_seq.find("TAG"))
+    2
+    >>> print(sub_seq.count("A"))
+    4
+    >>> sub_seq.reverse_complement()
+    BufferSeq('CTAAACGTYNCTATC', DNAAlphabet())
+    >>> print(sub_seq.translate())
+    DXBV*
+    >>> sub_seq == "GATAGNRACGTTTAG"
+    True
+
+    For example, to keep a large reference genome (stored as a single line
+    of sequence without line breaks) memory mapped once, and shared with
+    any worker processes started via fork::
+
+        import mmap
+        handle = open("genome.seq", "rb")
+        genome = BufferSeq(mmap.mmap(handle.fileno(), 0,
+                                     access=mmap.ACCESS_READ), generic_dna)
+
+    The count, find, rfind and 'in' operations search bytes, bytearray and
+    mmap buffers in place (a memoryview is copied first). Otherwise the
+    Seq methods work by turning the sequence into a string, and give plain
+    Seq objects (or strings) as before.
+    """
+    def __init__(self, data, alphabet=Alphabet.generic_alphabet):
+        """Create a BufferSeq object.
+
+        Arguments:
+            - data - Sequence, required (bytes like object, e.g. an mmap)
+            - alphabet - Optional argument, an Alphabet object from Bio.Alphabet
+
+        """
+        if isinstance(data, (Seq, MutableSeq)) or \
+                (isinstance(data, basestring) and not isinstance(data, bytes)):
+            raise TypeError("The sequence data given to a BufferSeq object "
+                            "should be bytes like (not a string or Seq)")
+        self._buffer = data
+        self._start = 0
+        self._end = len(data)
+        self.alphabet = alphabet
+
+    def _region(self, start, end):
+        """Make a BufferSeq sharing this buffer, start and end given as offsets (PRIVATE)."""
+        answer = BufferSeq.__new__(BufferSeq)
+        answer._buffer = self._buffer
+        answer._start = self._start + start
+        answer._end = self._start + end
+        answer.alphabet = self.alphabet
+        return answer
+
+    def _bytes(self, start=0, end=None):
+        """Return bytes for the given offsets, defaulting to the whole sequence (PRIVATE)."""
+        if end is None:
+            end = self._end - self._start
+        data = self._buffer[self._start + start:self._start + end]
+        if isinstance(data, memoryview):
+            return data.tobytes()
+        return bytes(data)
+
+    @property
+    def _data(self):
+        """The sequence as a string, for code expecting a Seq object (PRIVATE)."""
+        return str(self)
+
+    def __len__(self):
+        """Returns the length of the sequence, use len(my_seq)."""
+        return self._end - self._start
+
+    def __str__(self):
+        """Returns the full sequence as a python string, use str(my_seq)."""
+        return _bytes_to_string(self._bytes())
+
+    def __repr__(self):
+        """Returns a (truncated) representation of the sequence for debugging."""
+        if len(self) > 60:
+            # Avoid turning the whole sequence into a string
+            return "{0}('{1}...{2}', {3!r})".format(
+                self.__class__.__name__, _bytes_to_string(self._bytes(0, 54)),
+                _bytes_to_string(self._bytes(len(self) - 3)), self.alphabet)
+        else:
+            return "{0}('{1}', {2!r})".format(self.__class__.__name__,
+                                              str(self), self.alphabet)
+
+    def __getitem__(self, index):
+        """Returns a subsequence of single letter, use my_seq[index].
+
+        Slices with a step of one give a BufferSeq sharing the buffer,
+        other slices give a Seq object.
+        """
+        length = self._end - self._start
+        if isinstance(index, int):
+            if index < 0:
+                index += length
+            if not 0 <= index < length:
+                raise IndexError("BufferSeq index out of range")
+            return _bytes_to_string(self._bytes(index, index + 1))
+        start, stop, step = index.indices(length)
+        if step == 1:
+            return self._region(start, max(start, stop))
+        count = len(range(start, stop, step))
+        if not count:
+            return Seq("", self.alphabet)
+        last = start + (count - 1) * step
+        data = self._bytes(min(start, last), max(start, last) + 1)
+        return Seq(_bytes_to_string(data[::step]), self.alphabet)
+
+    def __add__(self, other):
+        """Add another sequence or string, giving a Seq object."""
+        return Seq(str(self), self.alphabet) + other
+
+    def __radd__(self, other):
+        """Adding a sequence on the left, giving a Seq object."""
+        return other + Seq(str(self), self.alphabet)
+
+    def _search_args(self, sub, start, end):
+        """Resolve arguments for count, find and rfind (PRIVATE).
+
+        Returns the buffer to search, the sub-sequence as bytes, the start
+        and end offsets in that buffer, and the buffer offset of the start of
+        this sequence (or None if start > end).
+        """
+        sub = _as_bytes(self._get_seq_str_and_check_alphabet(sub))
+        length = self._end - self._start
+        if start < 0:
+            start = max(start + length, 0)
+        if end < 0:
+            end = max(end + length, 0)
+        end = min(end, length)
+        if start > end:
+            return None
+        buffer = self._buffer
+        if isinstance(buffer, memoryview):
+            # No find method, so search a copy
+            return self._bytes(start, end), sub, 0, end - start, -start
+        return buffer, sub, self._start + start, self._start + end, self._start
+
+    def count(self, sub, start=0, end=sys.maxsize):
+        """Non-overlapping count method, like that of a python string.
+
+        See the Seq object's count method for details.
+        """
+        args = self._search_args(sub, start, end)
+        if args is None:
+            return 0
+        buffer, sub, start, end, base = args
+        if hasattr(buffer, "count"):
+            return buffer.count(sub, start, end)
+        if not sub:
+            return end - start + 1
+        # e.g. mmap lacks a count method
+        count = 0
+        index = buffer.find(sub, start, end)
+        while index != -1:
+            count += 1
+            index = buffer.find(sub, index + len(sub), end)
+        return count
+
+    def __contains__(self, char):
+        """Implements the 'in' keyword, like a python string."""
+        return self.find(char) != -1
+
+    def find(self, sub, start=0, end=sys.maxsize):
+        """Find method, like that of a python string.
+
+        See the Seq object's find method for details.
+        """
+        args = self._search_args(sub, start, end)
+        if args is None:
+            return -1
+        buffer, sub, start, end, base = args
+        index = buffer.find(sub, start, end)
+        if index == -1:
+            return -1
+        return index - base
+
+    def rfind(self, sub, start=0, end=sys.maxsize):
+        """Find from right method, like that of a python string.
+
+        See the Seq object's rfind method for details.
+        """
+        args = self._search_args(sub, start, end)
+        if args is None:
+            return -1
+        buffer, sub, start, end, base = args
+        index = buffer.rfind(sub, start, end)
+        if index == -1:
+            return -1
+        return index - base
+
+    def complement(self):
+        """Returns the complement sequence. New BufferSeq object.
+
+        See the Seq object's complement method for details.
+        """
+        return BufferSeq(self._bytes().translate(self._complement_table()),
+                         self.alphabet)
+
+    def reverse_complement(self):
+        """Returns the reverse complement sequence. New BufferSeq object.
+
+        See the Seq object's reverse_complement method for details.
+        """
+        return BufferSeq(self._bytes().translate(
+            self._complement_table())[::-1], self.alphabet)
+
+    def _complement_table(self):
+        """Returns the bytes translation table for complementing (PRIVATE)."""
+        base = Alphabet._get_base_alphabet(self.alphabet)
+        if isinstance(base, Alphabet.ProteinAlphabet):
+            raise ValueError("Proteins do not have complements!")
+        if isinstance(base, Alphabet.DNAAlphabet):
+            return _dna_complement_bytes
+        elif isinstance(base, Alphabet.RNAAlphabet):
+            return _rna_complement_bytes
+        elif "U" in self or "u" in self:
+            if "T" in self or "t" in self:
+                raise ValueError("Mixed RNA/DNA found")
+            return _rna_complement_bytes
+        else:
+            return _dna_complement_bytes
+
+
 class MutableSeq(object):
     """An editable sequence object (with an alphabet).
 
@@ -1979,6 +2229,77 @@ def back_transcribe(rna):
         return rna.replace('U', 'T').replace('u', 't')
 
 
+# Placeholders used in _codon_translator for stop and possible stop codons
+_stop_char = "\x00"
+_pos_stop_char = "\x01"
+_codon_translators = weakref.WeakKeyDictionary()
+_codon_re = re.compile("...", re.DOTALL)
+
+
+def _valid_codon_letters(table):
+    """Return the set of (upper case) letters valid in codons (PRIVATE)."""
+    if table.nucleotide_alphabet.letters is not None:
+        return set(table.nucleotide_alphabet.letters.upper())
+    else:
+        # Assume the worst case, ambiguous DNA or RNA:
+        return set(IUPAC.ambiguous_dna.letters.upper() +
+                   IUPAC.ambiguous_rna.letters.upper())
+
+
+def _translate_codon(codon, table, gap=None):
+    """Translate a single upper case codon, as used in _translate_str (PRIVATE).
+
+    Stop codons and possible stop codons (e.g. TAN or NNN) are returned as
+    the placeholders _stop_char and _pos_stop_char respectively.
+    """
+    try:
+        return table.forward_table[codon]
+    except (KeyError, CodonTable.TranslationError):
+        if codon in table.stop_codons:
+            return _stop_char
+        elif _valid_codon_letters(table).issuperset(set(codon)):
+            # Possible stop codon (e.g. NNN or TAN)
+            return _pos_stop_char
+        elif gap is not None and codon == gap * 3:
+            # Gapped translation
+            return gap
+        else:
+            raise CodonTable.TranslationError(
+                "Codon '{0}' is invalid".format(codon))
+
+
+def _codon_translator(table):
+    """Return a dictionary mapping codons to amino acids for a table (PRIVATE).
+
+    This covers every upper case codon made from the letters valid for the
+    table's nucleotide alphabet (including any ambiguity codes), with stop
+    and possible stop codons mapped to placeholders as in _translate_codon.
+    Using this, whole sequences can be translated with a single dictionary
+    lookup per codon, rather than going via the forward_table (which for
+    ambiguous tables is slow, and raises exceptions for stop codons).
+
+    The dictionary is built the first time it is needed for each CodonTable,
+    and cached (with up to 17**3 entries for ambiguous DNA and RNA).
+
+    >>> from Bio.Data import CodonTable
+    >>> translator = _codon_translator(CodonTable.unambiguous_dna_by_id[1])
+    >>> len(translator)
+    64
+    >>> print(translator["ATG"])
+    M
+    """
+    try:
+        return _codon_translators[table]
+    except KeyError:
+        pass
+    letters = sorted(_valid_codon_letters(table))
+    translator = {}
+    for codon in map("".join, itertools.product(letters, repeat=3)):
+        translator[codon] = _translate_codon(codon, table)
+    _codon_translators[table] = translator
+    return translator
+
+
 def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
                    cds=False, pos_stop="X", gap=None):
     """Helper function to translate a nucleotide string (PRIVATE).
@@ -2043,14 +2364,7 @@ def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
     """
     sequence = sequence.upper()
     amino_acids = []
-    forward_table = table.forward_table
     stop_codons = table.stop_codons
-    if table.nucleotide_alphabet.letters is not None:
-        valid_letters = set(table.nucleotide_alphabet.letters.upper())
-    else:
-        # Assume the worst case, ambiguous DNA or RNA:
-        valid_letters = set(IUPAC.ambiguous_dna.letters.upper() +
-                            IUPAC.ambiguous_rna.letters.upper())
     n = len(sequence)
     if cds:
         if str(sequence[:3]).upper() not in table.start_codons:
@@ -2077,28 +2391,34 @@ def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
         elif len(gap) > 1:
             raise ValueError("Gap character should be a single character string.")
 
-    for i in range(0, n - n % 3, 3):
-        codon = sequence[i:i + 3]
+    # Translate all the codons at once using the table's precomputed lookup,
+    # then deal with any codons it doesn't cover (e.g. gaps or invalid).
+    codons = _codon_re.findall(sequence, 0, n - n % 3)
+    translated = list(map(_codon_translator(table).get, codons))
+    limit = len(translated)
+    if cds or to_stop:
         try:
-            amino_acids.append(forward_table[codon])
-        except (KeyError, CodonTable.TranslationError):
-            if codon in table.stop_codons:
-                if cds:
-                    raise CodonTable.TranslationError(
-                        "Extra in frame stop codon found.")
-                if to_stop:
-                    break
-                amino_acids.append(stop_symbol)
-            elif valid_letters.issuperset(set(codon)):
-                # Possible stop codon (e.g. NNN or TAN)
-                amino_acids.append(pos_stop)
-            elif gap is not None and codon == gap * 3:
-                # Gapped translation
-                amino_acids.append(gap)
-            else:
-                raise CodonTable.TranslationError(
-                    "Codon '{0}' is invalid".format(codon))
-    return "".join(amino_acids)
+            limit = translated.index(_stop_char)
+        except ValueError:
+            pass
+    try:
+        i = translated.index(None, 0, limit)
+    except ValueError:
+        i = limit
+    while i < limit:
+        if translated[i] is None:
+            amino = translated[i] = _translate_codon(codons[i], table, gap)
+            if amino == _stop_char and (cds or to_stop):
+                limit = i
+        i += 1
+    if limit < len(translated):
+        if cds:
+            raise CodonTable.TranslationError(
+                "Extra in frame stop codon found.")
+        del translated[limit:]
+    amino_acids.extend(translated)
+    return "".join(amino_acids).replace(_stop_char, stop_symbol) \
+        .replace(_pos_stop_char, pos_stop)
 
 
 def translate(sequence, table="Standard", stop_symbol="*", to_stop=False,
@@ -2177,17 +2497,57 @@ def translate(sequence, table="Standard", stop_symbol="*", to_stop=False,
         return sequence.toseq().translate(table, stop_symbol, to_stop, cds)
     else:
         # Assume its a string, return a string
-        try:
-            codon_table = CodonTable.ambiguous_generic_by_id[int(table)]
-        except ValueError:
-            codon_table = CodonTable.ambiguous_generic_by_name[table]
-        except (AttributeError, TypeError):
-            if isinstance(table, CodonTable.CodonTable):
-                codon_table = table
-            else:
-                raise ValueError('Bad table argument')
-        return _translate_str(sequence, codon_table, stop_symbol, to_stop, cds,
-                              gap=gap)
+        return _translate_str(sequence, _generic_codon_table(table),
+                              stop_symbol, to_stop, cds, gap=gap)
+
+
+def _generic_codon_table(table):
+    """Return the ambiguous generic CodonTable for a table argument (PRIVATE).
+
+    The table can be given as a name (string), an NCBI identifier (integer),
+    or a CodonTable object (which is returned as is).
+    """
+    try:
+        return CodonTable.ambiguous_generic_by_id[int(table)]
+    except ValueError:
+        return CodonTable.ambiguous_generic_by_name[table]
+    except (AttributeError, TypeError):
+        if isinstance(table, CodonTable.CodonTable):
+            return table
+        else:
+            raise ValueError('Bad table argument')
+
+
+def translate_many(sequences, table="Standard", stop_symbol="*",
+                   to_stop=False, cds=False, gap=None):
+    """Translate many nucleotide sequences into amino acids, returns a list.
+
+    This is equivalent to calling the translate function on each sequence
+    (see that function for the arguments), but the codon table is looked up
+    once and shared, which helps when translating very many short sequences
+    like sequencing reads:
+
+    >>> translate_many(["ATGGCCATTGTA", "GCCTAA", "TGG"])
+    ['MAIV', 'A*', 'W']
+
+    Strings give strings, while bytes give bytes. Seq and MutableSeq objects
+    are translated as with the translate function, giving Seq objects.
+    """
+    codon_table = _generic_codon_table(table)
+    answer = []
+    append = answer.append
+    for sequence in sequences:
+        if isinstance(sequence, basestring):
+            append(_translate_str(sequence, codon_table, stop_symbol,
+                                  to_stop, cds, gap=gap))
+        elif isinstance(sequence, bytes):
+            append(_as_bytes(_translate_str(
+                _bytes_to_string(sequence), codon_table, stop_symbol,
+                to_stop, cds, gap=gap)))
+        else:
+            # Seq objects pick the codon table based on their alphabet
+            append(translate(sequence, table, stop_symbol, to_stop, cds, gap))
+    return answer
 
 
 def reverse_complement(sequence):
@@ -2225,6 +2585,42 @@ def reverse_complement(sequence):
     return sequence.translate(ttable)[::-1]
 
 
+def reverse_complement_many(sequences):
+    """Returns the reverse complements of many nucleotide sequences as a list.
+
+    This is equivalent to calling the reverse_complement function on each
+    sequence, but avoids the per-call overhead which matters when processing
+    very many short sequences like sequencing reads:
+
+    >>> reverse_complement_many(["ACTG-NH", "AUGC", "GATTACA"])
+    ['DN-CAGT', 'GCAU', 'TGTAATC']
+
+    Strings give strings, and bytes give bytes, using shared translation
+    tables. Seq and MutableSeq objects give Seq objects as with the
+    reverse_complement function.
+    """
+    answer = []
+    append = answer.append
+    for sequence in sequences:
+        if isinstance(sequence, basestring):
+            if 'U' in sequence or 'u' in sequence:
+                if 'T' in sequence or 't' in sequence:
+                    raise ValueError("Mixed RNA/DNA found")
+                append(sequence.translate(_rna_complement_table)[::-1])
+            else:
+                append(sequence.translate(_dna_complement_table)[::-1])
+        elif isinstance(sequence, bytes):
+            if b'U' in sequence or b'u' in sequence:
+                if b'T' in sequence or b't' in sequence:
+                    raise ValueError("Mixed RNA/DNA found")
+                append(sequence.translate(_rna_complement_bytes)[::-1])
+            else:
+                append(sequence.translate(_dna_complement_bytes)[::-1])
+        else:
+            append(reverse_complement(sequence))
+    return answer
+
+
 def _test():
     """Run the Bio.Seq module's doctests (PRIVATE)."""
     if sys.version_info[0:2] == (3, 1):
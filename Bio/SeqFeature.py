@@ -61,6 +61,30 @@ from Bio.Seq import MutableSeq, reverse_complement
 __docformat__ = "restructuredtext en"
 
 
+def _get_slots_state(self):
+    """Return the attributes of a slotted object as a dictionary (PRIVATE).
+
+    Used as the __getstate__ method for pickling and copying objects using
+    __slots__, giving the same state as the older __dict__ based objects.
+    """
+    state = dict(getattr(self, "__dict__", ()))
+    for cls in type(self).__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            if name not in ("__dict__", "__weakref__") and hasattr(self, name):
+                state[name] = getattr(self, name)
+    return state
+
+
+def _set_slots_state(self, state):
+    """Restore the attributes of a slotted object from a dictionary (PRIVATE).
+
+    Used as the __setstate__ method, which also copes with pickles made
+    before these classes used __slots__.
+    """
+    for name, value in state.items():
+        setattr(self, name, value)
+
+
 class SeqFeature(object):
     """Represent a Sequence Feature on an object.
 
@@ -94,6 +118,21 @@ class SeqFeature(object):
           should not be used (DEPRECATED).
     """
 
+    # Using slots saves memory when there are many features, the __dict__
+    # slot means arbitrary extra attributes can still be added if needed.
+    __slots__ = ("_location", "type", "id", "qualifiers", "_sub_features",
+                 "_indexes", "__dict__", "__weakref__")
+
+    def __getstate__(self):
+        state = _get_slots_state(self)
+        # Use the public name, and leave out any SeqRecord feature indexes
+        if "_location" in state:
+            state["location"] = state.pop("_location")
+        state.pop("_indexes", None)
+        return state
+
+    __setstate__ = _set_slots_state
+
     def __init__(self, location=None, type='', location_operator='',
                  strand=None, id="<unknown id>",
                  qualifiers=None, sub_features=None,
@@ -173,6 +212,21 @@ class SeqFeature(object):
             # TODO - Deprecation warning
             self.ref_db = ref_db
 
+    def _set_location(self, value):
+        self._location = value
+        # Any SeqRecord feature indexes including this feature are now out
+        # of date (see the SeqRecord's features_in method)
+        indexes = getattr(self, "_indexes", None)
+        if indexes:
+            for index in indexes:
+                index.mark_stale()
+            self._indexes = None
+
+    location = property(fget=lambda self: self._location,
+                        fset=_set_location,
+                        doc="Location of the feature (FeatureLocation, "
+                            "CompoundLocation or None).")
+
     def _get_sub_features(self):
         if self._sub_features:
             import warnings
@@ -564,6 +618,9 @@ class Reference(object):
 
 # --- Handling feature locations
 
+_valid_strands = (+1, -1, 0, None)
+
+
 class FeatureLocation(object):
     """Specify the location of a feature along a sequence.
 
@@ -628,6 +685,12 @@ class FeatureLocation(object):
     would use a BeforePosition object for the start.
     """
 
+    __slots__ = ("_start", "_end", "_strand", "ref", "ref_db",
+                 "__dict__", "__weakref__")
+
+    __getstate__ = _get_slots_state
+    __setstate__ = _set_slots_state
+
     def __init__(self, start, end, strand=None, ref=None, ref_db=None):
         """Specify the start, end, strand etc of a sequence feature.
 
@@ -696,7 +759,11 @@ class FeatureLocation(object):
             self._end = ExactPosition(end)
         else:
             raise TypeError("end=%r %s" % (end, type(end)))
-        self.strand = strand
+        # Inlined strand property setter, as this is called very often
+        if strand not in _valid_strands:
+            raise ValueError("Strand should be +1, -1, 0 or None, not %r"
+                             % strand)
+        self._strand = strand
         self.ref = ref
         self.ref_db = ref_db
 
@@ -704,7 +771,7 @@ class FeatureLocation(object):
         return self._strand
 
     def _set_strand(self, value):
-        if value not in [+1, -1, 0, None]:
+        if value not in _valid_strands:
             raise ValueError("Strand should be +1, -1, 0 or None, not %r"
                              % value)
         self._strand = value
@@ -980,6 +1047,11 @@ class FeatureLocation(object):
 class CompoundLocation(object):
     """For handling joins etc where a feature location has several parts."""
 
+    __slots__ = ("operator", "parts", "__dict__", "__weakref__")
+
+    __getstate__ = _get_slots_state
+    __setstate__ = _set_slots_state
+
     def __init__(self, parts, operator="join"):
         """Create a compound location with several parts.
 
@@ -1336,6 +1408,11 @@ class CompoundLocation(object):
 class AbstractPosition(object):
     """Abstract base class representing a position."""
 
+    # The simple position classes hold nothing beyond the integer value,
+    # so avoid giving every instance a __dict__ (subclasses needing extra
+    # attributes like WithinPosition do not define __slots__).
+    __slots__ = ()
+
     def __repr__(self):
         """String representation of the location for debugging."""
         return "%s(...)" % (self.__class__.__name__)
@@ -1374,6 +1451,8 @@ class ExactPosition(int, AbstractPosition):
     15
 
     """
+    __slots__ = ()
+
     def __new__(cls, position, extension=0):
         if extension != 0:
             raise AttributeError("Non-zero extension %s for exact position."
@@ -1409,7 +1488,7 @@ class UncertainPosition(ExactPosition):
     This is used in UniProt, e.g. ?222 for uncertain position 222, or in the
     XML format explicitly marked as uncertain. Does not apply to GenBank/EMBL.
     """
-    pass
+    __slots__ = ()
 
 
 class UnknownPosition(AbstractPosition):
@@ -1417,6 +1496,7 @@ class UnknownPosition(AbstractPosition):
 
     This is used in UniProt, e.g. ? or in the XML as unknown.
     """
+    __slots__ = ()
 
     def __repr__(self):
         """String representation of the UnknownPosition location for debugging."""
@@ -1535,6 +1615,10 @@ class WithinPosition(int, AbstractPosition):
         obj._right = right
         return obj
 
+    def __getnewargs__(self):
+        """Arguments for __new__ when unpickling or copying (PRIVATE)."""
+        return (int(self), self._left, self._right)
+
     def __repr__(self):
         """String representation of the WithinPosition location for debugging."""
         return "%s(%i, left=%i, right=%i)" \
@@ -1637,6 +1721,10 @@ class BetweenPosition(int, AbstractPosition):
         obj._right = right
         return obj
 
+    def __getnewargs__(self):
+        """Arguments for __new__ when unpickling or copying (PRIVATE)."""
+        return (int(self), self._left, self._right)
+
     def __repr__(self):
         """String representation of the WithinPosition location for debugging."""
         return "%s(%i, left=%i, right=%i)" \
@@ -1699,6 +1787,8 @@ class BeforePosition(int, AbstractPosition):
     Just remember that for equality and sorting the position objects act
     like integers.
     """
+    __slots__ = ()
+
     # Subclasses int so can't use __init__
     def __new__(cls, position, extension=0):
         if extension != 0:
@@ -1769,6 +1859,8 @@ class AfterPosition(int, AbstractPosition):
     Just remember that for equality and sorting the position objects act
     like integers.
     """
+    __slots__ = ()
+
     # Subclasses int so can't use __init__
     def __new__(cls, position, extension=0):
         if extension != 0:
@@ -1864,6 +1956,10 @@ class OneOfPosition(int, AbstractPosition):
         obj.position_choices = choices
         return obj
 
+    def __getnewargs__(self):
+        """Arguments for __new__ when unpickling or copying (PRIVATE)."""
+        return (int(self), self.position_choices)
+
     @property
     def position(self):
         """Legacy attribute to get (left) position as integer (OBSOLETE)."""
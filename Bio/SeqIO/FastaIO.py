@@ -9,10 +9,20 @@
 
 """Bio.SeqIO support for the "fasta" (aka FastA or Pearson) file format.
 
-You are expected to use this module via the Bio.SeqIO functions."""
+You are expected to use this module via the Bio.SeqIO functions, except
+for the IndexedFasta class which offers samtools faidx style fetching of
+regions from large (optionally BGZF compressed) FASTA files."""
 
 from __future__ import print_function
 
+import mmap
+import os
+from collections import OrderedDict
+
+from Bio._py3k import basestring, _bytes_to_string
+
+from Bio import bgzf
+from Bio.File import _open_for_random_access
 from Bio.Alphabet import single_letter_alphabet
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
@@ -20,6 +30,12 @@ from Bio.SeqIO.Interfaces import SequentialSequenceWriter
 
 __docformat__ = "restructuredtext en"
 
+_gt_bytes = b">"
+_lf_bytes = b"\n"
+_cr_bytes = b"\r"
+_eol_bytes = b"\r\n"
+_empty_bytes = b""
+
 
 def SimpleFastaParser(handle):
     """Generator function to iterate over Fasta records (as string tuples).
@@ -212,6 +228,266 @@ class FastaWriter(SequentialSequenceWriter):
         else:
             self.handle.write(data + "\n")
 
+
+def _build_fai(handle):
+    """Scan a FASTA file for a samtools style .fai index (PRIVATE).
+
+    Expects a handle in binary mode (a plain file or a BgzfReader), and
+    returns a list of tuples giving the name, sequence length, offset of
+    the first base (in the uncompressed data), bases per line and bytes per
+    line (including the line ending) of each record.
+
+    As with samtools faidx, every sequence line must be the same length
+    except the last line of each record.
+    """
+    entries = []
+    names = set()
+    offset = 0
+    name = None
+    for line in handle:
+        if line[:1] == _gt_bytes:
+            if name is not None:
+                entries.append((name, length, seq_offset,
+                                linebases or 0, linewidth or 0))
+            try:
+                name = _bytes_to_string(line[1:].split(None, 1)[0])
+            except IndexError:
+                raise ValueError("Missing name in FASTA title line at "
+                                 "offset %i" % offset)
+            if name in names:
+                raise ValueError("Duplicate name %r in FASTA file" % name)
+            names.add(name)
+            seq_offset = offset + len(line)
+            length = 0
+            linebases = linewidth = None
+            short = False
+        elif name is None:
+            if line.strip():
+                raise ValueError("FASTA files should start with '>' "
+                                 "character, not %r" % line[:20])
+        else:
+            bases = len(line.rstrip(_eol_bytes))
+            if not bases:
+                # Blank line, only allowed at the end of the record
+                short = True
+            elif short:
+                raise ValueError("Different line length in sequence %r"
+                                 % name)
+            elif linebases is None:
+                linebases = bases
+                linewidth = len(line)
+            elif bases == linebases and len(line) == linewidth:
+                pass
+            elif bases <= linebases:
+                # Should be the last line of this record
+                short = True
+            else:
+                raise ValueError("Different line length in sequence %r"
+                                 % name)
+            length += bases
+        offset += len(line)
+    if name is not None:
+        entries.append((name, length, seq_offset,
+                        linebases or 0, linewidth or 0))
+    return entries
+
+
+class IndexedFasta(object):
+    """Random access to regions of a FASTA file using a samtools .fai index.
+
+    Unlike Bio.SeqIO.index(...) which returns whole SeqRecord objects, this
+    lets you fetch a subsequence without reading (or parsing) the rest of
+    the record. It uses (and if missing, builds) a samtools faidx compatible
+    index file, by default the FASTA filename plus ".fai", which records the
+    name, length, offset, bases per line and bytes per line of each sequence.
+    From this the offset of any base can be calculated, so each query is a
+    single seek and a read of just the bytes needed.
+
+    >>> fasta = IndexedFasta("GenBank/NC_005816.fna", "GenBank/temp.fai")
+    >>> list(fasta)
+    ['gi|45478711|ref|NC_005816.1|']
+    >>> print(fasta.length("gi|45478711|ref|NC_005816.1|"))
+    9609
+    >>> print(fasta.fetch("gi|45478711|ref|NC_005816.1|", 65, 75))
+    TCTCCTGATT
+    >>> fasta.close()
+
+    Like Python slicing, the start and end are zero based and the end is
+    exclusive, and the end is truncated to the length of the sequence.
+
+    Plain FASTA files are memory mapped where possible. BGZF compressed
+    FASTA files (e.g. from bgzip) are also supported, using a samtools .gzi
+    index for the BGZF block offsets (built if missing or out of date).
+
+    >>> import os
+    >>> os.remove("GenBank/temp.fai")
+    """
+
+    def __init__(self, filename, fai_filename=None):
+        """Open the FASTA file, loading or building its .fai index.
+
+        Arguments:
+
+         - filename - Name of the (plain or BGZF compressed) FASTA file.
+         - fai_filename - Optional name of the index file, defaults to the
+           FASTA filename plus ".fai". If this file is missing or older
+           than the FASTA file, the index is rebuilt and saved there (with
+           a warning if it cannot be written). For a BGZF file the .gzi
+           index (the FASTA filename plus ".gzi") is likewise rebuilt
+           whenever the .fai index is, or if it is missing or out of date.
+
+        """
+        if not isinstance(filename, basestring):
+            raise TypeError("Need a filename (not a handle)")
+        if fai_filename is None:
+            fai_filename = filename + ".fai"
+        self._filename = filename
+        self._mmap = None
+        handle = _open_for_random_access(filename)
+        self._handle = handle
+        self._bgzf = isinstance(handle, bgzf.BgzfReader)
+        try:
+            if _is_up_to_date(fai_filename, filename):
+                entries = read_fai(fai_filename)
+                if self._bgzf and \
+                        not _is_up_to_date(filename + ".gzi", filename):
+                    self._save_gzi()
+            else:
+                entries = _build_fai(handle)
+                self._save_index(entries, fai_filename)
+        except Exception:
+            handle.close()
+            raise
+        self._index = OrderedDict((entry[0], entry[1:]) for entry in entries)
+        if not self._bgzf:
+            try:
+                self._mmap = mmap.mmap(handle.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+            except (ValueError, EnvironmentError):
+                # e.g. an empty file, or mmap not supported
+                self._mmap = None
+
+    def _save_index(self, entries, fai_filename):
+        """Write the .fai index (and for BGZF a .gzi index) if we can (PRIVATE)."""
+        try:
+            write_fai(entries, fai_filename)
+        except EnvironmentError as err:
+            _warn_not_saved(fai_filename, err)
+        if self._bgzf:
+            # Any existing .gzi may describe an older version of the file
+            self._save_gzi()
+
+    def _save_gzi(self):
+        """Write the .gzi index of the BGZF block offsets if we can (PRIVATE)."""
+        gzi_filename = self._filename + ".gzi"
+        try:
+            bgzf.write_gzi(self._filename, gzi_filename)
+        except EnvironmentError as err:
+            _warn_not_saved(gzi_filename, err)
+
+    def __iter__(self):
+        """Iterate over the sequence names."""
+        return iter(self._index)
+
+    def __len__(self):
+        """Return the number of sequences."""
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def keys(self):
+        """Return a list of the sequence names."""
+        return list(self._index)
+
+    def length(self, name):
+        """Return the length of the named sequence."""
+        return self._index[name][0]
+
+    def fetch(self, name, start=0, end=None):
+        """Return the region start:end of the named sequence as a string.
+
+        The start and end are zero based with the end exclusive (as in
+        Python slicing), defaulting to the whole sequence.
+        """
+        length, offset, linebases, linewidth = self._index[name]
+        if end is None or end > length:
+            end = length
+        if start < 0 or end < 0:
+            raise ValueError("Negative start %r or end %r not supported"
+                             % (start, end))
+        if start >= end:
+            return ""
+        # Offset of the first base, and just after the last base
+        first = offset + (start // linebases) * linewidth + start % linebases
+        end -= 1
+        last = offset + (end // linebases) * linewidth + end % linebases + 1
+        if self._mmap is not None:
+            data = self._mmap[first:last]
+        else:
+            handle = self._handle
+            if self._bgzf:
+                handle.seek_uncompressed(first)
+            else:
+                handle.seek(first)
+            data = handle.read(last - first)
+        return _bytes_to_string(data.replace(_lf_bytes, _empty_bytes)
+                                    .replace(_cr_bytes, _empty_bytes))
+
+    def close(self):
+        """Close the underlying FASTA file."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+def _is_up_to_date(index_filename, filename):
+    """Check the index file exists and is not older than the data (PRIVATE)."""
+    return os.path.isfile(index_filename) and \
+        os.path.getmtime(index_filename) >= os.path.getmtime(filename)
+
+
+def _warn_not_saved(index_filename, err):
+    """Warn that an index file could not be written (PRIVATE)."""
+    import warnings
+    from Bio import BiopythonWarning
+    warnings.warn("Could not save FASTA index %r: %s"
+                  % (index_filename, err), BiopythonWarning)
+
+
+def read_fai(fai_filename):
+    """Load a samtools .fai index as a list of tuples.
+
+    Each tuple gives the name, sequence length, offset of the first base,
+    bases per line and bytes per line (including the line ending).
+    """
+    entries = []
+    with open(fai_filename) as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 5:
+                raise ValueError("Expected five tab separated fields in "
+                                 ".fai file, not: %r" % line)
+            entries.append((parts[0],) + tuple(int(x) for x in parts[1:5]))
+    return entries
+
+
+def write_fai(entries, fai_filename):
+    """Write a samtools .fai index from a list of tuples (see read_fai)."""
+    with open(fai_filename, "w") as handle:
+        for entry in entries:
+            handle.write("%s\t%i\t%i\t%i\t%i\n" % entry)
+
+
 if __name__ == "__main__":
     from Bio._utils import run_doctest
     run_doctest(verbose=0)
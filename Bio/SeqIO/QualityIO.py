@@ -370,8 +370,10 @@ from Bio.Seq import Seq, UnknownSeq
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqIO.Interfaces import SequentialSequenceWriter
 from math import log
+from array import array
 import warnings
 from Bio import BiopythonWarning, BiopythonParserWarning
+from Bio._py3k import _as_bytes, _bytes_to_string
 
 
 # define score offsets. See discussion for differences between Sanger and
@@ -538,6 +540,77 @@ def _get_phred_quality(record):
                          "letter_annotations of SeqRecord (id=%s)."
                          % record.id)
 
+
+def _compact_quality_bytes(qualities, signed=False):
+    """Return compact quality scores as a bytes string, or None (PRIVATE).
+
+    Quality scores held as an array of (unsigned) bytes, i.e. array("B"),
+    a bytes or bytearray object, or a NumPy uint8 array, are returned as
+    bytes. For signed scores (i.e. Solexa scores, which can be negative) an
+    array("b") or NumPy int8 array is expected instead. Anything else (e.g.
+    a list of integers) gives None.
+    """
+    if isinstance(qualities, array):
+        if qualities.typecode != ("b" if signed else "B"):
+            return None
+        try:
+            return qualities.tobytes()
+        except AttributeError:
+            # Python 2
+            return qualities.tostring()
+    if isinstance(qualities, (bytes, bytearray)) and not signed \
+            and not isinstance(qualities, str):
+        # Under Python 2, a str would be a string of quality letters
+        return bytes(qualities)
+    dtype = getattr(qualities, "dtype", None)
+    if dtype is not None and dtype.itemsize == 1 \
+            and dtype.kind == ("i" if signed else "u"):
+        # NumPy array
+        try:
+            return qualities.tobytes()
+        except AttributeError:
+            # NumPy older than 1.9
+            return qualities.tostring()
+    return None
+
+
+def _quality_translation(mapping, signed=False):
+    """Make a bytes translation table from byte score to quality letter (PRIVATE).
+
+    The mapping function is given each score (from -128 to 127 if signed,
+    otherwise 0 to 255) and should return the encoded letter, or None if
+    that score needs special handling (these are mapped to NULL).
+    """
+    letters = []
+    for byte in range(256):
+        if signed and byte > 127:
+            letter = mapping(byte - 256)
+        else:
+            letter = mapping(byte)
+        letters.append(letter or "\0")
+    return _as_bytes("".join(letters))
+
+
+def _compact_quality_str(qualities, table, max_score, warning, signed=False):
+    """Encode compact quality scores using a translation table (PRIVATE).
+
+    Returns None if the scores are not held compactly (see the function
+    _compact_quality_bytes), or are Solexa scores below -5, in which case
+    the caller should fall back on the general case. The whole string is
+    encoded with a single translate call, rather than letter by letter.
+    """
+    data = _compact_quality_bytes(qualities, signed)
+    if data is None:
+        return None
+    if not data:
+        return ""
+    if signed and min(qualities) < -5:
+        return None
+    if max(qualities) > max_score:
+        warnings.warn(warning, BiopythonWarning)
+    return _bytes_to_string(data.translate(table))
+
+
 # Only map 0 to 93, we need to give a warning on truncating at 93
 _phred_to_sanger_quality_str = dict((qp, chr(min(126, qp + SANGER_SCORE_OFFSET)))
                                     for qp in range(0, 93 + 1))
@@ -546,6 +619,14 @@ _solexa_to_sanger_quality_str = dict(
     (qs, chr(min(126, int(round(phred_quality_from_solexa(qs))) +
      SANGER_SCORE_OFFSET)))
     for qs in range(-5, 93 + 1))
+# The same for compact scores (one byte per score), applying the truncation:
+_phred_to_sanger_quality_bytes = _quality_translation(
+    lambda qp: chr(min(126, qp + SANGER_SCORE_OFFSET)))
+_solexa_to_sanger_quality_bytes = _quality_translation(
+    lambda qs: qs >= -5 and
+    chr(min(126, int(round(phred_quality_from_solexa(qs))) +
+        SANGER_SCORE_OFFSET)),
+    signed=True)
 
 
 def _get_sanger_quality_str(record):
@@ -617,6 +698,12 @@ def _get_sanger_quality_str(record):
         # Fall back on solexa scores...
         pass
     else:
+        # Scores held one per byte can be encoded in one go:
+        answer = _compact_quality_str(
+            qualities, _phred_to_sanger_quality_bytes, 93,
+            "Data loss - max PHRED quality 93 in Sanger FASTQ")
+        if answer is not None:
+            return answer
         # Try and use the precomputed mapping:
         try:
             return "".join(_phred_to_sanger_quality_str[qp]
@@ -639,6 +726,11 @@ def _get_sanger_quality_str(record):
         raise ValueError("No suitable quality scores found in "
                          "letter_annotations of SeqRecord (id=%s)."
                          % record.id)
+    answer = _compact_quality_str(
+        qualities, _solexa_to_sanger_quality_bytes, 93,
+        "Data loss - max PHRED quality 93 in Sanger FASTQ", signed=True)
+    if answer is not None:
+        return answer
     # Try and use the precomputed mapping:
     try:
         return "".join(_solexa_to_sanger_quality_str[qs]
@@ -665,6 +757,14 @@ _phred_to_illumina_quality_str = dict((qp, chr(qp + SOLEXA_SCORE_OFFSET))
 _solexa_to_illumina_quality_str = dict(
     (qs, chr(int(round(phred_quality_from_solexa(qs))) + SOLEXA_SCORE_OFFSET))
     for qs in range(-5, 62 + 1))
+# The same for compact scores (one byte per score), applying the truncation:
+_phred_to_illumina_quality_bytes = _quality_translation(
+    lambda qp: chr(min(126, qp + SOLEXA_SCORE_OFFSET)))
+_solexa_to_illumina_quality_bytes = _quality_translation(
+    lambda qs: qs >= -5 and
+    chr(min(126, int(round(phred_quality_from_solexa(qs))) +
+        SOLEXA_SCORE_OFFSET)),
+    signed=True)
 
 
 def _get_illumina_quality_str(record):
@@ -685,6 +785,12 @@ def _get_illumina_quality_str(record):
         # Fall back on solexa scores...
         pass
     else:
+        # Scores held one per byte can be encoded in one go:
+        answer = _compact_quality_str(
+            qualities, _phred_to_illumina_quality_bytes, 62,
+            "Data loss - max PHRED quality 62 in Illumina FASTQ")
+        if answer is not None:
+            return answer
         # Try and use the precomputed mapping:
         try:
             return "".join(_phred_to_illumina_quality_str[qp]
@@ -707,6 +813,11 @@ def _get_illumina_quality_str(record):
         raise ValueError("No suitable quality scores found in "
                          "letter_annotations of SeqRecord (id=%s)."
                          % record.id)
+    answer = _compact_quality_str(
+        qualities, _solexa_to_illumina_quality_bytes, 62,
+        "Data loss - max PHRED quality 62 in Illumina FASTQ", signed=True)
+    if answer is not None:
+        return answer
     # Try and use the precomputed mapping:
     try:
         return "".join(_solexa_to_illumina_quality_str[qs]
@@ -734,6 +845,13 @@ _phred_to_solexa_quality_str = dict(
     (qp, chr(min(126, int(round(solexa_quality_from_phred(qp))) +
      SOLEXA_SCORE_OFFSET)))
     for qp in range(0, 62 + 1))
+# The same for compact scores (one byte per score), applying the truncation:
+_solexa_to_solexa_quality_bytes = _quality_translation(
+    lambda qs: qs >= -5 and chr(min(126, qs + SOLEXA_SCORE_OFFSET)),
+    signed=True)
+_phred_to_solexa_quality_bytes = _quality_translation(
+    lambda qp: chr(min(126, int(round(solexa_quality_from_phred(qp))) +
+                   SOLEXA_SCORE_OFFSET)))
 
 
 def _get_solexa_quality_str(record):
@@ -754,6 +872,12 @@ def _get_solexa_quality_str(record):
         # Fall back on PHRED scores...
         pass
     else:
+        # Scores held one per byte can be encoded in one go:
+        answer = _compact_quality_str(
+            qualities, _solexa_to_solexa_quality_bytes, 62,
+            "Data loss - max Solexa quality 62 in Solexa FASTQ", signed=True)
+        if answer is not None:
+            return answer
         # Try and use the precomputed mapping:
         try:
             return "".join(_solexa_to_solexa_quality_str[qs]
@@ -776,6 +900,11 @@ def _get_solexa_quality_str(record):
         raise ValueError("No suitable quality scores found in "
                          "letter_annotations of SeqRecord (id=%s)."
                          % record.id)
+    answer = _compact_quality_str(
+        qualities, _phred_to_solexa_quality_bytes, 62,
+        "Data loss - max Solexa quality 62 in Solexa FASTQ")
+    if answer is not None:
+        return answer
     # Try and use the precomputed mapping:
     try:
         return "".join(_phred_to_solexa_quality_str[qp]
@@ -795,6 +924,36 @@ def _get_solexa_quality_str(record):
                    for qp in qualities)
 
 
+def _score_translation(offset, min_score, max_score):
+    """Make a bytes translation table from quality letter to score (PRIVATE).
+
+    Letters outside the valid range are mapped to the byte 0x80, which is
+    not otherwise used (it would be a score of 128 or -128).
+    """
+    scores = bytearray()
+    for letter in range(256):
+        score = letter - offset
+        if min_score <= score <= max_score:
+            scores.append(score % 256)
+        else:
+            scores.append(0x80)
+    return bytes(scores)
+
+
+_sanger_to_score_bytes = _score_translation(SANGER_SCORE_OFFSET, 0, 93)
+_illumina_to_score_bytes = _score_translation(SOLEXA_SCORE_OFFSET, 0, 62)
+_solexa_to_score_bytes = _score_translation(SOLEXA_SCORE_OFFSET, -5, 62)
+_invalid_score_byte = _as_bytes("\x80")
+
+
+def _compact_scores(quality_string, table, typecode="B"):
+    """Decode a FASTQ quality string into an array of scores (PRIVATE)."""
+    data = _as_bytes(quality_string).translate(table)
+    if _invalid_score_byte in data:
+        raise ValueError("Invalid character in quality string")
+    return array(typecode, data)
+
+
 # TODO - Default to nucleotide or even DNA?
 def FastqGeneralIterator(handle):
     """Iterate over Fastq records as string tuples (not as SeqRecord objects).
@@ -954,10 +1113,10 @@ def FastqGeneralIterator(handle):
 
         # Return the record and then continue...
         yield (title_line, seq_string, quality_string)
-    raise StopIteration
 
 
-def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                       compact=False):
     """Generator function to iterate over FASTQ records (as SeqRecord objects).
 
         - handle - input file
@@ -968,6 +1127,9 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
           strings.  If this is not given, then the entire title line
           will be used as the description, and the first word as the
           id and name.
+        - compact - Optional boolean, store the qualities as an array of
+          unsigned bytes, array("B"), rather than a list of integers.
+          This uses much less memory and is faster. Default False.
 
     Note that use of title2ids matches that of Bio.SeqIO.FastaIO.
 
@@ -1020,6 +1182,22 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
     >>> print(record.letter_annotations["phred_quality"])
     [26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 24, 26, 22, 26, 26, 13, 22, 26, 18, 24, 18, 18, 18, 18]
 
+    For large files you can instead have the qualities held compactly using
+    one byte per score, as an array of unsigned bytes. These can be sliced
+    and written out again just like a list:
+
+    >>> with open("Quality/example.fastq", "rU") as handle:
+    ...     for record in FastqPhredIterator(handle, compact=True):
+    ...         pass
+    >>> print(record.letter_annotations["phred_quality"][:5])
+    array('B', [26, 26, 26, 26, 26])
+    >>> print(record[:5].format("fastq"))
+    @EAS54_6_R1_2_1_443_348
+    GTTGC
+    +
+    ;;;;;
+    <BLANKLINE>
+
     """
     assert SANGER_SCORE_OFFSET == ord("!")
     # Originally, I used a list expression for each record:
@@ -1039,9 +1217,12 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 93):
-            raise ValueError("Invalid character in quality string")
+        if compact:
+            qualities = _compact_scores(quality_string, _sanger_to_score_bytes)
+        else:
+            qualities = [q_mapping[letter] for letter in quality_string]
+            if qualities and (min(qualities) < 0 or max(qualities) > 93):
+                raise ValueError("Invalid character in quality string")
         # For speed, will now use a dirty trick to speed up assigning the
         # qualities. We do this to bypass the length check imposed by the
         # per-letter-annotations restricted dict (as this has already been
@@ -1052,10 +1233,13 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
         yield record
 
 
-def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                        compact=False):
     r"""Parsing old Solexa/Illumina FASTQ like files (which differ in the quality mapping).
 
-    The optional arguments are the same as those for the FastqPhredIterator.
+    The optional arguments are the same as those for the FastqPhredIterator,
+    except with compact=True the Solexa scores (which can be negative) are
+    held as an array of signed bytes, array("b").
 
     For each sequence in Solexa/Illumina FASTQ files there is a matching string
     encoding the Solexa integer qualities using ASCII values with an offset
@@ -1198,10 +1382,14 @@ def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None)
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
         # DO NOT convert these into PHRED qualities automatically!
-        if qualities and (min(qualities) < -5 or max(qualities) > 62):
-            raise ValueError("Invalid character in quality string")
+        if compact:
+            qualities = _compact_scores(quality_string,
+                                        _solexa_to_score_bytes, "b")
+        else:
+            qualities = [q_mapping[letter] for letter in quality_string]
+            if qualities and (min(qualities) < -5 or max(qualities) > 62):
+                raise ValueError("Invalid character in quality string")
         # Dirty trick to speed up this line:
         # record.letter_annotations["solexa_quality"] = qualities
         dict.__setitem__(record._per_letter_annotations,
@@ -1209,7 +1397,8 @@ def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None)
         yield record
 
 
-def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                          compact=False):
     """Parse Illumina 1.3 to 1.7 FASTQ like files (which differ in the quality mapping).
 
     The optional arguments are the same as those for the FastqPhredIterator.
@@ -1250,9 +1439,13 @@ def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=Non
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 62):
-            raise ValueError("Invalid character in quality string")
+        if compact:
+            qualities = _compact_scores(quality_string,
+                                        _illumina_to_score_bytes)
+        else:
+            qualities = [q_mapping[letter] for letter in quality_string]
+            if qualities and (min(qualities) < 0 or max(qualities) > 62):
+                raise ValueError("Invalid character in quality string")
         # Dirty trick to speed up this line:
         # record.letter_annotations["phred_quality"] = qualities
         dict.__setitem__(record._per_letter_annotations,
@@ -1795,6 +1988,247 @@ def PairedFastaQualIterator(fasta_handle, qual_handle, alphabet=single_letter_al
     # Done
 
 
+# Trimming and filtering of FASTQ records as (title, sequence, quality)
+# string tuples, as given by FastqGeneralIterator. Each stage is a function
+# taking and returning such a tuple (or None to discard the read).
+
+def quality_window_trimmer(threshold, window=4, offset=SANGER_SCORE_OFFSET):
+    """Make a pipeline stage trimming reads at the first low quality window.
+
+        - threshold - minimum average quality score for each window.
+        - window - number of bases in each window (default 4).
+        - offset - ASCII offset of the quality scores, default 33 for
+          Sanger FASTQ files, use 64 for Illumina 1.3 to 1.7 files.
+
+    Moving along the read from the start, the read is cut at the start of
+    the first window whose average quality is below the threshold (like
+    the SLIDINGWINDOW option of Trimmomatic). Reads with no score below the
+    threshold are returned unchanged without looking at each window.
+
+    >>> trimmer = quality_window_trimmer(20, window=2)
+    >>> print(trimmer(("Test", "ACGTACGT", "IIII+!II")))
+    ('Test', 'ACGT', 'IIII')
+    """
+    if window < 1:
+        raise ValueError("The window must be at least one base")
+    min_letter = chr(threshold + offset)
+    window_total = (threshold + offset) * window
+
+    def trimmer(read):
+        """Trim the read at the first low quality window (PRIVATE)."""
+        title, seq, qual = read
+        if not qual or min(qual) >= min_letter:
+            return read
+        scores = bytearray(_as_bytes(qual))
+        if len(scores) < window:
+            # Treat the whole read as one (short) window
+            if sum(scores) < (threshold + offset) * len(scores):
+                return title, "", ""
+            return read
+        total = sum(scores[:window])
+        for start in range(len(scores) - window + 1):
+            if start:
+                total += scores[start + window - 1] - scores[start - 1]
+            if total < window_total:
+                return title, seq[:start], qual[:start]
+        return read
+    return trimmer
+
+
+def min_length_filter(min_length):
+    """Make a pipeline stage discarding reads shorter than min_length.
+
+    >>> print(min_length_filter(5)(("Test", "ACGT", "IIII")))
+    None
+    """
+    def length_filter(read):
+        """Discard the read if too short (PRIVATE)."""
+        if len(read[1]) < min_length:
+            return None
+        return read
+    return length_filter
+
+
+def max_n_filter(max_n):
+    """Make a pipeline stage discarding reads with more than max_n N bases.
+
+    >>> print(max_n_filter(1)(("Test", "ANNT", "IIII")))
+    None
+    """
+    def n_filter(read):
+        """Discard the read if it has too many N bases (PRIVATE)."""
+        seq = read[1]
+        if seq.count("N") + seq.count("n") > max_n:
+            return None
+        return read
+    return n_filter
+
+
+def adapter_trimmer(adapter, max_mismatches=0, min_overlap=3):
+    """Make a pipeline stage removing an adapter and anything after it.
+
+        - adapter - adapter sequence (string).
+        - max_mismatches - number of mismatches allowed when matching the
+          full adapter (default zero). For a partial match of the start of
+          the adapter at the end of the read, this is reduced in proportion
+          to the overlap length.
+        - min_overlap - shortest partial match of the adapter at the end of
+          the read to remove (default 3).
+
+    The first exact match is found with a single string search, only if that
+    fails (and mismatches are allowed) is each position checked in turn:
+
+    >>> trimmer = adapter_trimmer("AGATCGG")
+    >>> print(trimmer(("Test", "ACGTAGATCGGAAG", "IIIIIIIIIIIIII")))
+    ('Test', 'ACGT', 'IIII')
+    >>> print(trimmer(("Test", "ACGTACGTAGAT", "IIIIIIIIIIII")))
+    ('Test', 'ACGTACGT', 'IIIIIIII')
+    >>> trimmer = adapter_trimmer("AGATCGG", max_mismatches=1)
+    >>> print(trimmer(("Test", "ACGTAGTTCGGAAG", "IIIIIIIIIIIIII")))
+    ('Test', 'ACGT', 'IIII')
+    """
+    adapter = adapter.upper()
+    length = len(adapter)
+    if not adapter:
+        raise ValueError("Need a non-empty adapter sequence")
+    if min_overlap < 1:
+        raise ValueError("The minimum overlap must be at least one base")
+
+    def mismatches(seq, start, limit):
+        """Count mismatches against the adapter, up to limit+1 (PRIVATE)."""
+        count = 0
+        for a, b in zip(seq[start:start + length], adapter):
+            if a != b:
+                count += 1
+                if count > limit:
+                    break
+        return count
+
+    def trimmer(read):
+        """Remove the adapter and anything after it (PRIVATE)."""
+        title, seq, qual = read
+        upper = seq.upper()
+        cut = upper.find(adapter)
+        if cut == -1 and max_mismatches:
+            for start in range(len(upper) - min_overlap + 1):
+                overlap = min(length, len(upper) - start)
+                limit = max_mismatches * overlap // length
+                if mismatches(upper, start, limit) <= limit:
+                    cut = start
+                    break
+        if cut == -1:
+            # Look for an exact partial match at the end of the read
+            for overlap in range(min(length - 1, len(upper)),
+                                 min_overlap - 1, -1):
+                if upper.endswith(adapter[:overlap]):
+                    cut = len(upper) - overlap
+                    break
+        if cut == -1:
+            return read
+        return title, seq[:cut], qual[:cut]
+    return trimmer
+
+
+def _apply_stages(read, stages):
+    """Pass a read through each stage in turn, or return None (PRIVATE)."""
+    for stage in stages:
+        read = stage(read)
+        if read is None:
+            break
+    return read
+
+
+def FastqFilterIterator(reads, stages):
+    """Iterate over FASTQ reads passing through a series of stages.
+
+        - reads - iterator giving (title, sequence, quality) string tuples,
+          e.g. from FastqGeneralIterator.
+        - stages - list of functions, each given a tuple and returning a
+          (possibly trimmed) tuple, or None to discard the read.
+
+    This works with plain strings as given by FastqGeneralIterator, avoiding
+    the overhead of SeqRecord objects and lists of quality scores, which is
+    much faster for simple read preprocessing. For example, here the last
+    read is trimmed to 16 bases, and then discarded as too short:
+
+    >>> with open("Quality/example.fastq") as handle:
+    ...     stages = [quality_window_trimmer(20), min_length_filter(20)]
+    ...     for title, seq, qual in FastqFilterIterator(
+    ...             FastqGeneralIterator(handle), stages):
+    ...         print("%s %s" % (title, seq))
+    EAS54_6_R1_2_1_413_324 CCCTTCTTGTCTTCAGCGTTTCTCC
+    EAS54_6_R1_2_1_540_792 TTGGCAGGCCAAGGCCGATGGATCA
+
+    The stages provided are quality_window_trimmer, min_length_filter,
+    max_n_filter and adapter_trimmer, but any function taking and returning
+    a tuple can be used. See also PairedFastqFilterIterator.
+    """
+    for read in reads:
+        read = _apply_stages(read, stages)
+        if read is not None:
+            yield read
+
+
+def _pair_name(title):
+    """Return the read name without any /1 or /2 suffix (PRIVATE)."""
+    name = title.split(None, 1)[0] if title else ""
+    if name[-2:] in ("/1", "/2"):
+        return name[:-2]
+    return name
+
+
+def PairedFastqFilterIterator(reads1, reads2, stages):
+    """Iterate over paired FASTQ reads passing through a series of stages.
+
+        - reads1 - iterator giving the forward reads as (title, sequence,
+          quality) string tuples, e.g. from FastqGeneralIterator.
+        - reads2 - iterator giving the matching reverse reads.
+        - stages - list of functions, as used in FastqFilterIterator.
+
+    Each read is passed through the stages, and the pair is returned (as a
+    tuple of two read tuples) only if both reads pass. This keeps the two
+    output files in sync. The read names (ignoring any /1 or /2 suffix)
+    must match, and there must be the same number of reads in each file,
+    otherwise a ValueError is raised.
+
+    >>> reads1 = [("r1/1", "ACGTACGT", "IIIIIIII"), ("r2/1", "ACGT", "IIII")]
+    >>> reads2 = [("r1/2", "TTTT", "IIII"), ("r2/2", "GGGGGGGG", "IIIIIIII")]
+    >>> for pair in PairedFastqFilterIterator(reads1, reads2,
+    ...                                       [min_length_filter(4)]):
+    ...     print(pair)
+    (('r1/1', 'ACGTACGT', 'IIIIIIII'), ('r1/2', 'TTTT', 'IIII'))
+    (('r2/1', 'ACGT', 'IIII'), ('r2/2', 'GGGGGGGG', 'IIIIIIII'))
+    """
+    reads1 = iter(reads1)
+    reads2 = iter(reads2)
+    # Using (Python 3 style) zip would not catch any extra reads found in
+    # only one file.
+    while True:
+        try:
+            read1 = next(reads1)
+        except StopIteration:
+            read1 = None
+        try:
+            read2 = next(reads2)
+        except StopIteration:
+            read2 = None
+        if read1 is None and read2 is None:
+            break
+        if read1 is None:
+            raise ValueError("Second FASTQ file has more entries than the first.")
+        if read2 is None:
+            raise ValueError("First FASTQ file has more entries than the second.")
+        if _pair_name(read1[0]) != _pair_name(read2[0]):
+            raise ValueError("Paired FASTQ entries do not match (%s vs %s)."
+                             % (read1[0], read2[0]))
+        read1 = _apply_stages(read1, stages)
+        if read1 is None:
+            continue
+        read2 = _apply_stages(read2, stages)
+        if read2 is not None:
+            yield read1, read2
+
+
 if __name__ == "__main__":
     from Bio._utils import run_doctest
     run_doctest(verbose=0)
@@ -504,7 +504,7 @@ def write(sequences, handle, format):
     return count
 
 
-def parse(handle, format, alphabet=None):
+def parse(handle, format, alphabet=None, workers=None, lightweight=False):
     r"""Turns a sequence file into an iterator returning SeqRecords.
 
         - handle   - handle to the file, or the filename as a string
@@ -513,6 +513,14 @@ def parse(handle, format, alphabet=None):
         - alphabet - optional Alphabet object, useful when the sequence type
           cannot be automatically inferred from the file itself
           (e.g. format="fasta" or "tab")
+        - workers  - optional number of processes to use for parsing
+          (default None meaning parse in this process only). Currently
+          only supported for "fasta" and the FASTQ formats, and requires
+          a filename rather than a handle.
+        - lightweight - optional boolean (default False). If True, rather
+          than SeqRecord objects the iterator returns simple named tuples
+          of (id, description, seq, qualities) using plain strings, with
+          the qualities as a list of integers (or None).
 
     Typical usage, opening a file to read in, and looping over the record(s):
 
@@ -555,6 +563,33 @@ def parse(handle, format, alphabet=None):
     Alpha ACCGGATGTA
     Beta AGGCTCGGTTA
 
+    For very large FASTA or FASTQ files (either uncompressed, or BGZF
+    compressed) you can ask for the file to be split into chunks which are
+    parsed in a pool of worker processes. The records are still returned
+    in the same order as in the file:
+
+    >>> from Bio import SeqIO
+    >>> for record in SeqIO.parse("Quality/example.fastq", "fastq", workers=2):
+    ...     print("%s %s" % (record.id, record.seq))
+    EAS54_6_R1_2_1_413_324 CCCTTCTTGTCTTCAGCGTTTCTCC
+    EAS54_6_R1_2_1_540_792 TTGGCAGGCCAAGGCCGATGGATCA
+    EAS54_6_R1_2_1_443_348 GTTGCTTCTGGCGTGGGTGGGGGGG
+
+    If you only need the identifiers, sequences and any quality scores,
+    parsing is much faster if you skip building the SeqRecord objects (and
+    for rich formats like GenBank, the features and annotations):
+
+    >>> from Bio import SeqIO
+    >>> for rec in SeqIO.parse("Quality/example.fastq", "fastq", lightweight=True):
+    ...     print("%s %s %i" % (rec.id, rec.seq, max(rec.qualities)))
+    EAS54_6_R1_2_1_413_324 CCCTTCTTGTCTTCAGCGTTTCTCC 26
+    EAS54_6_R1_2_1_540_792 TTGGCAGGCCAAGGCCGATGGATCA 26
+    EAS54_6_R1_2_1_443_348 GTTGCTTCTGGCGTGGGTGGGGGGG 26
+
+    In this mode the alphabet is only used for file formats without a
+    dedicated lightweight parser, and for formats like GenBank which may
+    omit the sequence, the seq may be None.
+
     Use the Bio.SeqIO.read(...) function when you expect a single record
     only.
     """
@@ -580,9 +615,26 @@ def parse(handle, format, alphabet=None):
                                      isinstance(alphabet, AlphabetEncoder)):
         raise ValueError("Invalid alphabet, %s" % repr(alphabet))
 
+    if workers is not None and workers != 1:
+        from ._parallel import _ParallelFormats, _parallel_parse  # Lazy import
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("Need a positive integer number of workers, "
+                             "not %r" % workers)
+        if not isinstance(handle, basestring):
+            raise TypeError("Need a filename (not a handle) to use workers")
+        if format not in _ParallelFormats:
+            raise ValueError("Format '%s' does not support workers" % format)
+        for r in _parallel_parse(handle, format, alphabet, workers,
+                                 lightweight):
+            yield r
+        return
+
     with as_handle(handle, mode) as fp:
         # Map the file format to a sequence iterator:
-        if format in _FormatToIterator:
+        if lightweight:
+            from ._lightweight import _lightweight_iterator  # Lazy import
+            i = _lightweight_iterator(fp, format, alphabet)
+        elif format in _FormatToIterator:
             iterator_generator = _FormatToIterator[format]
             if alphabet is None:
                 i = iterator_generator(fp)
@@ -738,7 +790,8 @@ def to_dict(sequences, key_function=None):
     return d
 
 
-def index(filename, format, alphabet=None, key_function=None):
+def index(filename, format, alphabet=None, key_function=None, cache=False,
+          compact=False, lazy=False):
     """Indexes a sequence file and returns a dictionary like object.
 
         - filename - string giving name of file to be indexed
@@ -749,6 +802,14 @@ def index(filename, format, alphabet=None, key_function=None):
         - key_function - Optional callback function which when given a
           SeqRecord identifier string should return a unique
           key for the dictionary.
+        - cache - Optional, either True to save the record offsets in an
+          SQLite file next to the sequence file (the filename plus ".idx"),
+          or the filename to use for this. Default False.
+        - compact - Optional boolean, use a memory efficient (but slower)
+          store for the keys and offsets, useful for hundreds of millions
+          of records. Requires string keys. Default False.
+        - lazy - Optional boolean, for GenBank and EMBL files only read the
+          sequence of a record when it is first used. Default False.
 
     This indexing function will return a dictionary like object, giving the
     SeqRecord objects as values:
@@ -844,6 +905,36 @@ def index(filename, format, alphabet=None, key_function=None):
     to be completely parsed while building the index. Right now this is
     usually avoided.
 
+    For very large files which you index repeatedly, scanning the file each
+    time may be too slow. With the cache option the record offsets are saved
+    to a small SQLite file on the first call, and loaded from there on later
+    calls. The file size, modification time and a hash of the start and end
+    of the file are recorded, and if these change the cache is rebuilt. If
+    the cache filename is already used by something else (such as an
+    index_db database), a ValueError is raised rather than overwriting it.
+    This differs from the index_db() function in that the keys are still held
+    in memory once loaded.
+
+    Holding hundreds of millions of keys in a Python dictionary takes a lot
+    of memory (roughly 150 bytes per key). With the compact option the keys
+    are instead packed into a single byte array, with the offsets in an
+    array of integers, using about 25 bytes per key plus the key itself.
+    Building the index and looking up records is slower in this mode.
+
+    For GenBank and EMBL files with large sequences, where often only the
+    annotation is of interest, the lazy option skips over the sequence lines
+    when a record is accessed. The record's sequence is only read from the
+    file (and then kept) when it is first used:
+
+    >>> from Bio import SeqIO
+    >>> records = SeqIO.index("GenBank/NC_005816.gb", "gb", lazy=True)
+    >>> record = records["NC_005816.1"]
+    >>> len(record), len(record.features)
+    (9609, 41)
+    >>> print(record.seq[:20])
+    TGTAACGAACGGTGCAATAG
+    >>> records.close()
+
     See also: Bio.SeqIO.index_db() and Bio.SeqIO.to_dict()
     """
     # Try and give helpful error messages:
@@ -866,14 +957,30 @@ def index(filename, format, alphabet=None, key_function=None):
         proxy_class = _FormatToRandomAccess[format]
     except KeyError:
         raise ValueError("Unsupported format %r" % format)
+    if lazy and format not in ["gb", "genbank", "embl", "imgt"]:
+        raise ValueError("Lazy sequence loading is only supported for "
+                         "GenBank and EMBL files, not %r" % format)
+    if cache is True:
+        cache_filename = filename + ".idx"
+    elif not cache:
+        cache_filename = None
+    elif isinstance(cache, basestring):
+        cache_filename = cache
+    else:
+        raise TypeError("Need True, False or a filename for the cache")
     repr = "SeqIO.index(%r, %r, alphabet=%r, key_function=%r)" \
         % (filename, format, alphabet, key_function)
-    return _IndexedSeqFileDict(proxy_class(filename, format, alphabet),
-                               key_function, repr, "SeqRecord")
+    if lazy:
+        proxy = proxy_class(filename, format, alphabet, lazy=True)
+    else:
+        proxy = proxy_class(filename, format, alphabet)
+    return _IndexedSeqFileDict(proxy,
+                               key_function, repr, "SeqRecord",
+                               cache_filename, compact)
 
 
 def index_db(index_filename, filenames=None, format=None, alphabet=None,
-             key_function=None):
+             key_function=None, workers=None, progress=None):
     """Index several sequence files and return a dictionary like object.
 
     The index is stored in an SQLite database rather than in memory (as in the
@@ -891,6 +998,12 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
         - key_function - Optional callback function which when given a
           SeqRecord identifier string should return a unique
           key for the dictionary.
+        - workers - Optional number of processes to use for scanning the
+          files when building a new index (default None, meaning scan them
+          in this process only).
+        - progress - Optional callback function, called after each file is
+          added to a new index with the number of files done so far, the
+          total number of files, and the number of records so far.
 
     This indexing function will return a dictionary like object, giving the
     SeqRecord objects as values:
@@ -918,6 +1031,11 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
     BGZF compressed files are supported, and detected automatically. Ordinary
     GZIP compressed files are not supported.
 
+    When indexing many large files, you can use the workers argument to scan
+    the files in parallel (the offsets are written to the database by the
+    main process only). The index can be used in the same way as one built
+    without worker processes.
+
     See also: Bio.SeqIO.index() and Bio.SeqIO.to_dict(), and the Python module
     glob which is useful for building lists of files.
     """
@@ -938,9 +1056,12 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
     if alphabet is not None and not (isinstance(alphabet, Alphabet) or
                                      isinstance(alphabet, AlphabetEncoder)):
         raise ValueError("Invalid alphabet, %s" % repr(alphabet))
+    if workers is not None and (not isinstance(workers, int) or workers < 1):
+        raise ValueError("Need a positive integer number of workers, "
+                         "not %r" % workers)
 
     # Map the file format to a sequence iterator:
-    from ._index import _FormatToRandomAccess  # Lazy import
+    from ._index import _FormatToRandomAccess, _scan_file  # Lazy import
     from Bio.File import _SQLiteManySeqFilesDict
     repr = "SeqIO.index_db(%r, filenames=%r, format=%r, alphabet=%r, key_function=%r)" \
                % (index_filename, filenames, format, alphabet, key_function)
@@ -952,9 +1073,17 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
         else:
             return format in _FormatToRandomAccess
 
+    if workers is not None and workers > 1 and format in _FormatToRandomAccess:
+        from functools import partial
+        scan_function = partial(_scan_file, format, alphabet)
+    else:
+        scan_function = None
+
     return _SQLiteManySeqFilesDict(index_filename, filenames,
                                    proxy_factory, format,
-                                   key_function, repr)
+                                   key_function, repr,
+                                   scan_function=scan_function,
+                                   workers=workers, progress=progress)
 
 
 def convert(in_file, in_format, out_file, out_format, alphabet=None):
@@ -24,11 +24,16 @@ means that using Bio.SeqIO.convert() may be faster, as well as more convenient.
 All these file format specific optimisations are handled by this (private) module.
 """
 
+from Bio._py3k import basestring
+
 from Bio import SeqIO
 # NOTE - Lots of lazy imports further on...
 
 __docformat__ = "restructuredtext en"
 
+# Approximate number of characters of FASTQ to read in one go
+_BLOCK_SIZE = 1024 * 1024
+
 
 def _genbank_convert_fasta(in_handle, out_handle, alphabet=None):
     """Fast GenBank to FASTA (PRIVATE)."""
@@ -48,39 +53,160 @@ def _embl_convert_fasta(in_handle, out_handle, alphabet=None):
     return SeqIO.write(records, out_handle, "fasta")
 
 
+class _PendingLinesHandle(object):
+    """Minimal handle giving some lines, then the rest of a handle (PRIVATE)."""
+
+    def __init__(self, lines, handle):
+        self._lines = lines[::-1]
+        self._handle = handle
+
+    def readline(self):
+        if self._lines:
+            return self._lines.pop()
+        return self._handle.readline()
+
+
+def _fastq_block(lines):
+    """Split a block of four line FASTQ records, or return None (PRIVATE).
+
+    Returns three lists, the title lines (with the leading @), sequence
+    lines, and quality lines (all with their trailing newline). Returns None
+    if the lines are not plain four line FASTQ records which would be parsed
+    by FastqGeneralIterator to the same title, sequence and quality strings.
+    """
+    titles = lines[0::4]
+    seqs = lines[1::4]
+    pluses = lines[2::4]
+    quals = lines[3::4]
+    count = len(titles)
+    text = "".join(titles)
+    if not text.startswith("@") or text.count("\n@") != count - 1:
+        return None
+    text = "".join(lines)
+    if "\r" in text or " \n" in text or "\t\n" in text:
+        # The parser would strip this trailing whitespace
+        return None
+    text = "".join(seqs)
+    if " " in text or "\t" in text:
+        return None
+    if pluses.count("+\n") != count:
+        # Check any repeated titles on the plus lines
+        for title, plus in zip(titles, pluses):
+            if plus[:1] != "+" or (plus != "+\n" and plus[1:] != title[1:]):
+                return None
+    if list(map(len, seqs)) != list(map(len, quals)):
+        return None
+    return titles, seqs, quals
+
+
+def _fastq_blocks(handle):
+    """Iterate over FASTQ records in blocks, as lists of lines (PRIVATE).
+
+    Yields tuples of three lists, the title lines (with the leading @), the
+    sequence lines, and the quality lines (all with their trailing newline).
+
+    Plain FASTQ files with four lines per record are read in large blocks,
+    without looking at each record in turn. If anything unusual is found
+    (e.g. line wrapping, or trailing whitespace), the rest of the file is
+    parsed with FastqGeneralIterator instead, which will also raise any
+    errors in the file format.
+    """
+    from Bio.SeqIO.QualityIO import FastqGeneralIterator
+    pending = []
+    while True:
+        lines = handle.readlines(_BLOCK_SIZE)
+        if not lines:
+            if len(pending) == 4:
+                # The last record in the file
+                block = _fastq_block(pending)
+                if block is not None:
+                    yield block
+                    pending = []
+            break
+        if not isinstance(lines[0], basestring):
+            # e.g. binary mode handle, let FastqGeneralIterator complain
+            pending.extend(lines)
+            break
+        if pending:
+            lines = pending + lines
+        if not lines[-1].endswith("\n"):
+            # Can only happen at the end of the file
+            lines[-1] += "\n"
+        # Hold back the last full record and any partial record, since
+        # the lines which follow may belong to it (e.g. line wrapping)
+        keep = 4 + len(lines) % 4
+        pending = lines[-keep:]
+        del lines[-keep:]
+        if not lines:
+            continue
+        block = _fastq_block(lines)
+        if block is None or pending[0][:1] != "@":
+            pending = lines + pending
+            break
+        yield block
+    if pending:
+        # Let the full parser deal with the rest of the file
+        titles = []
+        seqs = []
+        quals = []
+        try:
+            for title, seq, qual in FastqGeneralIterator(
+                    _PendingLinesHandle(pending, handle)):
+                titles.append("@%s\n" % title)
+                seqs.append(seq + "\n")
+                quals.append(qual + "\n")
+                if len(titles) >= 10000:
+                    yield titles, seqs, quals
+                    titles = []
+                    seqs = []
+                    quals = []
+        except ValueError as err:
+            # Output the valid records before the problem, as when
+            # converting one record at a time
+            if titles:
+                yield titles, seqs, quals
+            raise err
+        if titles:
+            yield titles, seqs, quals
+
+
 def _fastq_generic(in_handle, out_handle, mapping):
     """FASTQ helper function where can't have data loss by truncation (PRIVATE)."""
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
-    # For real speed, don't even make SeqRecord and Seq objects!
-    count = 0
-    null = chr(0)
-    for title, seq, old_qual in FastqGeneralIterator(in_handle):
-        count += 1
-        # map the qual...
-        qual = old_qual.translate(mapping)
-        if null in qual:
-            raise ValueError("Invalid character in quality string")
-        out_handle.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
-    return count
+    return _fastq_generic2(in_handle, out_handle, mapping, None, None)
 
 
 def _fastq_generic2(in_handle, out_handle, mapping, truncate_char, truncate_msg):
-    """FASTQ helper function where there could be data loss by truncation (PRIVATE)."""
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
+    """FASTQ helper function where there could be data loss by truncation (PRIVATE).
+
+    The quality strings for a whole block of records are translated with
+    a single call, and written out with the titles and sequences in one go.
+    """
     # For real speed, don't even make SeqRecord and Seq objects!
     count = 0
     null = chr(0)
-    for title, seq, old_qual in FastqGeneralIterator(in_handle):
-        count += 1
+    # Keep the newlines between the quality strings
+    mapping = mapping[:10] + "\n" + mapping[11:]
+    for titles, seqs, quals in _fastq_blocks(in_handle):
         # map the qual...
-        qual = old_qual.translate(mapping)
-        if null in qual:
+        qual = "".join(quals).translate(mapping)
+        quals = qual.splitlines(True)
+        if null in qual or len(quals) != len(titles):
+            # Write out the good records before the bad one
+            good = qual.count("\n", 0, max(0, qual.find(null)))
+            for i in range(good):
+                out_handle.write(titles[i] + seqs[i] + "+\n" + quals[i])
             raise ValueError("Invalid character in quality string")
-        if truncate_char in qual:
-            qual = qual.replace(truncate_char, chr(126))
+        if truncate_char and truncate_char in qual:
+            quals = qual.replace(truncate_char, chr(126)).splitlines(True)
             import warnings
             warnings.warn(truncate_msg)
-        out_handle.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
+        lines = [None] * (4 * len(titles))
+        lines[0::4] = titles
+        lines[1::4] = seqs
+        lines[2::4] = ["+\n"] * len(titles)
+        lines[3::4] = quals
+        out_handle.write("".join(lines))
+        count += len(titles)
     return count
 
 
@@ -243,15 +369,24 @@ def _fastq_convert_fasta(in_handle, out_handle, alphabet=None):
     NOTE - This does NOT check the characters used in the FASTQ quality string
     are valid!
     """
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
     # For real speed, don't even make SeqRecord and Seq objects!
     count = 0
-    for title, seq, qual in FastqGeneralIterator(in_handle):
-        count += 1
-        out_handle.write(">%s\n" % title)
-        # Do line wrapping
-        for i in range(0, len(seq), 60):
-            out_handle.write(seq[i:i + 60] + "\n")
+    for titles, seqs, quals in _fastq_blocks(in_handle):
+        count += len(titles)
+        titles = [">" + title[1:] for title in titles]
+        if max(map(len, seqs)) <= 61 and "\n" not in seqs:
+            # No line wrapping needed, and no empty sequences
+            lines = [None] * (2 * len(titles))
+            lines[0::2] = titles
+            lines[1::2] = seqs
+            out_handle.write("".join(lines))
+            continue
+        for title, seq in zip(titles, seqs):
+            out_handle.write(title)
+            # Do line wrapping
+            seq = seq[:-1]
+            for i in range(0, len(seq), 60):
+                out_handle.write(seq[i:i + 60] + "\n")
     return count
 
 
@@ -264,12 +399,12 @@ def _fastq_convert_tab(in_handle, out_handle, alphabet=None):
     NOTE - This does NOT check the characters used in the FASTQ quality string
     are valid!
     """
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
     # For real speed, don't even make SeqRecord and Seq objects!
     count = 0
-    for title, seq, qual in FastqGeneralIterator(in_handle):
-        count += 1
-        out_handle.write("%s\t%s\n" % (title.split(None, 1)[0], seq))
+    for titles, seqs, quals in _fastq_blocks(in_handle):
+        count += len(titles)
+        out_handle.write("".join("%s\t%s" % (title[1:].split(None, 1)[0], seq)
+                                 for title, seq in zip(titles, seqs)))
     return count
 
 
@@ -279,32 +414,31 @@ def _fastq_convert_qual(in_handle, out_handle, mapping):
     Mapping should be a dictionary mapping expected ASCII characters from the
     FASTQ quality string to PHRED quality scores (as strings).
     """
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
     # For real speed, don't even make SeqRecord and Seq objects!
     count = 0
-    for title, seq, qual in FastqGeneralIterator(in_handle):
-        count += 1
-        out_handle.write(">%s\n" % title)
-        # map the qual... note even with Sanger encoding max 2 digits
-        try:
-            qualities_strs = [mapping[ascii] for ascii in qual]
-        except KeyError:
-            raise ValueError("Invalid character in quality string")
-        data = " ".join(qualities_strs)
-        while len(data) > 60:
-            # Know quality scores are either 1 or 2 digits, so there
-            # must be a space in any three consecutive characters.
-            if data[60] == " ":
-                out_handle.write(data[:60] + "\n")
-                data = data[61:]
-            elif data[59] == " ":
-                out_handle.write(data[:59] + "\n")
-                data = data[60:]
-            else:
-                assert data[58] == " ", "Internal logic failure in wrapping"
-                out_handle.write(data[:58] + "\n")
-                data = data[59:]
-        out_handle.write(data + "\n")
+    for titles, seqs, quals in _fastq_blocks(in_handle):
+        for title, qual in zip(titles, quals):
+            count += 1
+            out_handle.write(">" + title[1:])
+            # map the qual... note even with Sanger encoding max 2 digits
+            try:
+                data = " ".join(map(mapping.__getitem__, qual[:-1]))
+            except KeyError:
+                raise ValueError("Invalid character in quality string")
+            while len(data) > 60:
+                # Know quality scores are either 1 or 2 digits, so there
+                # must be a space in any three consecutive characters.
+                if data[60] == " ":
+                    out_handle.write(data[:60] + "\n")
+                    data = data[61:]
+                elif data[59] == " ":
+                    out_handle.write(data[:59] + "\n")
+                    data = data[60:]
+                else:
+                    assert data[58] == " ", "Internal logic failure in wrapping"
+                    out_handle.write(data[:58] + "\n")
+                    data = data[59:]
+            out_handle.write(data + "\n")
     return count
 
 
@@ -31,14 +31,18 @@ from Bio._py3k import _bytes_to_string, _as_bytes
 
 from Bio import SeqIO
 from Bio import Alphabet
+from Bio.Seq import Seq, UnknownSeq
 from Bio.File import _IndexedSeqFileProxy, _open_for_random_access
 
 __docformat__ = "restructuredtext en"
 
+_end_of_record = _as_bytes("//")
+
 
 class SeqFileRandomAccess(_IndexedSeqFileProxy):
     def __init__(self, filename, format, alphabet):
         self._handle = _open_for_random_access(filename)
+        self._filename = filename
         self._alphabet = alphabet
         self._format = format
         # Load the parser class/function once an avoid the dict lookup in each
@@ -232,8 +236,113 @@ class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
 # Fiddly indexers: GenBank, EMBL, ... #
 #######################################
 
-class GenBankRandomAccess(SequentialSeqFileRandomAccess):
+class _LazySeq(Seq):
+    """Sequence of an indexed GenBank/EMBL record, loaded on demand (PRIVATE).
+
+    This holds the offset of the sequence block in the file, and the expected
+    length (from the LOCUS or ID line). The sequence lines are only read and
+    parsed when the sequence data itself is first needed, e.g. str(seq).
+    """
+    def __init__(self, proxy, offset, length, alphabet):
+        self._proxy = proxy
+        self._offset = offset
+        self._length = length
+        self._loaded = None
+        self.alphabet = alphabet
+
+    @property
+    def _data(self):
+        """The sequence as a string, read from the file when first used (PRIVATE)."""
+        if self._loaded is None:
+            self._loaded = self._proxy._get_sequence(self._offset)
+        return self._loaded
+
+    def __len__(self):
+        """Returns the length of the sequence, use len(my_seq)."""
+        if self._loaded is None:
+            return self._length
+        return len(self._loaded)
+
+
+class _InsdcRandomAccess(SequentialSeqFileRandomAccess):
+    """Indexed dictionary like access to GenBank or EMBL files (PRIVATE).
+
+    With the lazy option, the sequence block at the end of each record is
+    skipped when the record is accessed, and the record's sequence is given
+    as a _LazySeq object which reads it from the file only when needed.
+    This saves time and memory if only the annotation is wanted.
+    """
+    # Start of the line before the sequence lines (defined in sub classes):
+    _sequence_header = None
+
+    def __init__(self, filename, format, alphabet, lazy=False):
+        SequentialSeqFileRandomAccess.__init__(self, filename, format, alphabet)
+        self._lazy = lazy
+
+    def get(self, offset):
+        """Returns SeqRecord."""
+        if not self._lazy:
+            return SequentialSeqFileRandomAccess.get(self, offset)
+        handle = self._handle
+        marker_re = self._marker_re
+        handle.seek(offset)
+        lines = [handle.readline()]
+        seq_offset = None
+        while True:
+            line_offset = handle.tell()
+            line = handle.readline()
+            if marker_re.match(line) or not line:
+                break
+            if line.startswith(self._sequence_header):
+                next_line = handle.readline()
+                if next_line.startswith(_end_of_record):
+                    # No sequence lines, so nothing to load later
+                    lines.extend([line, next_line])
+                    break
+                seq_offset = line_offset
+                lines.extend([line, _end_of_record + _as_bytes("\n")])
+                break
+            lines.append(line)
+        record = self._parse(StringIO(_bytes_to_string(_as_bytes("").join(lines))))
+        if seq_offset is None:
+            return record
+        if not isinstance(record.seq, UnknownSeq) or \
+                isinstance(Alphabet._get_base_alphabet(record.seq.alphabet),
+                           Alphabet.RNAAlphabet):
+            # Either the length isn't in the header, or the alphabet depends
+            # on the sequence itself (RNA records with T rather than U)
+            return SequentialSeqFileRandomAccess.get(self, offset)
+        record.seq = _LazySeq(self, seq_offset, len(record.seq),
+                              record.seq.alphabet)
+        return record
+
+    def _get_sequence(self, offset):
+        """Return the sequence starting from the header line at offset (PRIVATE)."""
+        from Bio.GenBank import Scanner
+        handle = self._handle
+        marker_re = self._marker_re
+        handle.seek(offset)
+        first_line = handle.readline()
+        lines = []
+        while True:
+            line = handle.readline()
+            if marker_re.match(line) or not line:
+                break
+            lines.append(line)
+            if line.startswith(_end_of_record):
+                break
+        scanner = getattr(Scanner, self._scanner_name)()
+        scanner.set_handle(StringIO(_bytes_to_string(_as_bytes("").join(lines))))
+        scanner.line = _bytes_to_string(first_line).rstrip()
+        misc_lines, sequence = scanner.parse_footer()
+        return sequence.upper()
+
+
+class GenBankRandomAccess(_InsdcRandomAccess):
     """Indexed dictionary like access to a GenBank file."""
+    _sequence_header = _as_bytes("ORIGIN")
+    _scanner_name = "GenBankScanner"
+
     def __iter__(self):
         handle = self._handle
         handle.seek(0)
@@ -274,8 +383,17 @@ class GenBankRandomAccess(SequentialSeqFileRandomAccess):
         assert not line, repr(line)
 
 
-class EmblRandomAccess(SequentialSeqFileRandomAccess):
+class EmblRandomAccess(_InsdcRandomAccess):
     """Indexed dictionary like access to an EMBL file."""
+    _sequence_header = _as_bytes("SQ ")
+
+    def __init__(self, filename, format, alphabet, lazy=False):
+        _InsdcRandomAccess.__init__(self, filename, format, alphabet, lazy)
+        if format == "imgt":
+            self._scanner_name = "_ImgtScanner"
+        else:
+            self._scanner_name = "EmblScanner"
+
     def __iter__(self):
         handle = self._handle
         handle.seek(0)
@@ -637,6 +755,18 @@ class FastqRandomAccess(SeqFileRandomAccess):
 
 ###############################################################################
 
+def _scan_file(format, alphabet, filename):
+    """Return a list of the (key, offset, length) tuples for a file (PRIVATE).
+
+    Used by Bio.SeqIO.index_db(...) to scan files in worker processes.
+    """
+    proxy = _FormatToRandomAccess[format](filename, format, alphabet)
+    try:
+        return list(proxy)
+    finally:
+        proxy._handle.close()
+
+
 _FormatToRandomAccess = {"ace": SequentialSeqFileRandomAccess,
                          "embl": EmblRandomAccess,
                          "fasta": SequentialSeqFileRandomAccess,
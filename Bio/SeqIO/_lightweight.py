@@ -0,0 +1,283 @@
+# Copyright 2016 by Peter Cock.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Lightweight parsing of sequence files as simple tuples (PRIVATE).
+
+You are not expected to access this module, or any of its code, directly. This
+is all handled internally by the Bio.SeqIO.parse(...) function when given the
+optional lightweight argument.
+
+For high throughput work, much of the cost of parsing is in building the
+SeqRecord, Seq and Alphabet objects (and for rich formats like GenBank, the
+features and annotations). Following the example of the SimpleFastaParser and
+FastqGeneralIterator functions, here we return SimpleRecord tuples holding
+just the record identifier, description, sequence string, and any per-letter
+quality scores (as a list of integers, otherwise None).
+
+Formats without a dedicated lightweight parser fall back on the full parser,
+converting each SeqRecord into a SimpleRecord.
+"""
+
+from __future__ import print_function
+
+import struct
+from collections import namedtuple, OrderedDict
+
+from Bio._py3k import _bytes_to_string
+
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+from Bio.SeqIO.QualityIO import FastqGeneralIterator
+from Bio.SeqIO.QualityIO import SANGER_SCORE_OFFSET, SOLEXA_SCORE_OFFSET
+
+__docformat__ = "restructuredtext en"
+
+
+SimpleRecord = namedtuple("SimpleRecord",
+                          ["id", "description", "seq", "qualities"])
+
+
+def _fasta_lightweight(handle):
+    """Iterate over FASTA records as SimpleRecord tuples (PRIVATE)."""
+    for title, sequence in SimpleFastaParser(handle):
+        try:
+            first_word = title.split(None, 1)[0]
+        except IndexError:
+            first_word = ""
+        yield SimpleRecord(first_word, title, sequence, None)
+
+
+def _fastq_lightweight(offset):
+    """Make a FASTQ parser using the given quality offset (PRIVATE)."""
+    q_mapping = dict()
+    for letter in range(0, 255):
+        q_mapping[chr(letter)] = letter - offset
+
+    def parser(handle):
+        """Iterate over FASTQ records as SimpleRecord tuples (PRIVATE)."""
+        for title, sequence, quality in FastqGeneralIterator(handle):
+            yield SimpleRecord(title.split(None, 1)[0] if title else "",
+                               title, sequence,
+                               [q_mapping[letter] for letter in quality])
+    return parser
+
+
+def _tab_lightweight(handle):
+    """Iterate over tab separated records as SimpleRecord tuples (PRIVATE)."""
+    for line in handle:
+        try:
+            title, seq = line.split("\t")
+        except ValueError:
+            if line.strip() == "":
+                continue
+            raise ValueError("Each line should have one tab separating the" +
+                             " title and sequence, this line has %i tabs: %s"
+                             % (line.count("\t"), repr(line)))
+        yield SimpleRecord(title.strip(), "", seq.strip(), None)
+
+
+def _insdc_lightweight(scanner_class):
+    """Make a GenBank/EMBL parser using the given scanner class (PRIVATE)."""
+    def parser(handle):
+        """Iterate over INSDC records as SimpleRecord tuples (PRIVATE)."""
+        from Bio.GenBank import _SimpleRecordConsumer
+        scanner = scanner_class(debug=0)
+        while True:
+            consumer = _SimpleRecordConsumer()
+            # Feature table lines are skipped without being parsed
+            if not scanner.feed(handle, consumer, do_features=False):
+                break
+            id, description, sequence = consumer.data
+            yield SimpleRecord(id, description, sequence, None)
+    return parser
+
+
+def _swiss_lightweight(handle):
+    """Iterate over SwissProt records as SimpleRecord tuples (PRIVATE)."""
+    from Bio import SwissProt
+    for swiss_record in SwissProt.parse(handle):
+        yield SimpleRecord(swiss_record.accessions[0],
+                           swiss_record.description,
+                           swiss_record.sequence, None)
+
+
+def _stockholm_lightweight(handle):
+    """Iterate over Stockholm alignment rows as SimpleRecord tuples (PRIVATE).
+
+    As in the full parser, the description is taken from any #=GS DE lines
+    (matching either the full identifier or without the /start-end suffix),
+    defaulting to the identifier.
+    """
+    line = handle.readline()
+    while line:
+        if line.strip() != "# STOCKHOLM 1.0":
+            raise ValueError("Did not find STOCKHOLM header")
+        seqs = OrderedDict()
+        descriptions = {}
+        while True:
+            line = handle.readline()
+            if not line:
+                break
+            line = line.strip()
+            if line == "# STOCKHOLM 1.0":
+                break
+            elif line == "//" or not line:
+                pass
+            elif line[0] != "#":
+                parts = [x.strip() for x in line.split(" ", 1)]
+                if len(parts) != 2:
+                    raise ValueError("Could not split line into identifier "
+                                     + "and sequence:\n" + line)
+                id, seq = parts
+                seqs[id] = seqs.get(id, "") + seq.replace(".", "-")
+            elif line[:5] == "#=GS ":
+                id, feature, text = line[5:].strip().split(None, 2)
+                if feature == "DE":
+                    descriptions.setdefault(id, []).append(text)
+        for id, seq in seqs.items():
+            if id in descriptions:
+                description = "\n".join(descriptions[id])
+            elif "/" in id and id.rsplit("/", 1)[0] in descriptions:
+                description = "\n".join(descriptions[id.rsplit("/", 1)[0]])
+            else:
+                description = id
+            yield SimpleRecord(id, description, seq, None)
+
+
+def _sff_lightweight(trim):
+    """Make an SFF parser, optionally applying the trimming (PRIVATE)."""
+    def parser(handle):
+        """Iterate over SFF reads as SimpleRecord tuples (PRIVATE).
+
+        This skips over the flowgram values and flow index, only unpacking
+        the read name, bases, qualities and clipping values.
+        """
+        from Bio.SeqIO.SffIO import _sff_file_header
+        header_length, index_offset, index_length, number_of_reads, \
+            number_of_flows_per_read, flow_chars, key_sequence \
+            = _sff_file_header(handle)
+        read_header_fmt = '>2HI4H'
+        read_header_size = struct.calcsize(read_header_fmt)
+        read_flow_size = 2 * number_of_flows_per_read
+        for read in range(number_of_reads):
+            if index_offset and handle.tell() == index_offset:
+                offset = index_offset + index_length
+                if offset % 8:
+                    offset += 8 - (offset % 8)
+                handle.seek(offset)
+                index_offset = 0
+            read_header_length, name_length, seq_len, clip_qual_left, \
+                clip_qual_right, clip_adapter_left, clip_adapter_right \
+                = struct.unpack(read_header_fmt, handle.read(read_header_size))
+            if read_header_length < 10 or read_header_length % 8 != 0:
+                raise ValueError("Malformed read header, says length is %i"
+                                 % read_header_length)
+            name = _bytes_to_string(handle.read(name_length))
+            handle.read(read_header_length - read_header_size - name_length)
+            # Skip the flowgram values and the flow index
+            handle.read(read_flow_size + seq_len)
+            seq = _bytes_to_string(handle.read(seq_len))
+            quals = list(bytearray(handle.read(seq_len)))
+            padding = (read_flow_size + seq_len * 3) % 8
+            if padding:
+                handle.read(8 - padding)
+            # Same clipping rules as _sff_read_seq_record
+            clip_left = max(clip_qual_left, clip_adapter_left)
+            if clip_left:
+                clip_left -= 1
+            if clip_qual_right:
+                if clip_adapter_right:
+                    clip_right = min(clip_qual_right, clip_adapter_right)
+                else:
+                    clip_right = clip_qual_right
+            elif clip_adapter_right:
+                clip_right = clip_adapter_right
+            else:
+                clip_right = seq_len
+            if trim:
+                if clip_left >= clip_right:
+                    seq = ""
+                    quals = []
+                else:
+                    seq = seq[clip_left:clip_right].upper()
+                    quals = quals[clip_left:clip_right]
+            elif clip_left >= clip_right:
+                seq = seq.lower()
+            else:
+                seq = seq[:clip_left].lower() + \
+                    seq[clip_left:clip_right].upper() + \
+                    seq[clip_right:].lower()
+            yield SimpleRecord(name, "", seq, quals)
+    return parser
+
+
+def _abi_lightweight(handle):
+    """Iterate over an ABI trace file as a SimpleRecord tuple (PRIVATE)."""
+    from Bio.SeqIO.AbiIO import _abi_parse_header, _HEADFMT
+    handle.seek(0)
+    marker = handle.read(4)
+    if not marker:
+        return
+    if marker != b"ABIF":
+        raise IOError('File should start ABIF, not %r' % marker)
+    header = struct.unpack(_HEADFMT, handle.read(struct.calcsize(_HEADFMT)))
+    sample_id = seq = qual = None
+    for tag_name, tag_number, tag_data in _abi_parse_header(header, handle):
+        key = tag_name + str(tag_number)
+        if key == 'PBAS2':
+            seq = tag_data
+        elif key == 'PCON2':
+            qual = [ord(val) for val in tag_data]
+        elif key == 'SMPL1':
+            sample_id = tag_data
+    yield SimpleRecord(sample_id, "", seq, qual)
+
+
+def _generic_lightweight(handle, format, alphabet=None):
+    """Iterate over SeqRecords from the full parser as SimpleRecords (PRIVATE)."""
+    from Bio import SeqIO
+    for record in SeqIO.parse(handle, format, alphabet):
+        qualities = record.letter_annotations.get("phred_quality",
+                    record.letter_annotations.get("solexa_quality", None))
+        yield SimpleRecord(record.id, record.description,
+                           str(record.seq), qualities)
+
+
+def _lightweight_iterator(handle, format, alphabet=None):
+    """Iterate over the records in a handle as SimpleRecord tuples (PRIVATE).
+
+    The alphabet is only used by formats lacking a dedicated lightweight
+    parser (where the full parser is used instead).
+    """
+    try:
+        parser = _FormatToLightweightIterator[format]
+    except KeyError:
+        return _generic_lightweight(handle, format, alphabet)
+    return parser(handle)
+
+
+def _lazy_insdc(name):
+    """Make an INSDC parser without importing Bio.GenBank until used (PRIVATE)."""
+    def parser(handle):
+        """Iterate over INSDC records as SimpleRecord tuples (PRIVATE)."""
+        from Bio.GenBank import Scanner
+        return _insdc_lightweight(getattr(Scanner, name))(handle)
+    return parser
+
+
+_FormatToLightweightIterator = {"fasta": _fasta_lightweight,
+                                "fastq": _fastq_lightweight(SANGER_SCORE_OFFSET),
+                                "fastq-sanger": _fastq_lightweight(SANGER_SCORE_OFFSET),
+                                "fastq-solexa": _fastq_lightweight(SOLEXA_SCORE_OFFSET),
+                                "fastq-illumina": _fastq_lightweight(SOLEXA_SCORE_OFFSET),
+                                "tab": _tab_lightweight,
+                                "gb": _lazy_insdc("GenBankScanner"),
+                                "genbank": _lazy_insdc("GenBankScanner"),
+                                "embl": _lazy_insdc("EmblScanner"),
+                                "imgt": _lazy_insdc("_ImgtScanner"),
+                                "swiss": _swiss_lightweight,
+                                "stockholm": _stockholm_lightweight,
+                                "sff": _sff_lightweight(False),
+                                "sff-trim": _sff_lightweight(True),
+                                "abi": _abi_lightweight,
+                                }
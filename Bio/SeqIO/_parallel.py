@@ -0,0 +1,266 @@
+# Copyright 2016 by Peter Cock.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Parallel parsing of large sequence files (PRIVATE).
+
+You are not expected to access this module, or any of its code, directly. This
+is all handled internally by the Bio.SeqIO.parse(...) function when given the
+optional workers argument.
+
+The basic idea is that we split the file into chunks of roughly equal size,
+and have a pool of worker processes each parse one chunk at a time into a list
+of SeqRecord objects. These lists are then passed back to the main process and
+yielded in the original file order.
+
+The split points will not generally fall on record boundaries, so each worker
+must find the first record starting within its chunk, and parse any record
+which starts within its chunk (even if this runs on into the next chunk). A
+record belongs to a chunk if the line it starts on begins after the chunk
+start, but not after the chunk end. This is easy for FASTA, where only the
+title lines start with ">", but for FASTQ both the title lines and quality
+lines may start with "@" (and with line wrapping, so might the sequence and
+quality lines start with "+"). Here we treat a candidate "@" line as the start
+of a record only if both it and the record following it can be parsed.
+
+For BGZF compressed files, the chunks are taken as runs of BGZF blocks, and
+the chunk boundaries are always on a block boundary. Ordinary GZIP files are
+not supported.
+"""
+
+from __future__ import print_function
+
+import os
+from collections import deque
+
+from Bio._py3k import StringIO
+from Bio._py3k import _bytes_to_string, _as_bytes
+
+from Bio import bgzf
+from Bio.File import _open_for_random_access
+
+__docformat__ = "restructuredtext en"
+
+# Target size of each chunk (in uncompressed bytes)
+_CHUNK_SIZE = 4 * 1024 * 1024
+
+_at_char = _as_bytes("@")
+_plus_char = _as_bytes("+")
+_gt_char = _as_bytes(">")
+_empty_bytes = _as_bytes("")
+
+
+def _chunk_offsets(filename, chunk_size=None):
+    """Split a plain or BGZF file into chunks (PRIVATE).
+
+    Returns (offset, length) tuples where the offset is a raw file offset
+    or BGZF virtual offset suitable for seeking to the start of the chunk,
+    and the length is the size of the chunk's uncompressed data in bytes.
+    The final chunk is given a length of None, meaning read to the end of
+    the file.
+    """
+    if chunk_size is None:
+        chunk_size = _CHUNK_SIZE
+    handle = _open_for_random_access(filename)
+    is_bgzf = isinstance(handle, bgzf.BgzfReader)
+    handle.close()
+    chunks = []
+    if is_bgzf:
+        with open(filename, "rb") as handle:
+            chunk_start = 0
+            chunk_len = 0
+            for start, raw_len, data_len in bgzf._bgzf_block_sizes(handle):
+                if chunk_len >= chunk_size:
+                    chunks.append((bgzf.make_virtual_offset(chunk_start, 0),
+                                   chunk_len))
+                    chunk_start = start
+                    chunk_len = 0
+                chunk_len += data_len
+            chunks.append((bgzf.make_virtual_offset(chunk_start, 0), None))
+    else:
+        size = os.path.getsize(filename)
+        offset = 0
+        while offset + chunk_size < size:
+            chunks.append((offset, chunk_size))
+            offset += chunk_size
+        chunks.append((offset, None))
+    return chunks
+
+
+class _ChunkLines(object):
+    """Lines read on demand from a handle, with their chunk offsets (PRIVATE).
+
+    Indexing past the end of the file gives an empty bytes string.
+    """
+    def __init__(self, handle):
+        self._readline = handle.readline
+        self._pos = 0
+        self.lines = []
+        self.starts = []
+
+    def __getitem__(self, i):
+        lines = self.lines
+        while len(lines) <= i:
+            line = self._readline()
+            if not line:
+                return _empty_bytes
+            lines.append(line)
+            self.starts.append(self._pos)
+            self._pos += len(line)
+        return lines[i]
+
+    def beyond(self, i, length):
+        """Does line i start beyond the end of the chunk (or the file)?"""
+        if not self[i]:
+            return True
+        return length is not None and self.starts[i] > length
+
+
+def _fasta_chunk(handle, first, length):
+    """Return the raw FASTA records starting in this chunk (PRIVATE)."""
+    lines = _ChunkLines(handle)
+    i = 0
+    if not first:
+        # Skip the partial line belonging to the previous chunk
+        i = 1
+    # Find the first title line
+    while not lines.beyond(i, length):
+        if lines[i][:1] == _gt_char:
+            break
+        i += 1
+    if lines.beyond(i, length):
+        return _empty_bytes
+    start = i
+    while True:
+        i += 1
+        line = lines[i]
+        if not line:
+            break
+        if line[:1] == _gt_char and lines.beyond(i, length):
+            break
+    return _empty_bytes.join(lines.lines[start:i])
+
+
+def _fastq_record_end(lines, i):
+    """Return index of line after the FASTQ record at line i, or None (PRIVATE).
+
+    This mirrors the logic in FastqGeneralIterator, returning None if
+    line i does not appear to start a valid FASTQ record.
+    """
+    line = lines[i]
+    if line[:1] != _at_char:
+        return None
+    title = line[1:].rstrip()
+    seq_len = 0
+    i += 1
+    while True:
+        line = lines[i]
+        if not line:
+            return None
+        if line[:1] == _plus_char:
+            break
+        seq_len += len(line.rstrip())
+        i += 1
+    second_title = line[1:].rstrip()
+    if second_title and second_title != title:
+        return None
+    i += 1
+    qual_len = len(lines[i].rstrip())
+    i += 1
+    while True:
+        line = lines[i]
+        if not line:
+            break
+        if line[:1] == _at_char and qual_len >= seq_len:
+            break
+        qual_len += len(line.rstrip())
+        i += 1
+    if qual_len != seq_len:
+        return None
+    return i
+
+
+def _fastq_chunk(handle, first, length):
+    """Return the raw FASTQ records starting in this chunk (PRIVATE)."""
+    lines = _ChunkLines(handle)
+    i = 0
+    if not first:
+        # Skip the partial line belonging to the previous chunk
+        i = 1
+    # Find the first title line, for which we must resolve the ambiguity
+    # with quality lines starting with "@" by checking the candidate record
+    # and the one after it can be parsed.
+    while not lines.beyond(i, length):
+        if lines[i][:1] == _at_char:
+            if first:
+                break
+            end = _fastq_record_end(lines, i)
+            if end is not None and \
+                    (not lines[end] or _fastq_record_end(lines, end) is not None):
+                break
+        i += 1
+    if lines.beyond(i, length):
+        return _empty_bytes
+    start = i
+    while not lines.beyond(i, length):
+        end = _fastq_record_end(lines, i)
+        if end is None:
+            # Let the real parser give a helpful error message
+            while lines[i]:
+                i += 1
+            break
+        i = end
+    return _empty_bytes.join(lines.lines[start:i])
+
+
+def _parse_chunk(filename, format, alphabet, offset, length,
+                 lightweight=False):
+    """Parse the records starting within one chunk of a file (PRIVATE).
+
+    Returns a list of SeqRecord objects (or SimpleRecord tuples if using
+    lightweight mode).
+    """
+    from Bio import SeqIO
+    handle = _open_for_random_access(filename)
+    try:
+        handle.seek(offset)
+        if format == "fasta":
+            data = _fasta_chunk(handle, offset == 0, length)
+        else:
+            data = _fastq_chunk(handle, offset == 0, length)
+    finally:
+        handle.close()
+    if not data:
+        return []
+    return list(SeqIO.parse(StringIO(_bytes_to_string(data)), format, alphabet,
+                            lightweight=lightweight))
+
+
+def _parallel_parse(filename, format, alphabet, workers, lightweight=False):
+    """Iterate over SeqRecords, parsing chunks in a process pool (PRIVATE).
+
+    The records are returned in their original file order.
+    """
+    import multiprocessing
+    chunks = _chunk_offsets(filename)
+    pool = multiprocessing.Pool(workers)
+    try:
+        # Keep a limited number of chunks in flight to bound memory use
+        pending = deque()
+        for offset, length in chunks:
+            pending.append(pool.apply_async(
+                _parse_chunk, (filename, format, alphabet, offset, length,
+                               lightweight)))
+            if len(pending) >= 2 * workers:
+                for record in pending.popleft().get():
+                    yield record
+        while pending:
+            for record in pending.popleft().get():
+                yield record
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+_ParallelFormats = ["fasta", "fastq", "fastq-sanger",
+                    "fastq-solexa", "fastq-illumina"]
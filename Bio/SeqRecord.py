@@ -7,6 +7,8 @@
 # as part of this package.
 """Represent a Sequence Record, a sequence with annotation."""
 
+from array import array
+from bisect import bisect_right
 
 from Bio._py3k import basestring
 
@@ -20,14 +22,44 @@ __docformat__ = "restructuredtext en"  # Simple markup to show doctests nicely
 _NO_SEQRECORD_COMPARISON = "SeqRecord comparison is deliberately not implemented. Explicitly compare the attributes of interest."
 
 
+def _concatenate_letter_annotation(left, right):
+    """Join two per-letter-annotation values end to end (PRIVATE).
+
+    Usually this is just left + right, but NumPy arrays must be joined with
+    numpy.concatenate (adding them would sum the values), and an array of
+    scores (e.g. compact quality scores) can be joined with a list.
+
+    >>> _concatenate_letter_annotation([1, 2], [3])
+    [1, 2, 3]
+    >>> _concatenate_letter_annotation(array("B", [1, 2]), [3])
+    array('B', [1, 2, 3])
+    >>> _concatenate_letter_annotation(array("B", [1, 2]), [-3])
+    [1, 2, -3]
+    """
+    if hasattr(left, "dtype") or hasattr(right, "dtype"):
+        import numpy
+        return numpy.concatenate((left, right))
+    if isinstance(left, array) or isinstance(right, array):
+        if isinstance(left, array):
+            typecode = left.typecode
+        else:
+            typecode = right.typecode
+        try:
+            return array(typecode, left) + array(typecode, right)
+        except (TypeError, OverflowError):
+            # e.g. negative numbers or floats in a list
+            return list(left) + list(right)
+    return left + right
+
+
 class _RestrictedDict(dict):
     """Dict which only allows sequences of given length as values (PRIVATE).
 
     This simple subclass of the Python dictionary is used in the SeqRecord
     object for holding per-letter-annotations.  This class is intended to
     prevent simple errors by only allowing python sequences (e.g. lists,
-    strings and tuples) to be stored, and only if their length matches that
-    expected (the length of the SeqRecord's seq object).  It cannot however
+    strings, tuples and arrays) to be stored, and only if their length matches
+    that expected (the length of the SeqRecord's seq object).  It cannot however
     prevent the entries being edited in situ (for example appending entries
     to a list).
 
@@ -91,6 +123,198 @@ class _RestrictedDict(dict):
             self[key] = value
 
 
+class _FeatureList(list):
+    """List of a SeqRecord's features, counting any changes made (PRIVATE).
+
+    Every method which changes the list increases its _version, so the
+    index used by the SeqRecord's features_in method can tell if it is out
+    of date without looking at each feature. Pickling and deep copying
+    give a plain list, as used by older versions of Biopython.
+    """
+
+    _version = 0
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+    def __setitem__(self, index, value):
+        list.__setitem__(self, index, value)
+        self._version += 1
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self._version += 1
+
+    def __setslice__(self, i, j, values):
+        # Python 2 only
+        list.__setslice__(self, i, j, values)
+        self._version += 1
+
+    def __delslice__(self, i, j):
+        # Python 2 only
+        list.__delslice__(self, i, j)
+        self._version += 1
+
+    def __iadd__(self, values):
+        list.extend(self, values)
+        self._version += 1
+        return self
+
+    def __imul__(self, count):
+        list.__imul__(self, count)
+        self._version += 1
+        return self
+
+    def append(self, value):
+        list.append(self, value)
+        self._version += 1
+
+    def extend(self, values):
+        list.extend(self, values)
+        self._version += 1
+
+    def insert(self, index, value):
+        list.insert(self, index, value)
+        self._version += 1
+
+    def pop(self, *args):
+        value = list.pop(self, *args)
+        self._version += 1
+        return value
+
+    def remove(self, value):
+        list.remove(self, value)
+        self._version += 1
+
+    def reverse(self):
+        list.reverse(self)
+        self._version += 1
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self._version += 1
+
+    def clear(self):
+        # Python 3 only
+        del self[:]
+
+
+class _FeatureIndex(object):
+    """Nested containment list of feature locations for range queries (PRIVATE).
+
+    Each part of each feature's location (one part for a simple location,
+    several for a CompoundLocation) is stored as a (start, end, part,
+    feature number) tuple, with the part's strand checked when searching.
+    The parts are arranged into a nested containment list, where within each
+    list no part contains another, so both the start and end coordinates are
+    in increasing order and can be searched with bisect. Any parts contained
+    within a part are held in a sub list.
+
+    This is used by the SeqRecord's features_in method, and is rebuilt when
+    out of date. Changes to the features list itself are spotted from the
+    version number kept by a _FeatureList, and each SeqFeature tells the
+    indexes it is in when its location is replaced (so they are marked as
+    stale). Both checks take the same time however many features there are.
+    For a plain list of features (e.g. from a SeqRecord subclass with its
+    own features property), all the features and their locations have to
+    be compared instead.
+    """
+
+    def __init__(self, features):
+        # Keep the list itself to spot a replacement, and a copy for lookups
+        self._source = features
+        self._version = getattr(features, "_version", None)
+        self._features = list(features)
+        self._stale = False
+        if self._version is None:
+            self._locations = [f.location for f in self._features]
+        parts = []
+        for number, feature in enumerate(self._features):
+            self._watch(feature)
+            location = feature.location
+            if location is None:
+                continue
+            for part in location.parts:
+                try:
+                    start = int(part.start)
+                    end = int(part.end)
+                except (TypeError, ValueError):
+                    # e.g. UnknownPosition, can't place this
+                    continue
+                parts.append((start, end, part, number))
+        # Sort on start, with the longest first to put containers before
+        # the parts they contain:
+        parts.sort(key=lambda part: (part[0], -part[1]))
+        # Each list is a tuple of the starts, ends, parts, and sub lists
+        self._root = root = ([], [], [], [])
+        # Stack of (end, list, position in list) for the open containers
+        stack = []
+        for part in parts:
+            while stack and part[1] > stack[-1][0]:
+                stack.pop()
+            if stack:
+                end, parent, i = stack[-1]
+                container = parent[3][i]
+                if container is None:
+                    container = parent[3][i] = ([], [], [], [])
+            else:
+                container = root
+            container[0].append(part[0])
+            container[1].append(part[1])
+            container[2].append(part)
+            container[3].append(None)
+            stack.append((part[1], container, len(container[2]) - 1))
+
+    def _watch(self, feature):
+        """Ask the feature to mark this index stale if its location changes (PRIVATE)."""
+        indexes = getattr(feature, "_indexes", None)
+        if indexes:
+            # Drop any indexes which are no longer in use
+            indexes = [index for index in indexes if not index._stale]
+        else:
+            indexes = []
+        indexes.append(self)
+        try:
+            feature._indexes = indexes
+        except AttributeError:
+            # Not a SeqFeature, location changes will not be noticed
+            pass
+
+    def mark_stale(self):
+        """Mark this index as out of date, or no longer in use (PRIVATE)."""
+        self._stale = True
+
+    def matches(self, features):
+        """Is this index up to date for the given list of features?"""
+        if self._stale or self._source is not features:
+            return False
+        if self._version is None:
+            return self._features == features and \
+                self._locations == [f.location for f in features]
+        return self._version == features._version
+
+    def overlapping(self, start, end, strand=None):
+        """Return the features overlapping start to end, in their original order.
+
+        Uses Python style zero based half open coordinates, so a part
+        overlaps if its start is less than end, and its end more than start.
+        """
+        found = set()
+        pending = [self._root]
+        while pending:
+            starts, ends, parts, children = pending.pop()
+            # Ends are increasing, skip those parts ending before start
+            i = bisect_right(ends, start)
+            while i < len(starts) and starts[i] < end:
+                part = parts[i]
+                if strand is None or part[2].strand == strand:
+                    found.add(part[3])
+                if children[i] is not None:
+                    pending.append(children[i])
+                i += 1
+        return [self._features[number] for number in sorted(found)]
+
+
 class SeqRecord(object):
     """A SeqRecord object holds a sequence and information about it.
 
@@ -312,6 +536,41 @@ class SeqRecord(object):
                    fset=_set_seq,
                    doc="The sequence itself, as a Seq or MutableSeq object.")
 
+    def _set_features(self, value):
+        if not isinstance(value, _FeatureList):
+            # Take a copy which keeps track of changes (see features_in)
+            value = _FeatureList(value)
+        self._features = value
+
+    features = property(fget=lambda self: self._features,
+                        fset=_set_features,
+                        doc="""List of SeqFeature objects for the record.
+
+        Assigning a list to this property stores a copy of it (a subclass
+        of list which notes any changes for the features_in method), so
+        later changes should be made via the record's features list.
+        """)
+
+    def __getstate__(self):
+        """Return the state for pickling and copying (PRIVATE).
+
+        The features are given under their old attribute name, and the
+        index used by features_in is not included.
+        """
+        state = self.__dict__.copy()
+        state.pop("_feature_index", None)
+        if "_features" in state:
+            state["features"] = state.pop("_features")
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state, including pickles from older versions (PRIVATE)."""
+        state = state.copy()
+        features = state.pop("features", None)
+        self.__dict__.update(state)
+        if features is not None:
+            self.features = features
+
     def __getitem__(self, index):
         """Returns a sub-sequence or an individual letter.
 
@@ -554,6 +813,64 @@ class SeqRecord(object):
         """
         return char in self.seq
 
+    def features_in(self, start, end, strand=None, type=None):
+        """Returns a list of the features overlapping a region of the record.
+
+            - start - start of the region (zero based, as in Python slicing)
+            - end - end of the region (exclusive, as in Python slicing)
+            - strand - optional, only consider features (or for a compound
+              location, the parts of it) on this strand (+1, -1, 0 or None).
+            - type - optional, only return features of this type (string).
+
+        For example, using a GenBank file:
+
+        >>> from Bio import SeqIO
+        >>> record = SeqIO.read("GenBank/NC_005816.gb", "gb")
+        >>> for feature in record.features_in(4000, 5000, type="CDS"):
+        ...     print("%s %i %i" % (feature.qualifiers["locus_tag"][0],
+        ...                        feature.location.start, feature.location.end))
+        YP_pPCP05 4342 4780
+        YP_pPCP06 4814 5888
+
+        Or, only considering the reverse strand:
+
+        >>> for feature in record.features_in(4000, 9000, strand=-1, type="CDS"):
+        ...     print("%s %i %i" % (feature.qualifiers["locus_tag"][0],
+        ...                        feature.location.start, feature.location.end))
+        YP_pPCP06 4814 5888
+        YP_pPCP09 7788 8088
+        YP_pPCP10 8087 8360
+
+        The features are returned in the same order as in the features list.
+        A feature with a CompoundLocation is included if any of its parts
+        overlaps the region.
+
+        Rather than checking every feature, this uses an index of the feature
+        locations which is built when first needed, and rebuilt on the next
+        call after any change to the features list or to the location of
+        one of its features:
+
+        >>> from Bio.SeqFeature import FeatureLocation
+        >>> feature = record.features_in(4000, 5000, type="CDS")[0]
+        >>> feature.location = FeatureLocation(100, 200, strand=+1)
+        >>> for feature in record.features_in(4000, 5000, type="CDS"):
+        ...     print(feature.qualifiers["locus_tag"][0])
+        YP_pPCP06
+
+        The one exception is editing the list of parts of a CompoundLocation
+        in place, rather than giving the feature a new location.
+        """
+        features = self.features
+        index = getattr(self, "_feature_index", None)
+        if index is None or not index.matches(features):
+            if index is not None:
+                index.mark_stale()
+            index = self._feature_index = _FeatureIndex(features)
+        answer = index.overlapping(int(start), int(end), strand)
+        if type is not None:
+            answer = [f for f in answer if f.type == type]
+        return answer
+
     def __str__(self):
         """A human readable summary of the record and its annotation (string).
 
@@ -856,7 +1173,8 @@ class SeqRecord(object):
         # Can append matching per-letter-annotation
         for k, v in self.letter_annotations.items():
             if k in other.letter_annotations:
-                answer.letter_annotations[k] = v + other.letter_annotations[k]
+                answer.letter_annotations[k] = _concatenate_letter_annotation(
+                    v, other.letter_annotations[k])
         return answer
 
     def __radd__(self, other):
@@ -212,6 +212,16 @@ The catch with BGZF virtual offsets is while they can be compared
 them to get the size of the data between them, nor add/subtract
 a relative offset.
 
+If you do need to jump to a position in the decompressed data, use the
+BgzfReader's seek_uncompressed method, which maps this to a virtual offset
+using the BGZF block structure. For large files you can save this mapping
+as a samtools compatible .gzi index using the write_gzi function:
+
+>>> handle = BgzfReader("GenBank/NC_000932.gb.bgz")
+>>> print(handle.seek_uncompressed(196734))
+3609329790
+>>> handle.close()
+
 Of course you can parse this file with Bio.SeqIO using BgzfReader,
 although there isn't any benefit over using gzip.open(...), unless
 you want to index BGZF compressed sequence files:
@@ -227,11 +237,13 @@ NC_000932.1
 
 from __future__ import print_function
 
+import os
 import sys
 import zlib
 import struct
+from bisect import bisect_right
 
-from Bio._py3k import _as_bytes, _as_string
+from Bio._py3k import _as_bytes, _as_string, basestring
 from Bio._py3k import open as _open
 
 __docformat__ = "restructuredtext en"
@@ -395,19 +407,129 @@ def BgzfBlocks(handle):
     data_start = 0
     while True:
         start_offset = handle.tell()
-        # This may raise StopIteration which is perfect here
-        block_length, data = _load_bgzf_block(handle)
+        try:
+            block_length, data = _load_bgzf_block(handle)
+        except StopIteration:
+            # End of file (must not leak out of a generator, see PEP 479)
+            return
         data_len = len(data)
         yield start_offset, block_length, data_start, data_len
         data_start += data_len
 
 
-def _load_bgzf_block(handle, text_mode=False):
-    """Internal function to load the next BGZF function (PRIVATE)."""
+def _bgzf_block_sizes(handle):
+    """Iterate over BGZF block sizes without decompressing them (PRIVATE).
+
+    Expects a BGZF compressed file opened in binary read mode using the
+    builtin open function (as for BgzfBlocks). Returns the block start
+    offset, the block length, and the decompressed length of the block
+    (taken from the gzip ISIZE field), as an iterator of tuples.
+
+    This only reads the block headers and footers, so is much faster
+    than BgzfBlocks for mapping out the structure of a large file.
+    """
+    while True:
+        start_offset = handle.tell()
+        header = handle.read(12)
+        if not header:
+            # End of file
+            return
+        if header[:4] != _bgzf_magic:
+            raise ValueError(r"A BGZF (e.g. a BAM file) block should start with "
+                             r"%r, not %r; handle.tell() now says %r"
+                             % (_bgzf_magic, header[:4], start_offset))
+        extra_len = struct.unpack("<H", header[10:12])[0]
+        extra = handle.read(extra_len)
+        block_size = None
+        x_len = 0
+        while x_len < extra_len:
+            subfield_id = extra[x_len:x_len + 2]
+            subfield_len = struct.unpack("<H", extra[x_len + 2:x_len + 4])[0]
+            if subfield_id == _bytes_BC:
+                block_size = struct.unpack("<H", extra[x_len + 4:x_len + 6])[0] + 1
+            x_len += subfield_len + 4
+        if block_size is None:
+            raise ValueError("Missing BC, this isn't a BGZF file!")
+        # The final four bytes of the block hold the uncompressed length
+        handle.seek(start_offset + block_size - 4)
+        data_len = struct.unpack("<I", handle.read(4))[0]
+        yield start_offset, block_size, data_len
+
+
+def _gzi_entries(handle):
+    """Return (compressed, uncompressed) offsets of each BGZF block (PRIVATE).
+
+    Expects a BGZF compressed file opened in binary read mode using the
+    builtin open function. The list starts with (0, 0) for the first block,
+    and includes the empty EOF marker block if present.
+    """
+    entries = []
+    data_start = 0
+    for start, block_size, data_len in _bgzf_block_sizes(handle):
+        entries.append((start, data_start))
+        data_start += data_len
+    if not entries:
+        entries.append((0, 0))
+    return entries
+
+
+def write_gzi(filename, gzi_filename=None):
+    """Write a samtools compatible .gzi index for a BGZF file.
+
+    The index maps the start of each BGZF block in the compressed file to
+    the corresponding offset in the uncompressed data, allowing random access
+    by uncompressed offset (as used by samtools faidx on bgzipped FASTA files).
+    By default the index is written to the filename with ".gzi" appended.
+    Returns the list of (compressed, uncompressed) offset pairs.
+
+    The file format (all little endian unsigned 64 bit integers) is the
+    number of entries, followed by the pairs of offsets for each block
+    except the first (whose offsets are implicitly both zero).
+    """
+    if gzi_filename is None:
+        gzi_filename = filename + ".gzi"
+    with _open(filename, "rb") as handle:
+        entries = _gzi_entries(handle)
+    with _open(gzi_filename, "wb") as handle:
+        handle.write(struct.pack("<Q", len(entries) - 1))
+        for compressed, uncompressed in entries[1:]:
+            handle.write(struct.pack("<QQ", compressed, uncompressed))
+    return entries
+
+
+def read_gzi(gzi_filename):
+    """Load a samtools compatible .gzi index for a BGZF file.
+
+    Returns a list of (compressed, uncompressed) offset pairs, one for each
+    BGZF block, starting with (0, 0) for the first block (which is implicit
+    in the file itself).
+    """
+    with _open(gzi_filename, "rb") as handle:
+        data = handle.read(8)
+        if len(data) != 8:
+            raise ValueError("Truncated .gzi file %r" % gzi_filename)
+        count = struct.unpack("<Q", data)[0]
+        data = handle.read(16 * count)
+    if len(data) != 16 * count:
+        raise ValueError("Truncated .gzi file %r, expected %i entries"
+                         % (gzi_filename, count))
+    values = struct.unpack("<%iQ" % (2 * count), data)
+    entries = [(0, 0)]
+    entries.extend(zip(values[0::2], values[1::2]))
+    return entries
+
+
+def _read_raw_bgzf_block(handle):
+    """Read the next BGZF block without decompressing it (PRIVATE).
+
+    Returns a tuple of the block size, the raw deflated data, the expected
+    CRC (as packed bytes) and the expected decompressed length, or None at
+    the end of the file.
+    """
     magic = handle.read(4)
     if not magic:
         # End of file
-        raise StopIteration
+        return None
     if magic != _bgzf_magic:
         raise ValueError(r"A BGZF (e.g. a BAM file) block should start with "
                          r"%r, not %r; handle.tell() now says %r"
@@ -430,10 +552,19 @@ def _load_bgzf_block(handle, text_mode=False):
     assert block_size is not None, "Missing BC, this isn't a BGZF file!"
     # Now comes the compressed data, CRC, and length of uncompressed data.
     deflate_size = block_size - 1 - extra_len - 19
-    d = zlib.decompressobj(-15)  # Negative window size means no headers
-    data = d.decompress(handle.read(deflate_size)) + d.flush()
+    deflated = handle.read(deflate_size)
     expected_crc = handle.read(4)
     expected_size = struct.unpack("<I", handle.read(4))[0]
+    return block_size, deflated, expected_crc, expected_size
+
+
+def _inflate_bgzf_block(deflated, expected_crc, expected_size, text_mode=False):
+    """Decompress and check the data from a BGZF block (PRIVATE).
+
+    As zlib releases the GIL, this can usefully be run in a thread.
+    """
+    d = zlib.decompressobj(-15)  # Negative window size means no headers
+    data = d.decompress(deflated) + d.flush()
     assert expected_size == len(data), \
            "Decompressed to %i, not %i" % (len(data), expected_size)
     # Should cope with a mix of Python platforms...
@@ -445,9 +576,20 @@ def _load_bgzf_block(handle, text_mode=False):
     assert expected_crc == crc, \
            "CRC is %s, not %s" % (crc, expected_crc)
     if text_mode:
-        return block_size, _as_string(data)
+        return _as_string(data)
     else:
-        return block_size, data
+        return data
+
+
+def _load_bgzf_block(handle, text_mode=False):
+    """Internal function to load the next BGZF function (PRIVATE)."""
+    raw = _read_raw_bgzf_block(handle)
+    if raw is None:
+        # End of file
+        raise StopIteration
+    block_size, deflated, expected_crc, expected_size = raw
+    return block_size, _inflate_bgzf_block(deflated, expected_crc,
+                                           expected_size, text_mode)
 
 
 class BgzfReader(object):
@@ -517,9 +659,22 @@ class BgzfReader(object):
     block can be up to 64kb, the default cache could take up to 6MB of
     RAM. The cache is not important for reading through the file in one
     pass, but is important for improving performance of random access.
+
+    When reading through a large file, decompression is usually the
+    bottleneck. Using the threads argument, the next few blocks after the
+    current one are read ahead and decompressed in a pool of threads (which
+    works since zlib releases the Python GIL). This does not change the
+    virtual offsets used with seek and tell:
+
+    >>> handle = BgzfReader("SamBam/ex1.bam", "rb", threads=4)
+    >>> data = handle.read(65540)
+    >>> split_virtual_offset(handle.tell())
+    (18239, 4)
+    >>> handle.close()
     """
 
-    def __init__(self, filename=None, mode="r", fileobj=None, max_cache=100):
+    def __init__(self, filename=None, mode="r", fileobj=None, max_cache=100,
+                 threads=None):
         # TODO - Assuming we can seek, check for 28 bytes EOF empty block
         # and if missing warn about possible truncation (as in samtools)?
         if max_cache < 1:
@@ -546,6 +701,18 @@ class BgzfReader(object):
         self._buffers = {}
         self._block_start_offset = None
         self._block_raw_length = None
+        if threads is not None and threads > 1:
+            from multiprocessing.pool import ThreadPool
+            self._pool = ThreadPool(threads)
+            self._read_ahead = 2 * threads
+        else:
+            self._pool = None
+        # Blocks being decompressed in the thread pool, keyed by offset
+        self._pending = {}
+        self._pending_offset = None
+        self._pending_stop = False
+        # Block offsets for seek_uncompressed, loaded when first needed
+        self._gzi = None
         self._load_block(handle.tell())
 
     def _load_block(self, start_offset=None):
@@ -572,20 +739,71 @@ class BgzfReader(object):
         if start_offset is not None:
             handle.seek(start_offset)
         self._block_start_offset = handle.tell()
-        try:
-            block_size, self._buffer = _load_bgzf_block(handle, self._text)
-        except StopIteration:
-            # EOF
-            block_size = 0
-            if self._text:
-                self._buffer = ""
-            else:
-                self._buffer = b""
+        if self._pool is not None:
+            block_size, self._buffer = self._load_pending_block(start_offset)
+        else:
+            try:
+                block_size, self._buffer = _load_bgzf_block(handle, self._text)
+            except StopIteration:
+                # EOF
+                block_size = 0
+                if self._text:
+                    self._buffer = ""
+                else:
+                    self._buffer = b""
         self._within_block_offset = 0
         self._block_raw_length = block_size
         # Finally save the block in our cache,
         self._buffers[self._block_start_offset] = self._buffer, block_size
 
+    def _queue_blocks(self):
+        """Read ahead more blocks for decompression in the threads (PRIVATE).
+
+        Any problem reading a block ahead of the current one just stops the
+        read ahead, so that the error is raised (by reading the block again
+        in the usual way) only if and when that block is needed.
+        """
+        pending = self._pending
+        handle = self._handle
+        handle.seek(self._pending_offset)
+        while not self._pending_stop and len(pending) < self._read_ahead:
+            try:
+                raw = _read_raw_bgzf_block(handle)
+            except (AssertionError, ValueError, struct.error):
+                if pending:
+                    self._pending_stop = True
+                    break
+                raise
+            if raw is None:
+                # EOF
+                self._pending_stop = True
+                break
+            block_size, deflated, expected_crc, expected_size = raw
+            pending[self._pending_offset] = block_size, self._pool.apply_async(
+                _inflate_bgzf_block,
+                (deflated, expected_crc, expected_size, self._text))
+            self._pending_offset += block_size
+
+    def _load_pending_block(self, start_offset):
+        """Return block size and data using the thread pool (PRIVATE)."""
+        pending = self._pending
+        if start_offset not in pending:
+            # Not reading sequentially, discard any blocks read ahead
+            pending.clear()
+            self._pending_offset = start_offset
+            self._pending_stop = False
+            self._queue_blocks()
+        if start_offset not in pending:
+            # EOF
+            if self._text:
+                return 0, ""
+            else:
+                return 0, b""
+        block_size, result = pending.pop(start_offset)
+        # Keep the threads busy while the caller uses this block
+        self._queue_blocks()
+        return block_size, result.get()
+
     def tell(self):
         """Returns a 64-bit unsigned BGZF virtual offset."""
         if 0 < self._within_block_offset and self._within_block_offset == len(self._buffer):
@@ -623,6 +841,68 @@ class BgzfReader(object):
         #       self.tell(), self._block_start_offset, self._within_block_offset)
         return virtual_offset
 
+    def _load_gzi(self):
+        """Load or build the block offsets for seek_uncompressed (PRIVATE).
+
+        Uses a samtools style .gzi index next to the BGZF file if there is
+        one (and it is not older than the BGZF file, in which case it may
+        describe a previous version of the file), otherwise scans the block
+        headers of the file itself.
+        """
+        filename = getattr(self._handle, "name", None)
+        if isinstance(filename, basestring) \
+                and os.path.isfile(filename + ".gzi") \
+                and os.path.getmtime(filename + ".gzi") >= \
+                os.path.getmtime(filename):
+            entries = read_gzi(filename + ".gzi")
+        else:
+            # Scanning moves the handle, but _load_block always seeks
+            offset = self._handle.tell()
+            self._handle.seek(0)
+            entries = _gzi_entries(self._handle)
+            self._handle.seek(offset)
+        # The index does not record the length of the last block, so get
+        # this from its header to know where the uncompressed data ends
+        # (again, _load_block always seeks so moving the handle is fine)
+        self._handle.seek(entries[-1][0])
+        block = _read_raw_bgzf_block(self._handle)
+        if block is None:
+            # Empty file
+            total = entries[-1][1]
+        else:
+            total = entries[-1][1] + block[3]
+        self._gzi = ([u for c, u in entries], [c for c, u in entries], total)
+
+    def seek_uncompressed(self, offset):
+        """Seek to an offset in the uncompressed data, returns virtual offset.
+
+        This uses a samtools style .gzi index (see the write_gzi function)
+        if one exists alongside the BGZF file, otherwise the BGZF block
+        offsets are found by scanning the file's block headers on first use
+        (along with the total uncompressed length, so an offset past the end
+        of the data gives a ValueError). Each seek is then a binary search
+        over the blocks:
+
+        >>> handle = BgzfReader("GenBank/NC_000932.gb.bgz", "r")
+        >>> split_virtual_offset(handle.seek_uncompressed(196734))
+        (55074, 126)
+        >>> handle.close()
+        """
+        if offset < 0:
+            raise ValueError("Uncompressed offset should be non-negative, "
+                             "not %i" % offset)
+        if self._gzi is None:
+            self._load_gzi()
+        data_starts, block_starts, total = self._gzi
+        if offset > total:
+            raise ValueError("Uncompressed offset %i is beyond the end of "
+                             "the data (%i bytes)" % (offset, total))
+        # Use the last block starting at or before the offset, which skips
+        # over any empty blocks (such as the EOF marker)
+        i = bisect_right(data_starts, offset) - 1
+        return self.seek(make_virtual_offset(block_starts[i],
+                                             offset - data_starts[i]))
+
     def read(self, size=-1):
         if size < 0:
             raise NotImplementedError("Don't be greedy, that could be massive!")
@@ -694,6 +974,11 @@ class BgzfReader(object):
         return self
 
     def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            self._pending = None
         self._handle.close()
         self._buffer = None
         self._block_start_offset = None
@@ -715,9 +1000,48 @@ class BgzfReader(object):
         self.close()
 
 
+def _compress_bgzf_block(block, compresslevel=6):
+    """Compress data into a complete BGZF block, returned as bytes (PRIVATE).
+
+    As zlib releases the GIL, this can usefully be run in a thread.
+    """
+    assert len(block) <= 65536
+    # Giving a negative window bits means no gzip/zlib headers, -15 used in samtools
+    c = zlib.compressobj(compresslevel,
+                         zlib.DEFLATED,
+                         -15,
+                         zlib.DEF_MEM_LEVEL,
+                         0)
+    compressed = c.compress(block) + c.flush()
+    del c
+    assert len(compressed) < 65536, "TODO - Didn't compress enough, try less data in this block"
+    bsize = struct.pack("<H", len(compressed) + 25)  # includes -1
+    crc = struct.pack("<I", zlib.crc32(block) & 0xffffffff)
+    uncompressed_length = struct.pack("<I", len(block))
+    # Fixed 16 bytes,
+    # gzip magic bytes (4) mod time (4),
+    # gzip flag (1), os (1), extra length which is six (2),
+    # sub field which is BC (2), sub field length of two (2),
+    # Variable data,
+    # 2 bytes: block length as BC sub field (2)
+    # X bytes: the data
+    # 8 bytes: crc (4), uncompressed data length (4)
+    return _bgzf_header + bsize + compressed + crc + uncompressed_length
+
+
 class BgzfWriter(object):
+    """BGZF writer, acts like a write only handle but tell differs.
+
+    Using the threads argument, the blocks are compressed in a pool of
+    threads (which works since zlib releases the Python GIL) and written
+    out in order. The output is identical to that written without threads.
+    Note that calling the tell method must then wait for any pending blocks
+    to be compressed and written, since the virtual offset depends on
+    their compressed size.
+    """
 
-    def __init__(self, filename=None, mode="w", fileobj=None, compresslevel=6):
+    def __init__(self, filename=None, mode="w", fileobj=None, compresslevel=6,
+                 threads=None):
         if fileobj:
             assert filename is None
             handle = fileobj
@@ -733,39 +1057,30 @@ class BgzfWriter(object):
         self._handle = handle
         self._buffer = b""
         self.compresslevel = compresslevel
+        if threads is not None and threads > 1:
+            from multiprocessing.pool import ThreadPool
+            self._pool = ThreadPool(threads)
+            self._max_pending = 2 * threads
+        else:
+            self._pool = None
+        # Blocks being compressed in the thread pool, in file order
+        self._pending = []
 
     def _write_block(self, block):
         # print("Saving %i bytes" % len(block))
-        start_offset = self._handle.tell()
-        assert len(block) <= 65536
-        # Giving a negative window bits means no gzip/zlib headers, -15 used in samtools
-        c = zlib.compressobj(self.compresslevel,
-                             zlib.DEFLATED,
-                             -15,
-                             zlib.DEF_MEM_LEVEL,
-                             0)
-        compressed = c.compress(block) + c.flush()
-        del c
-        assert len(compressed) < 65536, "TODO - Didn't compress enough, try less data in this block"
-        crc = zlib.crc32(block)
-        # Should cope with a mix of Python platforms...
-        if crc < 0:
-            crc = struct.pack("<i", crc)
-        else:
-            crc = struct.pack("<I", crc)
-        bsize = struct.pack("<H", len(compressed) + 25)  # includes -1
-        crc = struct.pack("<I", zlib.crc32(block) & 0xffffffff)
-        uncompressed_length = struct.pack("<I", len(block))
-        # Fixed 16 bytes,
-        # gzip magic bytes (4) mod time (4),
-        # gzip flag (1), os (1), extra length which is six (2),
-        # sub field which is BC (2), sub field length of two (2),
-        # Variable data,
-        # 2 bytes: block length as BC sub field (2)
-        # X bytes: the data
-        # 8 bytes: crc (4), uncompressed data length (4)
-        data = _bgzf_header + bsize + compressed + crc + uncompressed_length
-        self._handle.write(data)
+        if self._pool is None:
+            self._handle.write(_compress_bgzf_block(block, self.compresslevel))
+            return
+        self._pending.append(self._pool.apply_async(
+            _compress_bgzf_block, (block, self.compresslevel)))
+        if len(self._pending) >= self._max_pending:
+            self._handle.write(self._pending.pop(0).get())
+
+    def _write_pending(self):
+        """Wait for and write out any blocks being compressed (PRIVATE)."""
+        pending = self._pending
+        while pending:
+            self._handle.write(pending.pop(0).get())
 
     def write(self, data):
         # TODO - Check bytes vs unicode
@@ -789,12 +1104,18 @@ class BgzfWriter(object):
             self._buffer = self._buffer[65535:]
         self._write_block(self._buffer)
         self._buffer = b""
+        self._write_pending()
         self._handle.flush()
 
     def close(self):
         """Flush data, write 28 bytes empty BGZF EOF marker, and close the BGZF file."""
         if self._buffer:
             self.flush()
+        self._write_pending()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
         # samtools will look for a magic EOF marker, just a 28 byte empty BGZF block,
         # and if it is missing warns the BAM file may be truncated. In addition to
         # samtools writing this block, so too does bgzip - so we should too.
@@ -804,6 +1125,8 @@ class BgzfWriter(object):
 
     def tell(self):
         """Returns a BGZF 64-bit virtual offset."""
+        # Need the compressed size of any pending blocks
+        self._write_pending()
         return make_virtual_offset(self._handle.tell(), len(self._buffer))
 
     def seekable(self):
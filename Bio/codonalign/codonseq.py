@@ -14,6 +14,7 @@ from itertools import permutations
 from math import log
 
 from Bio.Seq import Seq
+from Bio.Seq import _codon_translator, _stop_char, _pos_stop_char
 from Bio.SeqRecord import SeqRecord
 from Bio.Alphabet import generic_dna, _ungap
 
@@ -160,6 +161,8 @@ class CodonSeq(Seq):
             tr_seq = self._data
         if rf_table is None:
             rf_table = self.rf_table
+        # Precomputed lookup covering valid codons (see Bio.Seq.translate)
+        translator = _codon_translator(codon_table)
         p = -1  # initiation
         for i in rf_table:
             if isinstance(i, float):
@@ -180,7 +183,14 @@ class CodonSeq(Seq):
                 # normal condition without gaps
                 codon = tr_seq[i:i + 3]
                 p = i
-            if codon in codon_table.stop_codons:
+            amino = translator.get(codon)
+            if amino == _stop_char:
+                amino_acids.append(stop_symbol)
+                continue
+            elif amino is not None and amino != _pos_stop_char:
+                amino_acids.append(amino)
+                continue
+            elif codon in codon_table.stop_codons:
                 amino_acids.append(stop_symbol)
                 continue
             try:
@@ -139,18 +139,153 @@ static void IndexList_extend(struct IndexList *il1, struct IndexList *il2)
     } */
 
 
+/* A substitution matrix compiled by a dictionary_match, with the
+ * residues of both sequences encoded as indexes into it.
+ */
+struct MatchMatrix {
+    double *scores;   /* size x size scores, or NULL if not compiled */
+    int size;
+    int *codesA, *codesB;
+};
+
+static void MatchMatrix_free(struct MatchMatrix *mm)
+{
+    if(mm->scores)
+        free(mm->scores);
+    if(mm->codesA)
+        free(mm->codesA);
+    if(mm->codesB)
+        free(mm->codesB);
+    mm->scores = NULL;
+    mm->codesA = mm->codesB = NULL;
+}
+
+/* Call the encode method of py_match_fn on py_sequence, and store
+ * the codes in a new array.  Returns -1 on error.
+ */
+static int _encode_sequence(PyObject *py_match_fn, PyObject *py_sequence,
+                            int size, int **codes)
+{
+    PyObject *py_codes, *py_fast;
+    int i, n;
+    long code;
+
+    if(!(py_codes = PyObject_CallMethod(py_match_fn, "encode", "O",
+                                        py_sequence)))
+        return -1;
+    py_fast = PySequence_Fast(py_codes, "encode should return a sequence.");
+    Py_DECREF(py_codes);
+    if(!py_fast)
+        return -1;
+    n = PySequence_Fast_GET_SIZE(py_fast);
+    if(n != PySequence_Length(py_sequence)) {
+        PyErr_SetString(PyExc_ValueError,
+                        "encode should return a code for each residue.");
+        Py_DECREF(py_fast);
+        return -1;
+    }
+    if(!(*codes = malloc((n ? n : 1)*sizeof(**codes)))) {
+        PyErr_SetString(PyExc_MemoryError, "Out of memory");
+        Py_DECREF(py_fast);
+        return -1;
+    }
+    for(i=0; i<n; i++) {
+#if PY_MAJOR_VERSION >= 3
+        code = PyLong_AsLong(PySequence_Fast_GET_ITEM(py_fast, i));
+#else
+        code = PyInt_AsLong(PySequence_Fast_GET_ITEM(py_fast, i));
+#endif
+        if(code == -1 && PyErr_Occurred())
+            break;
+        if(code < 0 || code >= size) {
+            PyErr_SetString(PyExc_ValueError, "Residue code out of range.");
+            break;
+        }
+        (*codes)[i] = (int)code;
+    }
+    Py_DECREF(py_fast);
+    return (i < n) ? -1 : 0;
+}
+
+/* Check to see if py_match_fn has a compiled matrix (see
+ * dictionary_match in pairwise2).  If so, copy out the scores and
+ * encode the sequences so the scores can be looked up directly.
+ * Otherwise, mm->scores is left as NULL.  Returns -1 on error.
+ */
+static int MatchMatrix_init(struct MatchMatrix *mm, PyObject *py_match_fn,
+                            PyObject *py_sequenceA, PyObject *py_sequenceB)
+{
+    PyObject *py_matrix, *py_rows, *py_row;
+    int i, j, size;
+    double score;
+
+    mm->scores = NULL;
+    mm->codesA = mm->codesB = NULL;
+    mm->size = 0;
+    if(!(py_matrix = PyObject_GetAttrString(py_match_fn, "matrix"))) {
+        PyErr_Clear();
+        return 0;
+    }
+    if(py_matrix == Py_None) {
+        Py_DECREF(py_matrix);
+        return 0;
+    }
+    py_rows = PySequence_Fast(py_matrix, "matrix should be a sequence.");
+    Py_DECREF(py_matrix);
+    if(!py_rows)
+        return -1;
+    size = PySequence_Fast_GET_SIZE(py_rows);
+    if(!(mm->scores = malloc((size ? size*size : 1)*sizeof(*mm->scores)))) {
+        PyErr_SetString(PyExc_MemoryError, "Out of memory");
+        Py_DECREF(py_rows);
+        return -1;
+    }
+    mm->size = size;
+    for(i=0; i<size; i++) {
+        py_row = PySequence_Fast(PySequence_Fast_GET_ITEM(py_rows, i),
+                                 "matrix rows should be sequences.");
+        if(!py_row)
+            break;
+        if(PySequence_Fast_GET_SIZE(py_row) != size) {
+            PyErr_SetString(PyExc_ValueError, "matrix should be square.");
+            Py_DECREF(py_row);
+            break;
+        }
+        for(j=0; j<size; j++) {
+            score = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(py_row, j));
+            if(score == -1.0 && PyErr_Occurred())
+                break;
+            mm->scores[i*size+j] = score;
+        }
+        Py_DECREF(py_row);
+        if(j < size)
+            break;
+    }
+    Py_DECREF(py_rows);
+    if(i < size ||
+       _encode_sequence(py_match_fn, py_sequenceA, size, &mm->codesA) < 0 ||
+       _encode_sequence(py_match_fn, py_sequenceB, size, &mm->codesB) < 0) {
+        MatchMatrix_free(mm);
+        return -1;
+    }
+    return 0;
+}
+
 double _get_match_score(PyObject *py_sequenceA, PyObject *py_sequenceB,
                         PyObject *py_match_fn, int i, int j,
                         char *sequenceA, char *sequenceB,
                         int use_sequence_cstring,
                         double match, double mismatch,
-                        int use_match_mismatch_scores)
+                        int use_match_mismatch_scores,
+                        struct MatchMatrix *mm)
 {
     PyObject *py_A=NULL,
         *py_B=NULL;
     PyObject *py_arglist=NULL, *py_result=NULL;
     double score = 0;
 
+    if(mm->scores)
+        return mm->scores[mm->codesA[i]*mm->size + mm->codesB[j]];
     if(use_sequence_cstring && use_match_mismatch_scores) {
         score = (sequenceA[i] == sequenceB[j]) ? match : mismatch;
         return score;
@@ -200,6 +335,16 @@ static PyObject* _create_bytes_object(PyObject* o) {
 }
 #endif
 
+/* Return the offset of a cell in the score and trace matrices.  With
+ * a band, each row only holds the 2*band+1 cells around the diagonal.
+ */
+static int _cell_offset(int row, int col, int lenB, int band)
+{
+    if(band < 0)
+        return row*lenB + col;
+    return row*(2*band+1) + col - row + band;
+}
+
 /* This function is a more-or-less straightforward port of the
  * equivalent function in pairwise2.  Please see there for algorithm
  * documentation.
@@ -219,11 +364,16 @@ static PyObject *cpairwise2__make_score_matrix_fast(
     double open_A, extend_A, open_B, extend_B;
     int penalize_extend_when_opening, penalize_end_gaps_A, penalize_end_gaps_B;
     int align_globally, score_only;
+    PyObject *py_band = Py_None;
+    int band = -1;
+    int ncells = 0;
+    int col_start, col_stop;
 
     PyObject *py_match=NULL, *py_mismatch=NULL;
     double first_A_gap, first_B_gap;
     double match, mismatch;
     int use_match_mismatch_scores;
+    struct MatchMatrix match_matrix = {NULL, 0, NULL, NULL};
     int lenA, lenB;
     double *score_matrix = NULL;
     struct IndexList *trace_matrix = NULL;
@@ -236,12 +386,25 @@ static PyObject *cpairwise2__make_score_matrix_fast(
 
     PyObject *py_retval = NULL;
 
-    if(!PyArg_ParseTuple(args, "OOOddddi(ii)ii", &py_sequenceA, &py_sequenceB,
+    if(!PyArg_ParseTuple(args, "OOOddddi(ii)ii|O", &py_sequenceA, &py_sequenceB,
                          &py_match_fn, &open_A, &extend_A, &open_B, &extend_B,
                          &penalize_extend_when_opening,
                          &penalize_end_gaps_A, &penalize_end_gaps_B,
-                         &align_globally, &score_only))
+                         &align_globally, &score_only, &py_band))
         return NULL;
+    if(py_band != Py_None) {
+#if PY_MAJOR_VERSION >= 3
+        band = (int)PyLong_AsLong(py_band);
+#else
+        band = (int)PyInt_AsLong(py_band);
+#endif
+        if(band == -1 && PyErr_Occurred())
+            return NULL;
+        if(band < 0) {
+            PyErr_SetString(PyExc_ValueError, "band should be non-negative.");
+            return NULL;
+        }
+    }
     if(!PySequence_Check(py_sequenceA) || !PySequence_Check(py_sequenceB)) {
         PyErr_SetString(PyExc_TypeError,
                         "py_sequenceA and py_sequenceB should be sequences.");
@@ -302,6 +465,10 @@ cleanup_after_py_match_fn:
     if(py_mismatch) {
         Py_DECREF(py_mismatch);
     }
+    /* Look up the scores directly for a compiled substitution matrix. */
+    if(MatchMatrix_init(&match_matrix, py_match_fn,
+                        py_sequenceA, py_sequenceB) < 0)
+        goto _cleanup_make_score_matrix_fast;
 
     /* Cache some commonly used gap penalties */
     first_A_gap = calc_affine_penalty(1, open_A, extend_A,
@@ -312,45 +479,61 @@ cleanup_after_py_match_fn:
     /* Allocate matrices for storing the results and initialize them. */
     lenA = PySequence_Length(py_sequenceA);
     lenB = PySequence_Length(py_sequenceB);
-    score_matrix = malloc(lenA*lenB*sizeof(*score_matrix));
-    trace_matrix = malloc(lenA*lenB*sizeof(*trace_matrix));
+    if(band >= 0) {
+        /* A band wider than the matrix covers the same cells. */
+        if(band > lenA + lenB)
+            band = lenA + lenB;
+        ncells = lenA*(2*band+1);
+    } else {
+        ncells = lenA*lenB;
+    }
+    score_matrix = malloc(ncells*sizeof(*score_matrix));
+    trace_matrix = malloc(ncells*sizeof(*trace_matrix));
     if(!score_matrix || !trace_matrix) {
         PyErr_SetString(PyExc_MemoryError, "Out of memory");
         goto _cleanup_make_score_matrix_fast;
     }
-    for(i=0; i<lenA*lenB; i++) {
+    for(i=0; i<ncells; i++) {
         score_matrix[i] = 0;
         IndexList_init(&trace_matrix[i]);
     }
 
     /* Initialize the first row and col of the score matrix. */
     for(i=0; i<lenA; i++) {
-        double score = _get_match_score(py_sequenceA, py_sequenceB,
+        double score;
+        if(band >= 0 && i > band)
+            break;
+        score = _get_match_score(py_sequenceA, py_sequenceB,
                                         py_match_fn, i, 0,
                                         sequenceA, sequenceB,
                                         use_sequence_cstring,
                                         match, mismatch,
-                                        use_match_mismatch_scores);
+                                        use_match_mismatch_scores,
+                                        &match_matrix);
         if(score==-1.0 && PyErr_Occurred())
             goto _cleanup_make_score_matrix_fast;
         if(penalize_end_gaps_B)
             score += calc_affine_penalty(i, open_B, extend_B,
                                          penalize_extend_when_opening);
-        score_matrix[i*lenB] = score;
+        score_matrix[_cell_offset(i, 0, lenB, band)] = score;
     }
     for(i=0; i<lenB; i++) {
-        double score = _get_match_score(py_sequenceA, py_sequenceB,
+        double score;
+        if(band >= 0 && i > band)
+            break;
+        score = _get_match_score(py_sequenceA, py_sequenceB,
                                         py_match_fn, 0, i,
                                         sequenceA, sequenceB,
                                         use_sequence_cstring,
                                         match, mismatch,
-                                        use_match_mismatch_scores);
+                                        use_match_mismatch_scores,
+                                        &match_matrix);
         if(score==-1.0 && PyErr_Occurred())
             goto _cleanup_make_score_matrix_fast;
         if(penalize_end_gaps_A)
             score += calc_affine_penalty(i, open_A, extend_A,
                                          penalize_extend_when_opening);
-        score_matrix[i] = score;
+        score_matrix[_cell_offset(0, i, lenB, band)] = score;
     }
 
     /* Now initialize the row and col cache. */
@@ -367,18 +550,34 @@ cleanup_after_py_match_fn:
     memset((void *)row_cache_index, 0, (lenA-1)*sizeof(*row_cache_index));
     memset((void *)col_cache_score, 0, (lenB-1)*sizeof(*col_cache_score));
     memset((void *)col_cache_index, 0, (lenB-1)*sizeof(*col_cache_index));
+    /* With a band, the caches away from the start are left empty
+       until they enter the band. */
     for(i=0; i<lenA-1; i++) {
-        row_cache_score[i] = score_matrix[i*lenB] + first_A_gap;
+        if(band >= 0 && i > band)
+            break;
+        row_cache_score[i] = score_matrix[_cell_offset(i, 0, lenB, band)] +
+            first_A_gap;
         IndexList_append(&row_cache_index[i], i, 0);
     }
     for(i=0; i<lenB-1; i++) {
-        col_cache_score[i] = score_matrix[i] + first_B_gap;
+        if(band >= 0 && i > band)
+            break;
+        col_cache_score[i] = score_matrix[_cell_offset(0, i, lenB, band)] +
+            first_B_gap;
         IndexList_append(&col_cache_index[i], 0, i);
     }
 
     /* Fill in the score matrix. */
     for(row=1; row<lenA; row++) {
-        for(col=1; col<lenB; col++) {
+        col_start = 1;
+        col_stop = lenB;
+        if(band >= 0) {
+            if(row-band > col_start)
+                col_start = row-band;
+            if(row+band+1 < col_stop)
+                col_stop = row+band+1;
+        }
+        for(col=col_start; col<col_stop; col++) {
             double nogap_score, row_score, col_score, best_score;
             int best_score_rint;
             struct IndexList *il;
@@ -387,13 +586,13 @@ cleanup_after_py_match_fn:
             int open_score_rint, extend_score_rint;
 
             /* Calculate the best score. */
-            nogap_score = score_matrix[(row-1)*lenB+col-1];
-            if(col > 1) {
+            nogap_score = score_matrix[_cell_offset(row-1, col-1, lenB, band)];
+            if(col > 1 && row_cache_index[row-1].num_used) {
                 row_score = row_cache_score[row-1];
             } else {
                 row_score = nogap_score-1; /* Make sure it's not best score */
             }
-            if(row > 1) {
+            if(row > 1 && col_cache_index[col-1].num_used) {
                 col_score = col_cache_score[col-1];
             } else {
                 col_score = nogap_score-1; /* Make sure it's not best score */
@@ -410,16 +609,17 @@ cleanup_after_py_match_fn:
                                            sequenceA, sequenceB,
                                            use_sequence_cstring,
                                            match, mismatch,
-                                           use_match_mismatch_scores);
+                                           use_match_mismatch_scores,
+                                           &match_matrix);
             if(delta_score==-1.0 && PyErr_Occurred())
                 goto _cleanup_make_score_matrix_fast;
             score = best_score + delta_score;
             if(!align_globally && score < 0)
-                score_matrix[row*lenB+col] = 0;
+                score_matrix[_cell_offset(row, col, lenB, band)] = 0;
             else
-                score_matrix[row*lenB+col] = score;
+                score_matrix[_cell_offset(row, col, lenB, band)] = score;
 
-            il = &trace_matrix[row*lenB+col];
+            il = &trace_matrix[_cell_offset(row, col, lenB, band)];
             if(best_score_rint == rint(nogap_score)) {
                 IndexList_append(il, row-1, col-1);
             }
@@ -431,11 +631,12 @@ cleanup_after_py_match_fn:
             }
 
             /* Update the cached column scores. */
-            open_score = score_matrix[(row-1)*lenB+col-1] + first_B_gap;
+            open_score = nogap_score + first_B_gap;
             extend_score = col_cache_score[col-1] + extend_B;
             open_score_rint = rint(open_score);
             extend_score_rint = rint(extend_score);
-            if(open_score_rint > extend_score_rint) {
+            if(!col_cache_index[col-1].num_used ||
+               open_score_rint > extend_score_rint) {
                 col_cache_score[col-1] = open_score;
                 IndexList_clear(&col_cache_index[col-1]);
                 IndexList_append(&col_cache_index[col-1], row-1, col-1);
@@ -448,11 +649,12 @@ cleanup_after_py_match_fn:
             }
 
             /* Update the cached row scores. */
-            open_score = score_matrix[(row-1)*lenB+col-1] + first_A_gap;
+            open_score = nogap_score + first_A_gap;
             extend_score = row_cache_score[row-1] + extend_A;
             open_score_rint = rint(open_score);
             extend_score_rint = rint(extend_score);
-            if(open_score_rint > extend_score_rint) {
+            if(!row_cache_index[row-1].num_used ||
+               open_score_rint > extend_score_rint) {
                 row_cache_score[row-1] = open_score;
                 IndexList_clear(&row_cache_index[row-1]);
                 IndexList_append(&row_cache_index[row-1], row-1, col-1);
@@ -466,55 +668,106 @@ cleanup_after_py_match_fn:
         }
     }
 
-    /* Save the score and traceback matrices into real python objects. */
+    /* Save the score and traceback matrices into real python objects.
+       With a band, each row is a dictionary keyed by the column. */
     if(!(py_score_matrix = PyList_New(lenA)))
         goto _cleanup_make_score_matrix_fast;
     if(!(py_trace_matrix = PyList_New(lenA)))
         goto _cleanup_make_score_matrix_fast;
     for(row=0; row<lenA; row++) {
         PyObject *py_score_row, *py_trace_row;
-        if(!(py_score_row = PyList_New(lenB)))
-            goto _cleanup_make_score_matrix_fast;
-        PyList_SET_ITEM(py_score_matrix, row, py_score_row);
-        if(!(py_trace_row = PyList_New(lenB)))
+        col_start = 0;
+        col_stop = lenB;
+        if(band >= 0) {
+            if(row-band > col_start)
+                col_start = row-band;
+            if(row+band+1 < col_stop)
+                col_stop = row+band+1;
+            py_score_row = PyDict_New();
+            py_trace_row = PyDict_New();
+        } else {
+            py_score_row = PyList_New(lenB);
+            py_trace_row = PyList_New(lenB);
+        }
+        if(py_score_row)
+            PyList_SET_ITEM(py_score_matrix, row, py_score_row);
+        if(py_trace_row)
+            PyList_SET_ITEM(py_trace_matrix, row, py_trace_row);
+        if(!py_score_row || !py_trace_row)
             goto _cleanup_make_score_matrix_fast;
-        PyList_SET_ITEM(py_trace_matrix, row, py_trace_row);
 
-        for(col=0; col<lenB; col++) {
+        for(col=col_start; col<col_stop; col++) {
             int i;
-            PyObject *py_score, *py_indexlist;
-            int offset = row*lenB + col;
+            PyObject *py_score, *py_indexlist, *py_col=NULL;
+            int offset = _cell_offset(row, col, lenB, band);
             struct IndexList *il = &trace_matrix[offset];
 
+            if(band >= 0) {
+#if PY_MAJOR_VERSION >= 3
+                if(!(py_col = PyLong_FromLong(col)))
+#else
+                if(!(py_col = PyInt_FromLong(col)))
+#endif
+                    goto _cleanup_make_score_matrix_fast;
+            }
+
             /* Set py_score_matrix[row][col] to the score. */
-            if(!(py_score = PyFloat_FromDouble(score_matrix[offset])))
+            if(!(py_score = PyFloat_FromDouble(score_matrix[offset]))) {
+                Py_XDECREF(py_col);
                 goto _cleanup_make_score_matrix_fast;
-            PyList_SET_ITEM(py_score_row, col, py_score);
+            }
+            if(py_col) {
+                i = PyDict_SetItem(py_score_row, py_col, py_score);
+                Py_DECREF(py_score);
+                if(i < 0) {
+                    Py_DECREF(py_col);
+                    goto _cleanup_make_score_matrix_fast;
+                }
+            } else {
+                PyList_SET_ITEM(py_score_row, col, py_score);
+            }
 
-            if(score_only)
+            if(score_only) {
+                Py_XDECREF(py_col);
                 continue;
+            }
             /* Set py_trace_matrix[row][col] to a list of indexes.  On
                the edges of the matrix (row or column is 0), the
                matrix should be [None]. */
             if(!row || !col) {
-                if(!(py_indexlist = PyList_New(1)))
+                if(!(py_indexlist = PyList_New(1))) {
+                    Py_XDECREF(py_col);
                     goto _cleanup_make_score_matrix_fast;
+                }
                 Py_INCREF(Py_None);
                 PyList_SET_ITEM(py_indexlist, 0, Py_None);
             }
             else {
-                if(!(py_indexlist = PyList_New(il->num_used)))
+                if(!(py_indexlist = PyList_New(il->num_used))) {
+                    Py_XDECREF(py_col);
                     goto _cleanup_make_score_matrix_fast;
+                }
                 for(i=0; i<il->num_used; i++) {
                     PyObject *py_index=NULL;
                     int row = il->indexes[i*2],
                         col = il->indexes[i*2+1];
-                    if(!(py_index = Py_BuildValue("(ii)", row, col)))
+                    if(!(py_index = Py_BuildValue("(ii)", row, col))) {
+                        Py_DECREF(py_indexlist);
+                        Py_XDECREF(py_col);
                         goto _cleanup_make_score_matrix_fast;
+                    }
                     PyList_SET_ITEM(py_indexlist, i, py_index);
                 }
             }
-            PyList_SET_ITEM(py_trace_row, col, py_indexlist);
+            if(py_col) {
+                i = PyDict_SetItem(py_trace_row, py_col, py_indexlist);
+                Py_DECREF(py_indexlist);
+                Py_DECREF(py_col);
+                if(i < 0)
+                    goto _cleanup_make_score_matrix_fast;
+            } else {
+                PyList_SET_ITEM(py_trace_row, col, py_indexlist);
+            }
         }
     }
 
@@ -522,10 +775,11 @@ cleanup_after_py_match_fn:
 
 
  _cleanup_make_score_matrix_fast:
+    MatchMatrix_free(&match_matrix);
     if(score_matrix)
         free(score_matrix);
     if(trace_matrix) {
-        for(i=0; i<lenA*lenB; i++)
+        for(i=0; i<ncells; i++)
             IndexList_free(&trace_matrix[i]);
         free(trace_matrix);
     }
@@ -558,6 +812,264 @@ cleanup_after_py_match_fn:
     return py_retval;
 }
 
+/* Return the best starting score for the tracebacks in this row of
+ * the score matrix, as _best_score_in_row in pairwise2.
+ */
+static double _best_score_in_row(double *scores, int row, int lenA, int lenB,
+                                 double open_A, double extend_A,
+                                 double open_B, double extend_B,
+                                 int penalize_extend_when_opening,
+                                 int penalize_end_gaps_A,
+                                 int penalize_end_gaps_B,
+                                 int align_globally)
+{
+    int col;
+    double best_score, score;
+
+    if(!align_globally) {
+        best_score = scores[0];
+        for(col=1; col<lenB; col++) {
+            if(scores[col] > best_score)
+                best_score = scores[col];
+        }
+        return best_score;
+    }
+    best_score = scores[lenB-1];
+    if(penalize_end_gaps_B)
+        best_score += calc_affine_penalty(lenA-row-1, open_B, extend_B,
+                                          penalize_extend_when_opening);
+    if(row == lenA-1) {
+        for(col=0; col<lenB-1; col++) {
+            score = scores[col];
+            if(penalize_end_gaps_A)
+                score += calc_affine_penalty(lenB-col-1, open_A, extend_A,
+                                             penalize_extend_when_opening);
+            if(score > best_score)
+                best_score = score;
+        }
+    }
+    return best_score;
+}
+
+/* This is a port of _score_only_fast in pairwise2, which only keeps
+ * the previous row of the score matrix.
+ */
+static PyObject *cpairwise2__score_only_fast(
+    PyObject *self, PyObject *args)
+{
+    int i;
+    int row, col;
+
+    PyObject *py_sequenceA, *py_sequenceB, *py_match_fn;
+#if PY_MAJOR_VERSION >= 3
+    PyObject *py_bytesA=NULL, *py_bytesB=NULL;
+#endif
+    char *sequenceA=NULL, *sequenceB=NULL;
+    int use_sequence_cstring = 0;
+    double open_A, extend_A, open_B, extend_B;
+    int penalize_extend_when_opening, penalize_end_gaps_A, penalize_end_gaps_B;
+    int align_globally;
+
+    PyObject *py_match=NULL, *py_mismatch=NULL;
+    double first_A_gap, first_B_gap;
+    double match, mismatch;
+    int use_match_mismatch_scores;
+    struct MatchMatrix match_matrix = {NULL, 0, NULL, NULL};
+    int lenA, lenB;
+    double *prev_row = NULL, *current_row = NULL, *swap_row;
+    double *col_cache_score = NULL;
+    double row_cache_score, best_score, score;
+
+    PyObject *py_retval = NULL;
+
+    if(!PyArg_ParseTuple(args, "OOOddddi(ii)i", &py_sequenceA, &py_sequenceB,
+                         &py_match_fn, &open_A, &extend_A, &open_B, &extend_B,
+                         &penalize_extend_when_opening,
+                         &penalize_end_gaps_A, &penalize_end_gaps_B,
+                         &align_globally))
+        return NULL;
+    if(!PySequence_Check(py_sequenceA) || !PySequence_Check(py_sequenceB)) {
+        PyErr_SetString(PyExc_TypeError,
+                        "py_sequenceA and py_sequenceB should be sequences.");
+        return NULL;
+    }
+    if(!PyCallable_Check(py_match_fn)) {
+        PyErr_SetString(PyExc_TypeError, "py_match_fn must be callable.");
+        return NULL;
+    }
+
+    /* Use the c string representation for strings, see
+       _make_score_matrix_fast. */
+#if PY_MAJOR_VERSION < 3
+    if(PyString_Check(py_sequenceA) && PyString_Check(py_sequenceB)) {
+        sequenceA = PyString_AS_STRING(py_sequenceA);
+        sequenceB = PyString_AS_STRING(py_sequenceB);
+        use_sequence_cstring = 1;
+    }
+#else
+    py_bytesA = _create_bytes_object(py_sequenceA);
+    py_bytesB = _create_bytes_object(py_sequenceB);
+    if(py_bytesA && py_bytesB) {
+        sequenceA = PyBytes_AS_STRING(py_bytesA);
+        sequenceB = PyBytes_AS_STRING(py_bytesB);
+        use_sequence_cstring = 1;
+    }
+#endif
+
+    /* Calculate the scores myself for an identity_match. */
+    match = mismatch = 0;
+    use_match_mismatch_scores = 0;
+    if(!(py_match = PyObject_GetAttrString(py_match_fn, "match")))
+        goto cleanup_after_py_match_fn;
+    match = PyFloat_AsDouble(py_match);
+    if(match==-1.0 && PyErr_Occurred())
+        goto cleanup_after_py_match_fn;
+    if(!(py_mismatch = PyObject_GetAttrString(py_match_fn, "mismatch")))
+        goto cleanup_after_py_match_fn;
+    mismatch = PyFloat_AsDouble(py_mismatch);
+    if(mismatch==-1.0 && PyErr_Occurred())
+        goto cleanup_after_py_match_fn;
+    use_match_mismatch_scores = 1;
+cleanup_after_py_match_fn:
+    if(PyErr_Occurred())
+        PyErr_Clear();
+    Py_XDECREF(py_match);
+    Py_XDECREF(py_mismatch);
+    if(MatchMatrix_init(&match_matrix, py_match_fn,
+                        py_sequenceA, py_sequenceB) < 0)
+        goto _cleanup_score_only_fast;
+
+    first_A_gap = calc_affine_penalty(1, open_A, extend_A,
+                                      penalize_extend_when_opening);
+    first_B_gap = calc_affine_penalty(1, open_B, extend_B,
+                                      penalize_extend_when_opening);
+
+    lenA = PySequence_Length(py_sequenceA);
+    lenB = PySequence_Length(py_sequenceB);
+    prev_row = malloc(lenB*sizeof(*prev_row));
+    current_row = malloc(lenB*sizeof(*current_row));
+    col_cache_score = malloc(lenB*sizeof(*col_cache_score));
+    if(!prev_row || !current_row || !col_cache_score) {
+        PyErr_SetString(PyExc_MemoryError, "Out of memory");
+        goto _cleanup_score_only_fast;
+    }
+
+    /* The first row of the score matrix. */
+    for(i=0; i<lenB; i++) {
+        score = _get_match_score(py_sequenceA, py_sequenceB,
+                                 py_match_fn, 0, i,
+                                 sequenceA, sequenceB,
+                                 use_sequence_cstring,
+                                 match, mismatch,
+                                 use_match_mismatch_scores,
+                                 &match_matrix);
+        if(score==-1.0 && PyErr_Occurred())
+            goto _cleanup_score_only_fast;
+        if(penalize_end_gaps_A)
+            score += calc_affine_penalty(i, open_A, extend_A,
+                                         penalize_extend_when_opening);
+        prev_row[i] = score;
+        col_cache_score[i] = score + first_B_gap;
+    }
+    best_score = _best_score_in_row(prev_row, 0, lenA, lenB,
+                                    open_A, extend_A, open_B, extend_B,
+                                    penalize_extend_when_opening,
+                                    penalize_end_gaps_A, penalize_end_gaps_B,
+                                    align_globally);
+
+    for(row=1; row<lenA; row++) {
+        score = _get_match_score(py_sequenceA, py_sequenceB,
+                                 py_match_fn, row, 0,
+                                 sequenceA, sequenceB,
+                                 use_sequence_cstring,
+                                 match, mismatch,
+                                 use_match_mismatch_scores,
+                                 &match_matrix);
+        if(score==-1.0 && PyErr_Occurred())
+            goto _cleanup_score_only_fast;
+        if(penalize_end_gaps_B)
+            score += calc_affine_penalty(row, open_B, extend_B,
+                                         penalize_extend_when_opening);
+        current_row[0] = score;
+        row_cache_score = prev_row[0] + first_A_gap;
+
+        for(col=1; col<lenB; col++) {
+            double nogap_score, row_score, col_score, delta_score;
+            double open_score, extend_score;
+
+            nogap_score = prev_row[col-1];
+            if(col > 1) {
+                row_score = row_cache_score;
+            } else {
+                row_score = nogap_score-1; /* Make sure it's not best score */
+            }
+            if(row > 1) {
+                col_score = col_cache_score[col-1];
+            } else {
+                col_score = nogap_score-1; /* Make sure it's not best score */
+            }
+            score = (row_score > col_score) ? row_score : col_score;
+            if(nogap_score > score)
+                score = nogap_score;
+
+            delta_score = _get_match_score(py_sequenceA, py_sequenceB,
+                                           py_match_fn, row, col,
+                                           sequenceA, sequenceB,
+                                           use_sequence_cstring,
+                                           match, mismatch,
+                                           use_match_mismatch_scores,
+                                           &match_matrix);
+            if(delta_score==-1.0 && PyErr_Occurred())
+                goto _cleanup_score_only_fast;
+            score += delta_score;
+            if(!align_globally && score < 0)
+                score = 0;
+            current_row[col] = score;
+
+            /* Update the cached column and row scores. */
+            open_score = nogap_score + first_B_gap;
+            extend_score = col_cache_score[col-1] + extend_B;
+            if(rint(extend_score) > rint(open_score))
+                col_cache_score[col-1] = extend_score;
+            else
+                col_cache_score[col-1] = open_score;
+            open_score = nogap_score + first_A_gap;
+            extend_score = row_cache_score + extend_A;
+            if(rint(extend_score) > rint(open_score))
+                row_cache_score = extend_score;
+            else
+                row_cache_score = open_score;
+        }
+        swap_row = prev_row;
+        prev_row = current_row;
+        current_row = swap_row;
+        score = _best_score_in_row(prev_row, row, lenA, lenB,
+                                   open_A, extend_A, open_B, extend_B,
+                                   penalize_extend_when_opening,
+                                   penalize_end_gaps_A, penalize_end_gaps_B,
+                                   align_globally);
+        if(score > best_score)
+            best_score = score;
+    }
+
+    py_retval = PyFloat_FromDouble(best_score);
+
+ _cleanup_score_only_fast:
+    MatchMatrix_free(&match_matrix);
+    if(prev_row)
+        free(prev_row);
+    if(current_row)
+        free(current_row);
+    if(col_cache_score)
+        free(col_cache_score);
+#if PY_MAJOR_VERSION >= 3
+    if (py_bytesA != NULL && py_bytesA != py_sequenceA) Py_DECREF(py_bytesA);
+    if (py_bytesB != NULL && py_bytesB != py_sequenceB) Py_DECREF(py_bytesB);
+#endif
+
+    return py_retval;
+}
+
 static PyObject *cpairwise2_rint(
     PyObject *self, PyObject *args, PyObject *keywds)
 {
@@ -583,6 +1095,8 @@ static PyObject *cpairwise2_rint(
 static PyMethodDef cpairwise2Methods[] = {
     {"_make_score_matrix_fast",
      (PyCFunction)cpairwise2__make_score_matrix_fast, METH_VARARGS, ""},
+    {"_score_only_fast",
+     (PyCFunction)cpairwise2__score_only_fast, METH_VARARGS, ""},
     {"rint", (PyCFunction)cpairwise2_rint, METH_VARARGS|METH_KEYWORDS, ""},
     {NULL, NULL, 0, NULL}
 };
@@ -152,9 +152,29 @@ type help(pairwise2.align.localds) at the Python prompt.
 #   value of the function is the score.
 # - one_alignment_only: boolean
 #   Only recover one alignment.
+# - linear_space: boolean
+#   Use memory linear in the length of the sequences, rather than
+#   holding the whole score and traceback matrices.  This needs affine
+#   gap penalties, and either score_only or one_alignment_only.  The
+#   single alignment is found by Hirschberg's divide and conquer
+#   approach, which takes about twice as long.  (The score_only mode
+#   always uses linear memory when the gap penalties are affine.)
+# - band: integer
+#   Only fill in the cells of the score matrix within this distance
+#   of the diagonal (abs(i - j) <= band), taking time and memory
+#   proportional to band times the sequence length.  This needs affine
+#   gap penalties, and is useful for near identical sequences.  A
+#   BiopythonWarning is given if an alignment outside the band could
+#   score higher than the best one found, bounding such alignments by
+#   their banded score at the edge of the band plus the best possible
+#   score for the rest of the sequences.
 
 from __future__ import print_function
 
+import warnings
+
+from Bio import BiopythonWarning
+
 __docformat__ = "restructuredtext en"
 
 MAX_ALIGNMENTS = 1000   # maximum alignments recovered in traceback
@@ -299,7 +319,9 @@ alignment occurs.
                 ('gap_char', '-'),
                 ('force_generic', 0),
                 ('score_only', 0),
-                ('one_alignment_only', 0)
+                ('one_alignment_only', 0),
+                ('linear_space', 0),
+                ('band', None)
                 ]
             for name, default in default_params:
                 keywds[name] = keywds.get(name, default)
@@ -321,21 +343,148 @@ alignment occurs.
 align = align()
 
 
+def align_many(queries, targets, function, *args, **keywds):
+    """Align every query against every target, yielding the results.
+
+    function is the name of one of the alignment functions in "align",
+    e.g. "globalms", and args are its parameters after the two
+    sequences.  Any other keyword arguments are passed on as for the
+    alignment function, except for workers (default 1), the number of
+    processes to use.  The parameters are decoded only once for all the
+    pairs, and the sequences are converted to plain strings only once.
+
+    This yields (i, j, score) tuples if called with score_only=True,
+    otherwise (i, j, score, alignments) tuples, for the i-th query and
+    j-th target.  These are in order, looping over the targets for each
+    query:
+
+    >>> from Bio import pairwise2
+    >>> for i, j, score in pairwise2.align_many(["ACCGT", "AGT"],
+    ...                                         ["ACG", "CGT"],
+    ...                                         "globalxx", score_only=True):
+    ...     print("%i %i %g" % (i, j, score))
+    0 0 3
+    0 1 3
+    1 0 2
+    1 1 2
+
+    To use more than one process, the match and gap functions must be
+    picklable (so no lambda functions as callbacks).
+    """
+    workers = keywds.pop("workers", 1)
+    if workers is not None and workers < 1:
+        raise ValueError("workers should be a positive integer")
+    queries = [_encode_sequence(s) for s in queries]
+    targets = [_encode_sequence(s) for s in targets]
+    # Decode the arguments once, using placeholders for the sequences.
+    keywds = align.alignment_function(function).decode(
+        None, None, *args, **keywds)
+    del keywds["sequenceA"], keywds["sequenceB"]
+
+    if workers == 1:
+        for i, query in enumerate(queries):
+            for result in _align_block(i, 0, query, targets, keywds):
+                yield result
+        return
+
+    import multiprocessing
+    from collections import deque
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(workers)
+    # Split the targets into blocks so that aligning one query against
+    # many targets also shares the work among the processes.
+    size = max(1, -(-len(targets) // workers))
+    try:
+        # Keep a limited number of blocks in flight to bound memory use
+        pending = deque()
+        for i, query in enumerate(queries):
+            for start in range(0, len(targets), size):
+                pending.append(pool.apply_async(
+                    _align_block, (i, start, query,
+                                   targets[start:start + size], keywds)))
+                if len(pending) >= 2 * workers:
+                    for result in pending.popleft().get():
+                        yield result
+        while pending:
+            for result in pending.popleft().get():
+                yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _encode_sequence(sequence):
+    """Return the sequence as a string, unless it is a list (PRIVATE).
+
+    SeqRecord objects are replaced by their sequence, and Seq objects by
+    a string, so that the C code can work on the characters directly.
+    """
+    sequence = getattr(sequence, "seq", sequence)
+    if isinstance(sequence, list):
+        return sequence
+    return str(sequence)
+
+
+def _align_block(i, start, query, targets, keywds):
+    """Align a query against a block of targets for align_many (PRIVATE)."""
+    results = []
+    for j, target in enumerate(targets):
+        x = _align(query, target, **keywds)
+        if keywds["score_only"]:
+            results.append((i, start + j, x))
+        else:
+            score = x[0][2] if x else None
+            results.append((i, start + j, score, x))
+    return results
+
+
 def _align(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
            penalize_extend_when_opening, penalize_end_gaps,
            align_globally, gap_char, force_generic, score_only,
-           one_alignment_only):
+           one_alignment_only, linear_space, band):
     if not sequenceA or not sequenceB:
         return []
 
-    if (not force_generic) and isinstance(gap_A_fn, affine_penalty) \
-    and isinstance(gap_B_fn, affine_penalty):
+    use_fast = (not force_generic) and isinstance(gap_A_fn, affine_penalty) \
+        and isinstance(gap_B_fn, affine_penalty)
+    if linear_space:
+        if not (score_only or one_alignment_only):
+            raise ValueError("linear_space requires score_only or "
+                             "one_alignment_only")
+        if not use_fast:
+            raise ValueError("linear_space requires affine gap penalties")
+    if band is not None:
+        if band < 0:
+            raise ValueError("band should be a non-negative integer")
+        if not use_fast:
+            raise ValueError("band requires affine gap penalties")
+        if linear_space:
+            raise ValueError("band cannot be combined with linear_space")
+
+    if use_fast:
         open_A, extend_A = gap_A_fn.open, gap_A_fn.extend
         open_B, extend_B = gap_B_fn.open, gap_B_fn.extend
-        x = _make_score_matrix_fast(
-            sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
-            penalize_extend_when_opening, penalize_end_gaps, align_globally,
-            score_only)
+        if score_only and band is None:
+            return _score_only_fast(
+                sequenceA, sequenceB, match_fn, open_A, extend_A, open_B,
+                extend_B, penalize_extend_when_opening, penalize_end_gaps,
+                align_globally)
+        if linear_space:
+            return _align_linear_space(
+                sequenceA, sequenceB, match_fn, open_A, extend_A, open_B,
+                extend_B, penalize_extend_when_opening, penalize_end_gaps,
+                align_globally, gap_char)
+        if band is None:
+            x = _make_score_matrix_fast(
+                sequenceA, sequenceB, match_fn, open_A, extend_A, open_B,
+                extend_B, penalize_extend_when_opening, penalize_end_gaps,
+                align_globally, score_only)
+        else:
+            x = _make_score_matrix_fast(
+                sequenceA, sequenceB, match_fn, open_A, extend_A, open_B,
+                extend_B, penalize_extend_when_opening, penalize_end_gaps,
+                align_globally, score_only, band)
     else:
         x = _make_score_matrix_generic(
             sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
@@ -350,10 +499,21 @@ def _align(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
     # starting points.
     starts = _find_start(
         score_matrix, sequenceA, sequenceB,
-        gap_A_fn, gap_B_fn, penalize_end_gaps, align_globally)
+        gap_A_fn, gap_B_fn, penalize_end_gaps, align_globally, band)
     # Find the highest score.
     best_score = max([x[0] for x in starts])
 
+    if band is not None and band < max(len(sequenceA), len(sequenceB)) - 1:
+        # Check no alignment outside the band could score higher.
+        bound = _band_outside_bound(sequenceA, sequenceB, score_matrix,
+                                    match_fn, gap_A_fn, gap_B_fn,
+                                    penalize_end_gaps, align_globally, band)
+        too_narrow = bound is not None and rint(bound) > rint(best_score)
+        if too_narrow:
+            warnings.warn("The band (band=%i) may be too narrow, so the best "
+                          "alignment found is not guaranteed to be optimal."
+                          % band, BiopythonWarning)
+
     # If they only want the score, then return it.
     if score_only:
         return best_score
@@ -451,14 +611,15 @@ def _make_score_matrix_generic(
                                      match_fn(sequenceA[row], sequenceB[col])
             if not align_globally and score_matrix[row][col] < 0:
                 score_matrix[row][col] = 0
-            trace_matrix[row][col] = best_indexes
+            if not score_only:
+                trace_matrix[row][col] = best_indexes
     return score_matrix, trace_matrix
 
 
 def _make_score_matrix_fast(
         sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
         penalize_extend_when_opening, penalize_end_gaps,
-        align_globally, score_only):
+        align_globally, score_only, band=None):
     first_A_gap = calc_affine_penalty(1, open_A, extend_A,
                                       penalize_extend_when_opening)
     first_B_gap = calc_affine_penalty(1, open_B, extend_B,
@@ -467,16 +628,24 @@ def _make_score_matrix_fast(
     # Create the score and traceback matrices.  These should be in the
     # shape:
     # sequenceA (down) x sequenceB (across)
+    # If there is a band, only the cells within that distance of the
+    # diagonal are filled in, and each row is a dictionary keyed on
+    # the column.
     lenA, lenB = len(sequenceA), len(sequenceB)
     score_matrix, trace_matrix = [], []
     for i in range(lenA):
-        score_matrix.append([None] * lenB)
-        trace_matrix.append([[None]] * lenB)
+        if band is None:
+            score_matrix.append([None] * lenB)
+            trace_matrix.append([[None]] * lenB)
+        else:
+            score_matrix.append({})
+            trace_matrix.append(dict((col, [None]) for col in
+                                     _band_columns(i, lenB, band)))
 
     # The top and left borders of the matrices are special cases
     # because there are no previously aligned characters.  To simplify
     # the main loop, handle these separately.
-    for i in range(lenA):
+    for i in _band_columns(0, lenA, band):
         # Align the first residue in sequenceB to the ith residue in
         # sequence A.  This is like opening up i gaps at the beginning
         # of sequence B.
@@ -485,7 +654,7 @@ def _make_score_matrix_fast(
             score += calc_affine_penalty(
                 i, open_B, extend_B, penalize_extend_when_opening)
         score_matrix[i][0] = score
-    for i in range(1, lenB):
+    for i in _band_columns(0, lenB, band)[1:]:
         score = match_fn(sequenceA[0], sequenceB[i])
         if penalize_end_gaps[0]:
             score += calc_affine_penalty(
@@ -503,36 +672,41 @@ def _make_score_matrix_fast(
 
     # The best score and indexes for each row (goes down all columns).
     # I don't need to store the last row because it's the end of the
-    # sequence.
-    row_cache_score, row_cache_index = [None] * (lenA - 1), [None] * (lenA - 1)
+    # sequence.  With a band, the caches for the rows and columns
+    # away from the start have no indexes until they enter the band.
+    row_cache_score, row_cache_index = [None] * (lenA - 1), [[]] * (lenA - 1)
     # The best score and indexes for each column (goes across rows).
-    col_cache_score, col_cache_index = [None] * (lenB - 1), [None] * (lenB - 1)
+    col_cache_score, col_cache_index = [None] * (lenB - 1), [[]] * (lenB - 1)
 
-    for i in range(lenA - 1):
+    for i in _band_columns(0, lenA - 1, band):
         # Initialize each row to be the alignment of sequenceA[i] to
         # sequenceB[0], plus opening a gap in sequenceA.
         row_cache_score[i] = score_matrix[i][0] + first_A_gap
         row_cache_index[i] = [(i, 0)]
-    for i in range(lenB - 1):
+    for i in _band_columns(0, lenB - 1, band):
         col_cache_score[i] = score_matrix[0][i] + first_B_gap
         col_cache_index[i] = [(0, i)]
 
     # Fill in the score_matrix.
+    match_row = _match_rows(match_fn, sequenceA, sequenceB, band)
     for row in range(1, lenA):
-        for col in range(1, lenB):
+        match_scores = match_row(row)
+        for col in _band_columns(row, lenB, band):
+            if col == 0:
+                continue
             # Calculate the score that would occur by extending the
             # alignment without gaps.
             nogap_score = score_matrix[row - 1][col - 1]
 
             # Check the score that would occur if there were a gap in
             # sequence A.
-            if col > 1:
+            if col > 1 and row_cache_index[row - 1]:
                 row_score = row_cache_score[row - 1]
             else:
                 row_score = nogap_score - 1   # Make sure it's not the best.
             # Check the score that would occur if there were a gap in
             # sequence B.
-            if row > 1:
+            if row > 1 and col_cache_index[col - 1]:
                 col_score = col_cache_score[col - 1]
             else:
                 col_score = nogap_score - 1
@@ -548,7 +722,7 @@ def _make_score_matrix_fast(
                 best_index.extend(col_cache_index[col - 1])
 
             # Set the score and traceback matrices.
-            score = best_score + match_fn(sequenceA[row], sequenceB[col])
+            score = best_score + match_scores[col]
             if not align_globally and score < 0:
                 score_matrix[row][col] = 0
             else:
@@ -561,7 +735,10 @@ def _make_score_matrix_fast(
             # most previously seen character.  Compare the two scores
             # and keep the best one.
             open_score = score_matrix[row - 1][col - 1] + first_B_gap
-            extend_score = col_cache_score[col - 1] + extend_B
+            if col_cache_index[col - 1]:
+                extend_score = col_cache_score[col - 1] + extend_B
+            else:
+                extend_score = open_score - 1
             open_score_rint, extend_score_rint = \
                              rint(open_score), rint(extend_score)
             if open_score_rint > extend_score_rint:
@@ -577,7 +754,10 @@ def _make_score_matrix_fast(
 
             # Update the cached row scores.
             open_score = score_matrix[row - 1][col - 1] + first_A_gap
-            extend_score = row_cache_score[row - 1] + extend_A
+            if row_cache_index[row - 1]:
+                extend_score = row_cache_score[row - 1] + extend_A
+            else:
+                extend_score = open_score - 1
             open_score_rint, extend_score_rint = \
                              rint(open_score), rint(extend_score)
             if open_score_rint > extend_score_rint:
@@ -594,6 +774,506 @@ def _make_score_matrix_fast(
     return score_matrix, trace_matrix
 
 
+def _band_columns(row, ncols, band):
+    # Return the columns of the given row of the score matrix which
+    # are filled in, i.e. those within the band if there is one.
+    if band is None:
+        return range(ncols)
+    return range(max(0, row - band), min(ncols, row + band + 1))
+
+
+def _score_only_fast(
+        sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
+        penalize_extend_when_opening, penalize_end_gaps, align_globally):
+    # This works out the same best score as _make_score_matrix_fast
+    # followed by _find_start, but only keeps the previous row of the
+    # score matrix and the column caches.  The memory needed is
+    # therefore linear in the length of sequenceB, rather than
+    # proportional to the product of the sequence lengths.
+    first_A_gap = calc_affine_penalty(1, open_A, extend_A,
+                                      penalize_extend_when_opening)
+    first_B_gap = calc_affine_penalty(1, open_B, extend_B,
+                                      penalize_extend_when_opening)
+    lenA, lenB = len(sequenceA), len(sequenceB)
+
+    # The first row of the score matrix, as in _make_score_matrix_fast.
+    prev_row = [None] * lenB
+    for i in range(lenB):
+        score = match_fn(sequenceA[0], sequenceB[i])
+        if penalize_end_gaps[0]:
+            score += calc_affine_penalty(
+                i, open_A, extend_A, penalize_extend_when_opening)
+        prev_row[i] = score
+    col_cache_score = [prev_row[i] + first_B_gap for i in range(lenB - 1)]
+    best_score = _best_score_in_row(
+        prev_row, 0, lenA, open_A, extend_A, open_B, extend_B,
+        penalize_extend_when_opening, penalize_end_gaps, align_globally)
+
+    match_row = _match_rows(match_fn, sequenceA, sequenceB)
+    for row in range(1, lenA):
+        match_scores = match_row(row)
+        score = match_scores[0]
+        if penalize_end_gaps[1]:
+            score += calc_affine_penalty(
+                row, open_B, extend_B, penalize_extend_when_opening)
+        current_row = [score] + [None] * (lenB - 1)
+        # The best score for a gap in sequenceA from the previous row.
+        row_cache_score = prev_row[0] + first_A_gap
+        for col in range(1, lenB):
+            nogap_score = prev_row[col - 1]
+            if col > 1:
+                row_score = row_cache_score
+            else:
+                row_score = nogap_score - 1
+            if row > 1:
+                col_score = col_cache_score[col - 1]
+            else:
+                col_score = nogap_score - 1
+            score = max(nogap_score, row_score, col_score) + match_scores[col]
+            if not align_globally and score < 0:
+                score = 0
+            current_row[col] = score
+
+            # Update the cached column and row scores, preferring to
+            # open a new gap when the scores are the same.
+            open_score = nogap_score + first_B_gap
+            extend_score = col_cache_score[col - 1] + extend_B
+            if rint(extend_score) > rint(open_score):
+                col_cache_score[col - 1] = extend_score
+            else:
+                col_cache_score[col - 1] = open_score
+            open_score = nogap_score + first_A_gap
+            extend_score = row_cache_score + extend_A
+            if rint(extend_score) > rint(open_score):
+                row_cache_score = extend_score
+            else:
+                row_cache_score = open_score
+        prev_row = current_row
+        best_score = max(best_score, _best_score_in_row(
+            prev_row, row, lenA, open_A, extend_A, open_B, extend_B,
+            penalize_extend_when_opening, penalize_end_gaps, align_globally))
+    return best_score
+
+
+def _match_rows(match_fn, sequenceA, sequenceB, band=None):
+    """Return a function giving the match scores for a row (PRIVATE).
+
+    The function takes the index of a residue in sequenceA, and returns
+    its match scores against the residues of sequenceB, indexed by the
+    column (a dictionary of the columns in the band, if there is one).
+    For a dictionary_match with a compiled matrix, the scores are looked
+    up using the integer codes of the residues.
+    """
+    lenB = len(sequenceB)
+    if isinstance(match_fn, dictionary_match) and match_fn.matrix is not None:
+        matrix = match_fn.matrix
+        codesA = match_fn.encode(sequenceA)
+        codesB = match_fn.encode(sequenceB)
+
+        def match_row(row):
+            scores = matrix[codesA[row]]
+            if band is None:
+                return [scores[code] for code in codesB]
+            return dict((col, scores[codesB[col]])
+                        for col in _band_columns(row, lenB, band))
+    else:
+        def match_row(row):
+            residue = sequenceA[row]
+            if band is None:
+                return [match_fn(residue, other) for other in sequenceB]
+            return dict((col, match_fn(residue, sequenceB[col]))
+                        for col in _band_columns(row, lenB, band))
+    return match_row
+
+
+def _best_score_in_row(scores, row, lenA, open_A, extend_A, open_B, extend_B,
+                       penalize_extend_when_opening, penalize_end_gaps,
+                       align_globally):
+    # Return the best starting score for the tracebacks in this row
+    # of the score matrix, see _find_global_start and _find_local_start.
+    if not align_globally:
+        return max(scores)
+    lenB = len(scores)
+    best_score = scores[-1]
+    if penalize_end_gaps[1]:
+        best_score += calc_affine_penalty(
+            lenA - row - 1, open_B, extend_B, penalize_extend_when_opening)
+    if row == lenA - 1:
+        for col in range(lenB - 1):
+            score = scores[col]
+            if penalize_end_gaps[0]:
+                score += calc_affine_penalty(
+                    lenB - col - 1, open_A, extend_A,
+                    penalize_extend_when_opening)
+            best_score = max(best_score, score)
+    return best_score
+
+
+# The linear space alignment below treats an alignment as the path of
+# aligned residue pairs (cells of the score matrix), where any gap
+# between two consecutive pairs is in only one of the sequences.  To
+# handle the end gaps, there is an extra cell before the first
+# residues and another after the last residues.  Cell (row, col) here
+# is residue row - 1 of sequenceA aligned to residue col - 1 of
+# sequenceB, so the path of a global alignment goes from (0, 0) to
+# (lenA + 1, lenB + 1).
+_NEG_INF = float("-inf")
+
+
+def _align_linear_space(
+        sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
+        penalize_extend_when_opening, penalize_end_gaps, align_globally,
+        gap_char):
+    # Find one best alignment in linear space using Hirschberg's
+    # divide and conquer approach, and return it in the same form as
+    # _recover_alignments would.
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    row_gaps = _linear_gap_params(lenA, open_A, extend_A,
+                                  penalize_extend_when_opening,
+                                  penalize_end_gaps[0])
+    col_gaps = _linear_gap_params(lenB, open_B, extend_B,
+                                  penalize_extend_when_opening,
+                                  penalize_end_gaps[1])
+    if align_globally:
+        path = _linear_space_path(sequenceA, sequenceB, match_fn,
+                                  row_gaps, col_gaps,
+                                  (0, 0), (lenA + 1, lenB + 1))
+        best_score = _linear_path_scores(sequenceA, sequenceB, match_fn,
+                                         row_gaps, col_gaps, path, 0, 1)[-1]
+    else:
+        best_score, end, start, start_score = _linear_local_forward(
+            sequenceA, sequenceB, match_fn, row_gaps, col_gaps)
+        path = _linear_space_path(sequenceA, sequenceB, match_fn,
+                                  row_gaps, col_gaps, start, end)
+        # Another path with the same score may pass through a cell with
+        # a score of zero or less, where the traceback would stop.
+        scores = _linear_path_scores(sequenceA, sequenceB, match_fn,
+                                     row_gaps, col_gaps, path, start_score, 0)
+        for i in range(len(path) - 2, 0, -1):
+            if scores[i] <= 0:
+                path = path[i:]
+                break
+
+    # Hand the path to _recover_alignments as sparse score and
+    # traceback "matrices", holding only the cells on the path.  For a
+    # local alignment the path starts at the cell before the aligned
+    # region (unless that is the extra cell at the start), which the
+    # traceback needs to see with a score of zero.
+    score_matrix, trace_matrix = {}, {}
+    previous = None
+    for i, (row, col) in enumerate(path):
+        if not (0 < row <= lenA and 0 < col <= lenB):
+            continue
+        if i == 0:
+            score_matrix[row - 1] = {col - 1: 0}
+        else:
+            score_matrix[row - 1] = {col - 1: 1}
+            trace_matrix[row - 1] = {col - 1: [previous]}
+        previous = (row - 1, col - 1)
+    return _recover_alignments(
+        sequenceA, sequenceB, [(best_score, previous)], score_matrix,
+        trace_matrix, align_globally, gap_char, True)
+
+
+def _linear_gap_params(length, open, extend, penalize_extend_when_opening,
+                       penalize_end_gaps):
+    # Return a list of (first gap penalty, extension penalty) for the
+    # gaps following each row (or column) of the linear space path,
+    # where the first and last entries are the end gaps.
+    first = calc_affine_penalty(1, open, extend, penalize_extend_when_opening)
+    params = [(first, extend)] * (length + 1)
+    if not penalize_end_gaps:
+        params[0] = params[length] = (0, 0)
+    return params
+
+
+def _linear_space_path(sequenceA, sequenceB, match_fn, row_gaps, col_gaps,
+                       start, end):
+    # Return the cells of a best path from start to end.  Each step
+    # splits a part of the path in two at its middle row, using a
+    # forward and a backward pass which only keep one row at a time.
+    path = [start]
+    stack = [(start, end)]
+    while stack:
+        first, last = stack.pop()
+        if first == last:
+            continue
+        if last[0] - first[0] <= 1 or last[1] - first[1] <= 1:
+            # These can only be joined directly.
+            path.append(last)
+            continue
+        middle = _linear_split(sequenceA, sequenceB, match_fn,
+                               row_gaps, col_gaps, first, last)
+        # The parts are taken from the end of the stack, in order.
+        stack.append((middle[-1], last))
+        if len(middle) == 2:
+            stack.append((middle[0], middle[1]))
+        stack.append((first, middle[0]))
+    return path
+
+
+def _linear_split(sequenceA, sequenceB, match_fn, row_gaps, col_gaps,
+                  first, last):
+    # Return the cells where a best path from first to last crosses the
+    # middle row between them.  This is either a single cell in the
+    # middle row, or the two cells on either side of a gap in
+    # sequenceB spanning the middle row.
+    top, left = first
+    bottom, right = last
+    middle = (top + bottom) // 2
+    scores, gap_scores, gap_rows = _linear_forward(
+        sequenceA, sequenceB, match_fn, row_gaps, col_gaps,
+        top, left, middle, right - 1)
+    rest_scores, rest_gap_scores, rest_gap_rows = _linear_backward(
+        sequenceA, sequenceB, match_fn, row_gaps, col_gaps,
+        middle, left + 1, bottom, right)
+    best_score, best_cells = _NEG_INF, None
+    for col in range(left + 1, right):
+        score = scores[col - left] + rest_scores[col - left - 1]
+        if score > best_score:
+            best_score, best_cells = score, [(middle, col)]
+    for col in range(left, right):
+        score = gap_scores[col - left] + rest_gap_scores[col - left]
+        if score > best_score:
+            best_score = score
+            best_cells = [(gap_rows[col - left], col),
+                          (rest_gap_rows[col - left], col + 1)]
+    return best_cells
+
+
+def _linear_forward(sequenceA, sequenceB, match_fn, row_gaps, col_gaps,
+                    top, left, bottom, right):
+    # Fill in the scores of the paths starting at (top, left), one row
+    # at a time down to row bottom, for the columns left to right.
+    # Return the scores in row bottom, and for each column the best
+    # score with a gap in sequenceB open across row bottom, together
+    # with the row the gap was opened from.
+    ncols = right - left + 1
+    prev_row = [_NEG_INF] * ncols
+    prev_row[0] = 0
+    col_gap_score = [_NEG_INF] * ncols
+    col_gap_row = [None] * ncols
+    for row in range(top + 1, bottom + 1):
+        first_row_gap, extend_row_gap = row_gaps[row - 1]
+        residue = sequenceA[row - 1]
+        current_row = [_NEG_INF] * ncols
+        row_gap_score = _NEG_INF
+        for i in range(1, ncols):
+            if i > 1:
+                row_gap_score = max(prev_row[i - 2] + first_row_gap,
+                                    row_gap_score + extend_row_gap)
+            score = max(prev_row[i - 1], row_gap_score, col_gap_score[i - 1])
+            if score != _NEG_INF:
+                current_row[i] = score + \
+                    match_fn(residue, sequenceB[left + i - 1])
+        for i in range(ncols):
+            first_col_gap, extend_col_gap = col_gaps[left + i]
+            open_score = prev_row[i] + first_col_gap
+            extend_score = col_gap_score[i] + extend_col_gap
+            if open_score >= extend_score:
+                col_gap_score[i] = open_score
+                col_gap_row[i] = row - 1
+            else:
+                col_gap_score[i] = extend_score
+        prev_row = current_row
+    return prev_row, col_gap_score, col_gap_row
+
+
+def _linear_backward(sequenceA, sequenceB, match_fn, row_gaps, col_gaps,
+                     top, left, bottom, right):
+    # The mirror image of _linear_forward, for the paths ending at
+    # (bottom, right), going up to row top.  Return the best score of
+    # the rest of a path leaving each cell of row top (not counting
+    # the cell itself), and for each column the best score of a path
+    # entering the column below row top after a gap in sequenceB
+    # (only counting the gap extension below row top), with the row.
+    ncols = right - left + 1
+    next_row = [_NEG_INF] * ncols
+    next_row[-1] = 0
+    col_gap_score = [_NEG_INF] * ncols
+    tail_score = [_NEG_INF] * ncols
+    tail_row = [None] * ncols
+    rest_row = None
+    for row in range(bottom - 1, top - 1, -1):
+        for i in range(ncols):
+            extend_score = tail_score[i] + col_gaps[left + i - 1][1]
+            if next_row[i] > extend_score:
+                tail_score[i] = next_row[i]
+                tail_row[i] = row + 1
+            else:
+                tail_score[i] = extend_score
+        first_row_gap, extend_row_gap = row_gaps[row]
+        residue = sequenceA[row - 1]
+        current_row = [_NEG_INF] * ncols
+        rest_row = [_NEG_INF] * ncols
+        row_gap_score = _NEG_INF
+        for i in range(ncols - 2, -1, -1):
+            if i < ncols - 2:
+                row_gap_score = max(next_row[i + 2] + first_row_gap,
+                                    row_gap_score + extend_row_gap)
+            score = max(next_row[i + 1], row_gap_score, col_gap_score[i + 1])
+            rest_row[i] = score
+            if score != _NEG_INF:
+                current_row[i] = score + \
+                    match_fn(residue, sequenceB[left + i - 1])
+        for i in range(ncols):
+            first_col_gap, extend_col_gap = col_gaps[left + i - 1]
+            col_gap_score[i] = max(next_row[i] + first_col_gap,
+                                   col_gap_score[i] + extend_col_gap)
+        next_row = current_row
+    return rest_row, tail_score, tail_row
+
+
+def _linear_local_forward(sequenceA, sequenceB, match_fn, row_gaps, col_gaps):
+    # Fill in the local alignment scores one row at a time, keeping
+    # track of where the path to each cell starts, i.e. the last cell
+    # on it with a score of zero or less.  Return the best score, the
+    # cell with the best score, and the start of its path and its score.
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    ncols = lenB + 1
+    prev_row = [_NEG_INF] * ncols
+    prev_row[0] = 0
+    prev_starts = [None] * ncols
+    prev_starts[0] = ((0, 0), 0)
+    col_gap_score = [_NEG_INF] * ncols
+    col_gap_starts = [None] * ncols
+    best_score, best_cell, best_start = None, None, None
+    for row in range(1, lenA + 1):
+        first_row_gap, extend_row_gap = row_gaps[row - 1]
+        residue = sequenceA[row - 1]
+        current_row = [_NEG_INF] * ncols
+        current_starts = [None] * ncols
+        row_gap_score, row_gap_start = _NEG_INF, None
+        for col in range(1, ncols):
+            if col > 1:
+                open_score = prev_row[col - 2] + first_row_gap
+                extend_score = row_gap_score + extend_row_gap
+                if open_score >= extend_score:
+                    row_gap_score = open_score
+                    row_gap_start = prev_starts[col - 2]
+                else:
+                    row_gap_score = extend_score
+            score, start = prev_row[col - 1], prev_starts[col - 1]
+            if row_gap_score > score:
+                score, start = row_gap_score, row_gap_start
+            if col_gap_score[col - 1] > score:
+                score, start = col_gap_score[col - 1], col_gap_starts[col - 1]
+            score += match_fn(residue, sequenceB[col - 1])
+            # Only the cells away from the edges are floored at zero.
+            if row > 1 and col > 1 and score < 0:
+                score = 0
+            if score <= 0:
+                start = ((row, col), score)
+            current_row[col] = score
+            current_starts[col] = start
+            if best_score is None or score > best_score:
+                best_score, best_cell, best_start = score, (row, col), start
+        for col in range(ncols):
+            first_col_gap, extend_col_gap = col_gaps[col]
+            open_score = prev_row[col] + first_col_gap
+            extend_score = col_gap_score[col] + extend_col_gap
+            if open_score >= extend_score:
+                col_gap_score[col] = open_score
+                col_gap_starts[col] = prev_starts[col]
+            else:
+                col_gap_score[col] = extend_score
+        prev_row, prev_starts = current_row, current_starts
+    return (best_score, best_cell) + best_start
+
+
+def _linear_path_scores(sequenceA, sequenceB, match_fn, row_gaps, col_gaps,
+                        path, start_score, align_globally):
+    # Return the score along a path of cells up to each cell.
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    scores = [start_score]
+    for (row, col), (next_row, next_col) in zip(path, path[1:]):
+        score = scores[-1]
+        if next_col - col > 1:
+            first_gap, extend_gap = row_gaps[row]
+            score += first_gap + extend_gap * (next_col - col - 2)
+        elif next_row - row > 1:
+            first_gap, extend_gap = col_gaps[col]
+            score += first_gap + extend_gap * (next_row - row - 2)
+        if next_row <= lenA and next_col <= lenB:
+            score += match_fn(sequenceA[next_row - 1], sequenceB[next_col - 1])
+        if not align_globally and next_row > 1 and next_col > 1 and score < 0:
+            score = 0
+        scores.append(score)
+    return scores
+
+
+def _band_outside_bound(sequenceA, sequenceB, score_matrix, match_fn,
+                        gap_A_fn, gap_B_fn, penalize_end_gaps, align_globally,
+                        band):
+    # Return an upper bound for the score of any alignment using a
+    # cell outside the band, or None if there are no such cells.
+    # Take the first cell Y outside the band, say above it (the same
+    # goes for below it with the sequences swapped).  Up to the cell X
+    # before Y, the alignment scores at most the banded score at X.  It
+    # then needs a gap in sequenceA to move from the diagonal d of X to
+    # Y, at least band + 1 - d long, and can align at most the residues
+    # left after Y, each scoring at most the best match.  A global
+    # alignment also needs gaps in sequenceB adding up to at least
+    # lenA - lenB + band + 1 to get back to the end of both sequences.
+    # If there is no X, the alignment starts outside the band.
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    best_match = max(0, max(match_fn(charA, charB)
+                            for charA in _distinct(sequenceA)
+                            for charB in _distinct(sequenceB)))
+
+    def gap_cost(gap_fn, length):
+        # The gaps can be one long gap or many short ones.
+        return max(gap_fn(0, length), length * gap_fn(0, 1))
+
+    gaps_A = [gap_cost(gap_A_fn, length) for length in range(2 * band + 2)]
+    gaps_B = [gap_cost(gap_B_fn, length) for length in range(2 * band + 2)]
+    bounds = []
+    if lenB - 1 > band:
+        # Above the band.
+        bound = best_match * min(lenA, lenB - band - 1)
+        if align_globally and penalize_end_gaps[0]:
+            bound += gap_A_fn(0, band + 1)
+        for row, scores in enumerate(score_matrix):
+            npairs = min(lenA - row - 1, lenB - row - band - 2)
+            if npairs > 0:
+                bound = max(bound, best_match * npairs + max(
+                    score + gaps_A[band + 1 - col + row]
+                    for col, score in scores.items()))
+        if align_globally and penalize_end_gaps[1]:
+            bound += gap_cost(gap_B_fn, max(0, lenA - lenB + band + 1))
+        bounds.append(bound)
+    if lenA - 1 > band:
+        # Below the band.
+        bound = best_match * min(lenA - band - 1, lenB)
+        if align_globally and penalize_end_gaps[1]:
+            bound += gap_B_fn(0, band + 1)
+        for row, scores in enumerate(score_matrix):
+            for col, score in scores.items():
+                npairs = min(lenB - col - 1, lenA - col - band - 2)
+                if npairs > 0:
+                    bound = max(bound, best_match * npairs + score +
+                                gaps_B[band + 1 - row + col])
+        if align_globally and penalize_end_gaps[0]:
+            bound += gap_cost(gap_A_fn, max(0, lenB - lenA + band + 1))
+        bounds.append(bound)
+    if not bounds:
+        return None
+    return max(bounds)
+
+
+def _distinct(sequence):
+    # Return the distinct residues in a sequence.
+    try:
+        return set(sequence)
+    except TypeError:
+        # Unhashable residues
+        residues = []
+        for residue in sequence:
+            if residue not in residues:
+                residues.append(residue)
+        return residues
+
+
 def _recover_alignments(sequenceA, sequenceB, starts,
                         score_matrix, trace_matrix, align_globally,
                         gap_char, one_alignment_only):
@@ -671,32 +1351,34 @@ def _recover_alignments(sequenceA, sequenceB, starts,
 
 
 def _find_start(score_matrix, sequenceA, sequenceB, gap_A_fn, gap_B_fn,
-                penalize_end_gaps, align_globally):
+                penalize_end_gaps, align_globally, band=None):
     # Return a list of (score, (row, col)) indicating every possible
     # place to start the tracebacks.
     if align_globally:
         starts = _find_global_start(
-            sequenceA, sequenceB, score_matrix, gap_A_fn, gap_B_fn, penalize_end_gaps)
+            sequenceA, sequenceB, score_matrix, gap_A_fn, gap_B_fn,
+            penalize_end_gaps, band)
     else:
-        starts = _find_local_start(score_matrix)
+        starts = _find_local_start(score_matrix, band)
     return starts
 
 
 def _find_global_start(sequenceA, sequenceB,
-                       score_matrix, gap_A_fn, gap_B_fn, penalize_end_gaps):
+                       score_matrix, gap_A_fn, gap_B_fn, penalize_end_gaps,
+                       band=None):
     # The whole sequence should be aligned, so return the positions at
     # the end of either one of the sequences.
-    nrows, ncols = len(score_matrix), len(score_matrix[0])
+    nrows, ncols = len(sequenceA), len(sequenceB)
     positions = []
     # Search all rows in the last column.
-    for row in range(nrows):
+    for row in _band_columns(ncols - 1, nrows, band):
         # Find the score, penalizing end gaps if necessary.
         score = score_matrix[row][ncols - 1]
         if penalize_end_gaps[1]:
             score += gap_B_fn(ncols, nrows - row - 1)
         positions.append((score, (row, ncols - 1)))
     # Search all columns in the last row.
-    for col in range(ncols - 1):
+    for col in _band_columns(nrows - 1, ncols - 1, band):
         score = score_matrix[nrows - 1][col]
         if penalize_end_gaps[0]:
             score += gap_A_fn(nrows, ncols - col - 1)
@@ -704,12 +1386,17 @@ def _find_global_start(sequenceA, sequenceB,
     return positions
 
 
-def _find_local_start(score_matrix):
+def _find_local_start(score_matrix, band=None):
     # Return every position in the matrix.
     positions = []
     nrows, ncols = len(score_matrix), len(score_matrix[0])
     for row in range(nrows):
-        for col in range(ncols):
+        if band is None:
+            cols = range(ncols)
+        else:
+            # Each row is a dictionary of the columns within the band.
+            cols = sorted(score_matrix[row])
+        for col in cols:
             score = score_matrix[row][col]
             positions.append((score, (row, col)))
     return positions
@@ -805,10 +1492,45 @@ class dictionary_match(object):
     true, then if (res 1, res 2) doesn't exist, I will use the score
     at (res 2, res 1).
 
+    The scores are also compiled into a dense matrix (a list of lists)
+    indexed by integer codes for the residues, which the alignment
+    code uses to look up the scores without hashing the residue pairs.
+    This is only done if there is a score for every pair of residues,
+    otherwise matrix is None:
+
+    >>> match_fn = dictionary_match({("A", "A"): 2, ("A", "C"): -1,
+    ...                              ("C", "C"): 1})
+    >>> match_fn.alphabet
+    ['A', 'C']
+    >>> match_fn.encode("CAC")
+    [1, 0, 1]
+    >>> match_fn.matrix
+    [[2, -1], [-1, 1]]
+
     """
     def __init__(self, score_dict, symmetric=1):
         self.score_dict = score_dict
         self.symmetric = symmetric
+        self.alphabet = list(set(residue for pair in score_dict
+                                 for residue in pair))
+        try:
+            self.alphabet.sort()
+        except TypeError:
+            # Residues of different types, which can't be compared
+            pass
+        self._codes = dict((residue, i)
+                           for i, residue in enumerate(self.alphabet))
+        self.matrix = []
+        for charA in self.alphabet:
+            row = []
+            for charB in self.alphabet:
+                try:
+                    row.append(self(charA, charB))
+                except KeyError:
+                    # Not every pair is scored, so use the dictionary.
+                    self.matrix = None
+                    return
+            self.matrix.append(row)
 
     def __call__(self, charA, charB):
         if self.symmetric and (charA, charB) not in self.score_dict:
@@ -817,6 +1539,14 @@ class dictionary_match(object):
             charB, charA = charA, charB
         return self.score_dict[(charA, charB)]
 
+    def encode(self, sequence):
+        """Return a list of the integer codes for the residues in sequence.
+
+        Raises a KeyError for a residue not in the alphabet.
+        """
+        codes = self._codes
+        return [codes[residue] for residue in sequence]
+
 
 class affine_penalty(object):
     """affine_penalty(open, extend[, penalize_extend_when_opening]) -> gap_fn
@@ -879,7 +1609,7 @@ def format_alignment(align1, align2, score, begin, end):
 # Try and load C implementations of functions.  If I can't,
 # then just ignore and use the pure python implementations.
 try:
-    from .cpairwise2 import rint, _make_score_matrix_fast
+    from .cpairwise2 import rint, _make_score_matrix_fast, _score_only_fast
 except ImportError:
     pass
 
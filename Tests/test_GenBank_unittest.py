@@ -11,6 +11,8 @@ from os import path
 from Bio import BiopythonParserWarning
 from Bio import GenBank
 from Bio import SeqIO
+from Bio.GenBank.Scanner import GenBankScanner, EmblScanner
+from Bio.Seq import UnknownSeq
 
 
 class GenBankTests(unittest.TestCase):
@@ -121,6 +123,41 @@ class GenBankTests(unittest.TestCase):
         self.assertTrue("XX\nPR   Project:PRJNA16232;\nXX\n" in embl, embl)
 
 
+class SkipSequenceTests(unittest.TestCase):
+    """Scanner parse_records with do_sequence=False"""
+
+    def check(self, filename, format, scanner):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", BiopythonParserWarning)
+            expected = list(SeqIO.parse(filename, format))
+            with open(filename) as handle:
+                records = list(scanner(debug=0).parse_records(
+                    handle, do_sequence=False))
+        self.assertEqual(len(expected), len(records))
+        for old, new in zip(expected, records):
+            self.assertEqual(old.id, new.id)
+            self.assertEqual(len(old), len(new))
+            if len(new):
+                self.assertTrue(isinstance(new.seq, UnknownSeq))
+            self.assertEqual(old.annotations, new.annotations)
+            self.assertEqual([repr(f) for f in old.features],
+                             [repr(f) for f in new.features])
+
+    def test_genbank(self):
+        """Skip sequences in GenBank files"""
+        for name in ["NC_000932.gb", "cor6_6.gb", "iro.gb", "blank_seq.gb",
+                     "no_end_marker.gb", "wrong_sequence_indent.gb",
+                     "NT_019265.gb", "protein_refseq2.gb"]:
+            self.check(path.join("GenBank", name), "gb", GenBankScanner)
+
+    def test_embl(self):
+        """Skip sequences in EMBL files"""
+        for name in ["TRBG361.embl", "DD231055_edited.embl", "SC10H5.embl",
+                     "U87107.embl", "AE017046.embl", "Human_contigs.embl",
+                     "patents.embl"]:
+            self.check(path.join("EMBL", name), "embl", EmblScanner)
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
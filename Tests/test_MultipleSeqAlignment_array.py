@@ -0,0 +1,125 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for the NumPy array of a MultipleSeqAlignment."""
+
+import pickle
+import unittest
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use MultipleSeqAlignment.as_array")
+
+from Bio import BiopythonDeprecationWarning
+from Bio.Alphabet import generic_dna
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.Align import MultipleSeqAlignment
+from Bio.Align.AlignInfo import SummaryInfo
+
+
+class TestAlignmentArray(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [SeqRecord(Seq("AAAACGT-", generic_dna), id="Alpha"),
+                        SeqRecord(Seq("AAA-CGT-", generic_dna), id="Beta"),
+                        SeqRecord(Seq("AAAAGGT-", generic_dna), id="Gamma"),
+                        SeqRecord(Seq("A-A-GG--", generic_dna), id="Delta")]
+        self.align = MultipleSeqAlignment(self.records)
+
+    def test_as_array(self):
+        array = self.align.as_array()
+        self.assertEqual(array.shape, (4, 8))
+        self.assertEqual(array.dtype, numpy.uint8)
+        self.assertEqual(array[3, 1], ord("-"))
+        self.assertFalse(array.flags.writeable)
+        self.assertTrue(self.align.as_array() is array)
+
+    def test_cache_reset(self):
+        self.align.as_array()
+        self.align.append(SeqRecord(Seq("CCCCCCCC", generic_dna), id="Eps"))
+        self.assertEqual(self.align.as_array().shape, (5, 8))
+        self.align.sort()
+        self.assertEqual(self.align[:, 0], "AAACA")
+        self.assertEqual(self.align.as_array()[:, 0].tobytes(), b"AAACA")
+
+    def test_columns(self):
+        expected = [self.align[:, col] for col in range(8)]
+        self.align.as_array()
+        for col in range(8):
+            self.assertEqual(self.align[:, col], expected[col])
+        self.assertEqual(self.align[1:3, 3], "-A")
+        self.assertEqual(self.align[::-1, -1], "----")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", BiopythonDeprecationWarning)
+            self.assertEqual(self.align.get_column(4), "CCGG")
+
+    def test_slices(self):
+        self.align.as_array()
+        sub_align = self.align[1:, 2:5]
+        self.assertEqual([str(rec.seq) for rec in sub_align],
+                         ["A-C", "AAG", "A-G"])
+        self.assertEqual(sub_align.as_array().tobytes(), b"A-CAAGA-G")
+        self.assertEqual(sub_align[:, 1], "-A-")
+        sub_align = self.align[::2]
+        self.assertEqual(sub_align.as_array().shape, (2, 8))
+        combined = self.align[:, :2] + self.align[:, 6:]
+        self.assertEqual(combined.as_array()[3].tobytes(), b"A---")
+
+    def test_column_counts(self):
+        counts = self.align.get_column_counts()
+        self.assertEqual(len(counts), 8)
+        self.assertEqual(counts[0], {"A": 4})
+        self.assertEqual(counts[3], {"A": 2, "-": 2})
+        self.assertEqual(counts[4], {"C": 2, "G": 2})
+        self.assertEqual(counts[7], {"-": 4})
+        summary = SummaryInfo(self.align)
+        self.assertEqual(str(summary.dumb_consensus(0.7)), "AAAAXGTX")
+        self.assertEqual(str(summary.gap_consensus(0.7)), "AAAXXGT-")
+
+    def test_no_implicit_cache(self):
+        align = MultipleSeqAlignment([SeqRecord(Seq("acgt"), id="one"),
+                                      SeqRecord(Seq("acga"), id="two")])
+        self.assertEqual(str(SummaryInfo(align).dumb_consensus()), "acgX")
+        align.remove_gap_columns()
+        self.assertTrue(align._array is None)
+        for record in align:
+            record.seq = record.seq.upper()
+        self.assertEqual(align[:, 0], "AA")
+        self.assertEqual(str(SummaryInfo(align).dumb_consensus()), "ACGX")
+
+    def test_pickle(self):
+        self.align.as_array()
+        align = pickle.loads(pickle.dumps(self.align))
+        self.assertEqual(align[:, 3], "A-A-")
+        self.assertTrue(align._array is None)
+        self.assertEqual(align.as_array().tobytes(),
+                         self.align.as_array().tobytes())
+        self.assertFalse(align.as_array().flags.writeable)
+        # As pickled by older versions, without the array attribute
+        del self.align.__dict__["_array"]
+        align = pickle.loads(pickle.dumps(self.align))
+        self.assertEqual(align[:, 1], "AAA-")
+        self.assertEqual([rec.id for rec in align[1:3]], ["Beta", "Gamma"])
+        self.assertEqual(align.as_array().shape, (4, 8))
+
+    def test_remove_gap_columns(self):
+        align = self.align[3:].remove_gap_columns()
+        self.assertEqual(str(align[0].seq), "AAGG")
+        self.assertEqual(align.as_array().tobytes(), b"AAGG")
+        align = self.align.remove_gap_columns()
+        self.assertEqual(align.get_alignment_length(), 7)
+        self.assertEqual([rec.id for rec in align],
+                         ["Alpha", "Beta", "Gamma", "Delta"])
+        align = MultipleSeqAlignment([]).remove_gap_columns()
+        self.assertEqual(len(align), 0)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
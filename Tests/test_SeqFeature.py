@@ -5,9 +5,15 @@
 
 """Tests Bio.SeqFeature.
 """
+import copy
+import pickle
 import unittest
 from os import path
 from Bio import SeqIO
+from Bio.SeqFeature import SeqFeature, FeatureLocation, CompoundLocation
+from Bio.SeqFeature import ExactPosition, BeforePosition, AfterPosition
+from Bio.SeqFeature import WithinPosition, BetweenPosition, OneOfPosition
+from Bio.SeqFeature import UnknownPosition
 
 
 class TestReference(unittest.TestCase):
@@ -26,3 +32,72 @@ class TestReference(unittest.TestCase):
         self.assertNotEqual(rec1.annotations['references'][0], rec2.annotations['references'][1])
         self.assertEqual(rec1.annotations['references'][1], rec1.annotations['references'][1])
         self.assertEqual(rec1.annotations['references'][1], rec2.annotations['references'][1])
+
+
+class TestSlots(unittest.TestCase):
+    """Tests for the slot based feature and location objects"""
+
+    def setUp(self):
+        self.positions = [ExactPosition(5), BeforePosition(5),
+                          AfterPosition(5), WithinPosition(5, 5, 8),
+                          BetweenPosition(5, 3, 5),
+                          OneOfPosition(5, [ExactPosition(5),
+                                            ExactPosition(8)]),
+                          UnknownPosition()]
+        location = CompoundLocation([FeatureLocation(1, 5, strand=-1),
+                                     FeatureLocation(BeforePosition(8),
+                                                     WithinPosition(12, 10, 12),
+                                                     strand=-1, ref="X1",
+                                                     ref_db="GenBank")],
+                                    operator="order")
+        self.feature = SeqFeature(location, type="CDS", id="test",
+                                  qualifiers={"gene": ["abc"]})
+
+    def check_feature(self, old, new):
+        self.assertEqual(repr(old), repr(new))
+        self.assertEqual(old.qualifiers, new.qualifiers)
+        self.assertEqual(old.location.parts[1].ref,
+                         new.location.parts[1].ref)
+        self.assertEqual(old.location.parts[1].ref_db,
+                         new.location.parts[1].ref_db)
+
+    def test_no_dict(self):
+        """Simple positions have no per-instance dictionary"""
+        for position in self.positions[:3] + self.positions[-1:]:
+            self.assertFalse(hasattr(position, "__dict__"), repr(position))
+
+    def test_extra_attributes(self):
+        """Extra attributes can still be added to features and locations"""
+        self.feature.extra = 1
+        self.feature.location.extra = 2
+        self.feature.location.parts[0].extra = 3
+        self.assertEqual(1, self.feature.extra)
+        self.assertEqual(2, self.feature.location.extra)
+        self.assertEqual(3, self.feature.location.parts[0].extra)
+
+    def test_pickle(self):
+        """Pickle features, locations and positions with all protocols"""
+        self.feature.extra = "value"
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            new = pickle.loads(pickle.dumps(self.feature, protocol))
+            self.check_feature(self.feature, new)
+            self.assertEqual("value", new.extra)
+            for position in self.positions:
+                new = pickle.loads(pickle.dumps(position, protocol))
+                self.assertEqual(repr(position), repr(new))
+                self.assertEqual(type(position), type(new))
+
+    def test_copy(self):
+        """Copy and deepcopy features"""
+        new = copy.copy(self.feature)
+        self.check_feature(self.feature, new)
+        self.assertTrue(new.location is self.feature.location)
+        new = copy.deepcopy(self.feature)
+        self.check_feature(self.feature, new)
+        self.assertFalse(new.location is self.feature.location)
+        self.assertFalse(new.qualifiers is self.feature.qualifiers)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -6,11 +6,15 @@
 
 from __future__ import print_function
 
+import os
+import shutil
+import tempfile
 import unittest
 from Bio._py3k import StringIO
 
 from Bio import SeqIO
-from Bio.SeqIO.FastaIO import FastaIterator
+from Bio import bgzf
+from Bio.SeqIO.FastaIO import FastaIterator, IndexedFasta, read_fai
 from Bio.Alphabet import generic_protein, generic_nucleotide, generic_dna
 
 
@@ -176,6 +180,127 @@ for filename in multi_amino_files:
     setattr(TitleFunctions, "test_mutli_pro_%s" % name, funct(filename))
     del funct
 
+class IndexedFastaTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="biopython-test")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def copy(self, filename, data=None):
+        """Copy the file (or write the data) into the temp directory."""
+        if data is None:
+            with open(filename, "rb") as handle:
+                data = handle.read()
+        new_filename = os.path.join(self.temp_dir, os.path.basename(filename))
+        with open(new_filename, "wb") as handle:
+            handle.write(data)
+        return new_filename
+
+    def check_fetch(self, filename, original=None):
+        expected = [(record.id, str(record.seq)) for record in
+                    SeqIO.parse(original or filename, "fasta")]
+        with IndexedFasta(filename) as fasta:
+            self.assertEqual([name for name, seq in expected], list(fasta))
+            self.assertEqual(len(expected), len(fasta))
+            for name, seq in expected:
+                self.assertTrue(name in fasta)
+                self.assertEqual(len(seq), fasta.length(name))
+                self.assertEqual(seq, fasta.fetch(name))
+                for start, end in [(0, 1), (0, 70), (1, 71), (69, 141),
+                                   (100, 102), (len(seq) - 5, len(seq) + 10),
+                                   (5, 5), (10, 3)]:
+                    self.assertEqual(seq[start:end],
+                                     fasta.fetch(name, start, end))
+            self.assertRaises(KeyError, fasta.fetch, "missing")
+            self.assertRaises(ValueError, fasta.fetch, name, -1, 10)
+
+    def test_plain(self):
+        for filename in ["Fasta/f002", "Quality/example.fasta",
+                         "GenBank/NC_005816.fna"]:
+            filename = self.copy(filename)
+            self.check_fetch(filename)
+            entries = read_fai(filename + ".fai")
+            # Reloading the saved index
+            self.check_fetch(filename)
+            self.assertEqual(entries, read_fai(filename + ".fai"))
+
+    def test_fai_values(self):
+        filename = self.copy("Fasta/f002")
+        IndexedFasta(filename).close()
+        self.assertEqual([("gi|1348912|gb|G26680|G26680", 633, 102, 70, 71),
+                          ("gi|1348917|gb|G26685|G26685", 413, 796, 70, 71),
+                          ("gi|1592936|gb|G29385|G29385", 471, 1265, 70, 71)],
+                         read_fai(filename + ".fai"))
+
+    def test_dos(self):
+        with open("Fasta/f002", "rb") as handle:
+            data = handle.read()
+        filename = self.copy("f002_dos", data.replace(b"\n", b"\r\n"))
+        self.check_fetch(filename, "Fasta/f002")
+
+    def write_bgzf(self, filename, block_size):
+        with open("GenBank/NC_005816.fna", "rb") as handle:
+            data = handle.read()
+        writer = bgzf.BgzfWriter(filename, "wb")
+        for i in range(0, len(data), block_size):
+            writer.write(data[i:i + block_size])
+            writer.flush()
+        writer.close()
+
+    def test_bgzf(self):
+        filename = os.path.join(self.temp_dir, "NC_005816.fna.bgz")
+        # Write small blocks so that the regions span several blocks
+        self.write_bgzf(filename, 1000)
+        self.check_fetch(filename, "GenBank/NC_005816.fna")
+        self.assertTrue(os.path.isfile(filename + ".gzi"))
+        self.check_fetch(filename, "GenBank/NC_005816.fna")
+
+    def test_bgzf_stale_gzi(self):
+        filename = os.path.join(self.temp_dir, "NC_005816.fna.bgz")
+        self.write_bgzf(filename, 1000)
+        self.check_fetch(filename, "GenBank/NC_005816.fna")
+        # Rewrite with different block offsets, making sure the old
+        # .fai and .gzi files are older than the new BGZF file
+        self.write_bgzf(filename, 3000)
+        mtime = os.path.getmtime(filename)
+        for index_filename in [filename + ".fai", filename + ".gzi"]:
+            os.utime(index_filename, (mtime - 10, mtime - 10))
+        self.check_fetch(filename, "GenBank/NC_005816.fna")
+        # Again, but with only the .gzi out of date
+        self.write_bgzf(filename, 2000)
+        mtime = os.path.getmtime(filename)
+        os.utime(filename + ".gzi", (mtime - 10, mtime - 10))
+        os.utime(filename + ".fai", (mtime + 10, mtime + 10))
+        self.check_fetch(filename, "GenBank/NC_005816.fna")
+        self.assertTrue(os.path.getmtime(filename + ".gzi") >= mtime)
+        # A stale .gzi is not used for seeking either
+        other = os.path.join(self.temp_dir, "other.fna.bgz")
+        self.write_bgzf(other, 1000)
+        bgzf.write_gzi(other, filename + ".gzi")
+        os.utime(filename + ".gzi", (mtime - 10, mtime - 10))
+        with open("GenBank/NC_005816.fna", "rb") as handle:
+            data = handle.read()
+        with bgzf.BgzfReader(filename, "rb") as handle:
+            handle.seek_uncompressed(5000)
+            self.assertEqual(data[5000:5010], handle.read(10))
+
+    def test_bad_line_lengths(self):
+        filename = self.copy("bad.fasta", b">alpha\nACGT\nAC\nACGT\n")
+        self.assertRaises(ValueError, IndexedFasta, filename)
+        filename = self.copy("bad.fasta", b">alpha\nACGT\nACGTA\n")
+        self.assertRaises(ValueError, IndexedFasta, filename)
+        filename = self.copy("bad.fasta", b">alpha\nACGT\n\nACGT\n")
+        self.assertRaises(ValueError, IndexedFasta, filename)
+        filename = self.copy("bad.fasta", b">alpha\nACGT\n>alpha\nACGT\n")
+        self.assertRaises(ValueError, IndexedFasta, filename)
+
+    def test_handle(self):
+        with open("Fasta/f002", "rb") as handle:
+            self.assertRaises(TypeError, IndexedFasta, handle)
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -10,6 +10,7 @@ from __future__ import print_function
 import os
 import unittest
 import warnings
+from array import array
 
 from Bio._py3k import range
 from Bio._py3k import StringIO
@@ -716,6 +717,187 @@ class MappingTests(unittest.TestCase):
                          expected_phred)
 
 
+class TestCompactQualities(unittest.TestCase):
+    """Quality scores held as arrays of bytes rather than lists."""
+
+    iterators = {"fastq": QualityIO.FastqPhredIterator,
+                 "fastq-solexa": QualityIO.FastqSolexaIterator,
+                 "fastq-illumina": QualityIO.FastqIlluminaIterator}
+
+    def check(self, filename, in_format):
+        iterator = self.iterators[in_format]
+        with open(filename) as handle:
+            expected = list(iterator(handle))
+        with open(filename) as handle:
+            records = list(iterator(handle, compact=True))
+        self.assertEqual(len(expected), len(records))
+        for old, new in zip(expected, records):
+            self.assertEqual(str(old.seq), str(new.seq))
+            for key, value in new.letter_annotations.items():
+                self.assertTrue(isinstance(value, array))
+                self.assertEqual(old.letter_annotations[key], list(value))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", BiopythonWarning)
+                for out_format in ["fastq", "fastq-solexa", "fastq-illumina",
+                                   "qual"]:
+                    self.assertEqual(old.format(out_format),
+                                     new.format(out_format))
+                    self.assertEqual(old[5:-3:2].format(out_format),
+                                     new[5:-3:2].format(out_format))
+                    self.assertEqual((old + old).format(out_format),
+                                     (new + new).format(out_format))
+
+    def test_sanger(self):
+        for name in ["sanger_full_range_original_sanger.fastq",
+                     "longreads_original_sanger.fastq",
+                     "misc_dna_original_sanger.fastq", "tricky.fastq",
+                     "zero_length.fastq"]:
+            self.check(os.path.join("Quality", name), "fastq")
+
+    def test_solexa(self):
+        self.check(os.path.join("Quality",
+                                "solexa_full_range_original_solexa.fastq"),
+                   "fastq-solexa")
+        self.check(os.path.join("Quality", "solexa_faked.fastq"),
+                   "fastq-solexa")
+
+    def test_illumina(self):
+        self.check(os.path.join("Quality",
+                                "illumina_full_range_original_illumina.fastq"),
+                   "fastq-illumina")
+
+    def test_invalid(self):
+        for in_format, qual in [("fastq", " "), ("fastq-illumina", "!"),
+                                ("fastq-solexa", ":")]:
+            handle = StringIO("@Test\nAC\n+\nA%s\n" % qual)
+            records = self.iterators[in_format](handle, compact=True)
+            self.assertRaises(ValueError, next, records)
+
+    def test_bytes(self):
+        record = SeqRecord(Seq("ACGT"), id="Test", description="")
+        for qualities in [array("B", [0, 10, 40, 93]), bytearray([0, 10, 40, 93]),
+                          bytes(bytearray([0, 10, 40, 93]))]:
+            record.letter_annotations["phred_quality"] = qualities
+            self.assertEqual("@Test\nACGT\n+\n!+I~\n", record.format("fastq"))
+        record.letter_annotations["phred_quality"] = array("B", [0, 10, 40, 94])
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always", BiopythonWarning)
+            self.assertEqual("@Test\nACGT\n+\n!+I~\n", record.format("fastq"))
+            self.assertEqual(1, len(w))
+
+    def test_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            # Optional dependency
+            return
+        record = SeqRecord(Seq("ACGT"), id="Test", description="")
+        record.letter_annotations["phred_quality"] = \
+            numpy.array([10, 20, 30, 40], dtype=numpy.uint8)
+        self.assertEqual("@Test\nACGT\n+\n+5?I\n", record.format("fastq"))
+        record.letter_annotations["phred_quality"] = \
+            numpy.array([10, 20, 30, 40], dtype=numpy.int8)
+        self.assertEqual("@Test\nACGT\n+\n+5?I\n", record.format("fastq"))
+
+    def test_solexa_below_minus_five(self):
+        """Solexa scores below -5 are still converted with a warning."""
+        record = SeqRecord(Seq("ACGT"), id="Test", description="")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", BiopythonWarning)
+            record.letter_annotations["solexa_quality"] = [-6, -5, 0, 40]
+            expected = record.format("fastq-sanger")
+            record.letter_annotations["solexa_quality"] = array("b", [-6, -5, 0, 40])
+            self.assertEqual(expected, record.format("fastq-sanger"))
+
+    def test_add_list(self):
+        record = SeqRecord(Seq("AC"), id="Test",
+                           letter_annotations={"phred_quality": array("B", [1, 2])})
+        other = SeqRecord(Seq("GT"), id="Test",
+                          letter_annotations={"phred_quality": [3, 4]})
+        self.assertEqual(array("B", [1, 2, 3, 4]),
+                         (record + other).letter_annotations["phred_quality"])
+        self.assertEqual(array("B", [3, 4, 1, 2]),
+                         (other + record).letter_annotations["phred_quality"])
+
+
+class TestFilterPipeline(unittest.TestCase):
+    """Trimming and filtering reads as string tuples."""
+
+    def test_quality_window(self):
+        def reference(qual, threshold, window):
+            scores = [ord(letter) - 33 for letter in qual]
+            if len(scores) < window:
+                if scores and sum(scores) < threshold * len(scores):
+                    return 0
+                return len(scores)
+            for start in range(len(scores) - window + 1):
+                if sum(scores[start:start + window]) < threshold * window:
+                    return start
+            return len(scores)
+
+        for filename in ["sanger_full_range_original_sanger.fastq",
+                         "longreads_original_sanger.fastq",
+                         "misc_dna_original_sanger.fastq",
+                         "example.fastq", "zero_length.fastq"]:
+            with open(os.path.join("Quality", filename)) as handle:
+                reads = list(QualityIO.FastqGeneralIterator(handle))
+            for threshold, window in [(20, 4), (30, 1), (10, 8), (25, 50)]:
+                trimmer = QualityIO.quality_window_trimmer(threshold, window)
+                for title, seq, qual in reads:
+                    length = reference(qual, threshold, window)
+                    self.assertEqual((title, seq[:length], qual[:length]),
+                                     trimmer((title, seq, qual)))
+
+    def test_illumina_offset(self):
+        trimmer = QualityIO.quality_window_trimmer(20, window=1, offset=64)
+        self.assertEqual(("Test", "AC", "hh"),
+                         trimmer(("Test", "ACGT", "hhSh")))
+
+    def test_adapter(self):
+        read = ("Test", "ACGTAGATCGGAAGAGC", "ABCDEFGHIJKLMNOPQ")
+        trimmer = QualityIO.adapter_trimmer("AGATCGGAAGAGC")
+        self.assertEqual(("Test", "ACGT", "ABCD"), trimmer(read))
+        # Lower case read, partial adapter at the end
+        self.assertEqual(("Test", "acgtac", "ABCDEF"),
+                         trimmer(("Test", "acgtacagatc", "ABCDEFGHIJK")))
+        # Partial match too short
+        self.assertEqual(("Test", "ACGTACAG", "ABCDEFGH"),
+                         trimmer(("Test", "ACGTACAG", "ABCDEFGH")))
+        # Two mismatches
+        read = ("Test", "ACGTAGTTCGCAAGAGC", "ABCDEFGHIJKLMNOPQ")
+        self.assertEqual(read, trimmer(read))
+        self.assertEqual(read, QualityIO.adapter_trimmer(
+            "AGATCGGAAGAGC", max_mismatches=1)(read))
+        self.assertEqual(("Test", "ACGT", "ABCD"), QualityIO.adapter_trimmer(
+            "AGATCGGAAGAGC", max_mismatches=2)(read))
+        self.assertRaises(ValueError, QualityIO.adapter_trimmer, "")
+
+    def test_filters(self):
+        reads = [("a", "ACGTN", "IIIII"), ("b", "NNNN", "IIII"),
+                 ("c", "ACG", "III"), ("d", "ACnTn", "IIIII")]
+        stages = [QualityIO.max_n_filter(1), QualityIO.min_length_filter(4)]
+        self.assertEqual([("a", "ACGTN", "IIIII")],
+                         list(QualityIO.FastqFilterIterator(reads, stages)))
+        self.assertEqual(reads,
+                         list(QualityIO.FastqFilterIterator(reads, [])))
+
+    def test_paired(self):
+        reads1 = [("r1/1", "ACGT", "IIII"), ("r2/1", "AC", "II"),
+                  ("r3/1 x", "ACGT", "IIII"), ("r4/1", "ACGT", "IIII")]
+        reads2 = [("r1/2", "ACG", "III"), ("r2/2", "ACGT", "IIII"),
+                  ("r3/2 y", "ACGT", "IIII"), ("r4/2", "A", "I")]
+        pairs = list(QualityIO.PairedFastqFilterIterator(
+            reads1, reads2, [QualityIO.min_length_filter(3)]))
+        self.assertEqual([(reads1[0], reads2[0]), (reads1[2], reads2[2])],
+                         pairs)
+        with self.assertRaises(ValueError):
+            list(QualityIO.PairedFastqFilterIterator(reads1, reads2[:3], []))
+        with self.assertRaises(ValueError):
+            list(QualityIO.PairedFastqFilterIterator(reads1[:3], reads2, []))
+        with self.assertRaises(ValueError):
+            list(QualityIO.PairedFastqFilterIterator(reads1, reads2[::-1], []))
+
+
 class TestSFF(unittest.TestCase):
     """Test SFF specific details."""
     def test_overlapping_clip(self):
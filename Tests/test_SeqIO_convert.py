@@ -11,6 +11,7 @@ import warnings
 from Bio.Seq import UnknownSeq
 from Bio import SeqIO
 from Bio.SeqIO import QualityIO
+from Bio.SeqIO import _convert
 from Bio.SeqIO._convert import _converter as converter_dict
 from Bio._py3k import StringIO
 from Bio.Alphabet import generic_protein, generic_nucleotide, generic_dna
@@ -240,6 +241,71 @@ for filename, format, alphabet in tests:
     del funct
 
 
+class BlockConvertTests(unittest.TestCase):
+    """FASTQ conversion with tiny blocks, so records span block boundaries."""
+    def setUp(self):
+        self.block_size = _convert._BLOCK_SIZE
+
+    def tearDown(self):
+        _convert._BLOCK_SIZE = self.block_size
+
+    def convert(self, filename, in_format, out_format, block_size):
+        _convert._BLOCK_SIZE = block_size
+        handle = StringIO()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            SeqIO.convert(filename, in_format, handle, out_format)
+        return handle.getvalue()
+
+    def test_good(self):
+        for filename, in_format in [("Quality/example.fastq", "fastq"),
+                                    ("Quality/tricky.fastq", "fastq"),
+                                    ("Quality/zero_length.fastq", "fastq"),
+                                    ("Quality/wrapping_original_sanger.fastq", "fastq"),
+                                    ("Quality/sanger_faked.fastq", "fastq-sanger"),
+                                    ("Quality/solexa_faked.fastq", "fastq-solexa"),
+                                    ("Quality/illumina_faked.fastq", "fastq-illumina")]:
+            for (fmt1, out_format) in converter_dict:
+                if fmt1 != in_format:
+                    continue
+                expected = self.convert(filename, in_format, out_format,
+                                        self.block_size)
+                for block_size in [1, 50, 200]:
+                    self.assertEqual(expected,
+                                     self.convert(filename, in_format,
+                                                  out_format, block_size))
+
+    def test_bad(self):
+        for filename in ["Quality/error_diff_ids.fastq",
+                         "Quality/error_long_qual.fastq",
+                         "Quality/error_short_qual.fastq",
+                         "Quality/error_qual_null.fastq",
+                         "Quality/error_trunc_in_qual.fastq",
+                         "Quality/error_double_seq.fastq",
+                         "Quality/error_double_qual.fastq"]:
+            _convert._BLOCK_SIZE = 50
+            for (fmt1, out_format) in converter_dict:
+                if fmt1 == "fastq" and (out_format not in ["fasta", "tab"] or
+                                        "error_qual_" not in filename):
+                    check_convert_fails(filename, "fastq", out_format)
+
+    def test_partial(self):
+        """Records before an error in the file are still converted."""
+        for filename, count in [("Quality/error_diff_ids.fastq", 2),
+                                ("Quality/error_trunc_at_plus.fastq", 4)]:
+            expected = StringIO()
+            records = SeqIO.parse(filename, "fastq")
+            self.assertRaises(ValueError, SeqIO.write, records, expected,
+                              "fasta")
+            self.assertEqual(count, expected.getvalue().count(">"))
+            for block_size in [self.block_size, 50]:
+                _convert._BLOCK_SIZE = block_size
+                handle = StringIO()
+                self.assertRaises(ValueError, SeqIO.convert, filename,
+                                  "fastq", handle, "fasta")
+                self.assertEqual(expected.getvalue(), handle.getvalue())
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -33,6 +33,7 @@ except NameError:
 from Bio.SeqRecord import SeqRecord
 from Bio import SeqIO
 from Bio.SeqIO._index import _FormatToRandomAccess
+from Bio.File import _CompactOffsets
 from Bio.Alphabet import generic_protein, generic_nucleotide, generic_dna
 
 from seq_tests_common import compare_record
@@ -319,6 +320,11 @@ class IndexDictTests(unittest.TestCase):
         rec_dict.close()
         del rec_dict
 
+        rec_dict = SeqIO.index(filename, format, alphabet, compact=True)
+        self.check_dict_methods(rec_dict, id_list, id_list)
+        rec_dict.close()
+        del rec_dict
+
         if not sqlite3:
             return
 
@@ -370,6 +376,17 @@ class IndexDictTests(unittest.TestCase):
         del rec_dict
 
         os.remove(index_tmp)
+        os.chdir(CUR_DIR)
+
+        # In memory, but with offsets cached on disk (build then reload)
+        for i in range(2):
+            rec_dict = SeqIO.index(filename, format, alphabet, cache=index_tmp)
+            self.check_dict_methods(rec_dict, id_list, id_list)
+            rec_dict.close()
+            del rec_dict
+            self.assertTrue(os.path.isfile(index_tmp))
+
+        os.remove(index_tmp)
 
     def key_check(self, filename, format, alphabet, comp):
         """Check indexing with a key function."""
@@ -451,6 +468,19 @@ class IndexDictTests(unittest.TestCase):
             pass
         self.assertEqual(rec_dict.get(chr(0)), None)
         self.assertEqual(rec_dict.get(chr(0), chr(1)), chr(1))
+        # Batched lookups, in request order and in file order
+        key_to_id = dict(zip(keys, ids))
+        requested = list(reversed(keys)) + list(keys[:1])
+        pairs = list(rec_dict.get_many(requested))
+        self.assertEqual(requested, [key for key, rec in pairs])
+        for key, rec in pairs:
+            self.assertEqual(key_to_id[key], rec.id)
+        pairs = list(rec_dict.get_many(reversed(keys), file_order=True))
+        self.assertEqual(list(keys), [key for key, rec in pairs])
+        self.assertEqual(list(ids), [rec.id for key, rec in pairs])
+        if keys:
+            self.assertRaises(KeyError, list,
+                              rec_dict.get_many([keys[0], chr(0)]))
         if hasattr(dict, "iteritems"):
             # Python 2.x
             for key, rec in rec_dict.items():
@@ -551,6 +581,10 @@ class IndexDictTests(unittest.TestCase):
             else:
                 rec2 = SeqIO.read(handle, format, alphabet)
             self.assertEqual(True, compare_record(rec1, rec2))
+        pairs = list(rec_dict.get_raw_many(reversed(id_list)))
+        self.assertEqual(list(reversed(id_list)), [key for key, raw in pairs])
+        for key, raw in pairs:
+            self.assertEqual(rec_dict.get_raw(key), raw)
         rec_dict.close()
         del rec_dict
 
@@ -564,6 +598,14 @@ class IndexDictTests(unittest.TestCase):
         """Index file with duplicate identifers with Bio.SeqIO.index()"""
         self.assertRaises(ValueError, SeqIO.index, "Fasta/dups.fasta", "fasta")
 
+    if sqlite3:
+        def test_duplicates_index_cache(self):
+            """Index file with duplicate identifers using a cache"""
+            os.remove(self.index_tmp)
+            self.assertRaises(ValueError, SeqIO.index, "Fasta/dups.fasta",
+                              "fasta", cache=self.index_tmp)
+            self.assertFalse(os.path.isfile(self.index_tmp))
+
     def test_duplicates_to_dict(self):
         """Index file with duplicate identifers with Bio.SeqIO.to_dict()"""
         handle = open("Fasta/dups.fasta", _universal_read_mode)
@@ -571,6 +613,241 @@ class IndexDictTests(unittest.TestCase):
         self.assertRaises(ValueError, SeqIO.to_dict, iterator)
         handle.close()
 
+if sqlite3:
+    class ParallelIndexDbTests(unittest.TestCase):
+        """Bio.SeqIO.index_db(...) scanning files in worker processes."""
+        files = ["GenBank/NC_000932.faa", "GenBank/NC_005816.faa",
+                 "SwissProt/multi_ex.fasta", "Fasta/f002"]
+
+        def setUp(self):
+            h, self.index_tmp = tempfile.mkstemp("_idx.tmp")
+            os.close(h)
+            os.remove(self.index_tmp)
+
+        def tearDown(self):
+            if os.path.isfile(self.index_tmp):
+                os.remove(self.index_tmp)
+
+        def test_workers(self):
+            calls = []
+            expected = SeqIO.index_db(":memory:", self.files, "fasta")
+            rec_dict = SeqIO.index_db(self.index_tmp, self.files, "fasta",
+                                      workers=2,
+                                      progress=lambda *args: calls.append(args))
+            self.assertEqual(len(expected), len(rec_dict))
+            self.assertEqual(list(expected), list(rec_dict))
+            self.assertEqual([(1, 4, 85), (2, 4, 95), (3, 4, 103), (4, 4, 106)],
+                             calls)
+            for key in expected:
+                self.assertEqual(expected.get_raw(key), rec_dict.get_raw(key))
+            # Batched lookups over several files
+            keys = sorted(expected)
+            self.assertEqual([(key, expected.get_raw(key)) for key in keys],
+                             list(rec_dict.get_raw_many(keys)))
+            ids = [record.id for filename in self.files
+                   for record in SeqIO.parse(filename, "fasta")]
+            self.assertEqual(ids,
+                             [key for key, raw in
+                              rec_dict.get_raw_many(keys, file_order=True)])
+            rec_dict.close()
+            rec_dict._con.close()  # hack for PyPy
+            expected.close()
+            # Reload it (built as usual, so no worker processes used)
+            rec_dict = SeqIO.index_db(self.index_tmp, self.files, "fasta")
+            self.assertEqual(106, len(rec_dict))
+            self.assertTrue(compare_record(
+                next(SeqIO.parse("Fasta/f002", "fasta")),
+                rec_dict["gi|1348912|gb|G26680|G26680"]))
+            rec_dict.close()
+            rec_dict._con.close()  # hack for PyPy
+
+        def test_duplicates(self):
+            self.assertRaises(ValueError, SeqIO.index_db, ":memory:",
+                              ["Fasta/dups.fasta", "Fasta/f002"], "fasta",
+                              workers=2)
+
+        def test_bad_workers(self):
+            self.assertRaises(ValueError, SeqIO.index_db, ":memory:",
+                              self.files, "fasta", workers=0)
+
+
+class CompactOffsetsTests(unittest.TestCase):
+    """Tests for the memory efficient key storage."""
+    def test_mapping(self):
+        keys = ["read%i" % i for i in range(1000)] + ["", "\xe9t\xe9"]
+        offsets = _CompactOffsets()
+        for i, key in enumerate(keys):
+            self.assertFalse(key in offsets)
+            offsets[key] = 2 ** 40 + i
+        self.assertEqual(len(keys), len(offsets))
+        self.assertEqual(keys, list(offsets))
+        for i, key in enumerate(keys):
+            self.assertTrue(key in offsets)
+            self.assertEqual(2 ** 40 + i, offsets[key])
+        self.assertFalse("missing" in offsets)
+        self.assertFalse(("read1",) in offsets)
+        self.assertRaises(KeyError, offsets.__getitem__, "missing")
+        self.assertRaises(TypeError, offsets.__setitem__, 123, 0)
+        offsets["read1"] = 7
+        self.assertEqual(7, offsets["read1"])
+        self.assertEqual(len(keys), len(offsets))
+
+    def test_non_string_keys(self):
+        def make_tuple(identifier):
+            parts = identifier.split("_")
+            return int(parts[-2]), int(parts[-1])
+        self.assertRaises(TypeError, SeqIO.index, "Quality/example.fastq",
+                          "fastq", key_function=make_tuple, compact=True)
+
+    def test_duplicates(self):
+        self.assertRaises(ValueError, SeqIO.index, "Fasta/dups.fasta",
+                          "fasta", compact=True)
+
+
+class LazySequenceTests(unittest.TestCase):
+    """Bio.SeqIO.index(...) loading GenBank/EMBL sequences on demand."""
+    def check(self, filename, format, alphabet=None):
+        expected = SeqIO.index(filename, format, alphabet)
+        records = SeqIO.index(filename, format, alphabet, lazy=True)
+        self.assertEqual(sorted(expected), sorted(records))
+        for key in records:
+            record = records[key]
+            old = expected[key]
+            self.assertEqual(len(old), len(record), key)
+            self.assertTrue(compare_record(old, record), key)
+            self.assertEqual(str(old.seq), str(record.seq), key)
+        expected.close()
+        records.close()
+
+    def test_genbank(self):
+        for name in ["NC_005816.gb", "NC_000932.gb", "cor6_6.gb",
+                     "iro.gb", "blank_seq.gb", "NC_000932.gb.bgz"]:
+            self.check("GenBank/" + name, "gb")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", BiopythonParserWarning)
+            self.check("GenBank/no_end_marker.gb", "gb")
+
+    def test_embl(self):
+        for name in ["TRBG361.embl", "U87107.embl", "SC10H5.embl",
+                     "AAA03323.embl", "AE017046.embl"]:
+            self.check("EMBL/" + name, "embl")
+        self.check("EMBL/patents.embl", "embl", generic_protein)
+        self.check("EMBL/A04195.imgt", "imgt")
+
+    def test_on_demand(self):
+        records = SeqIO.index("GenBank/NC_005816.gb", "gb", lazy=True)
+        record = records["NC_005816.1"]
+        self.assertEqual(9609, len(record.seq))
+        self.assertEqual(41, len(record.features))
+        self.assertTrue(record.seq._loaded is None)
+        self.assertEqual("TGTAACGAACGGTGCAATAG", str(record.seq[:20]))
+        self.assertEqual(9609, len(record.seq._loaded))
+        records.close()
+
+    def test_unsupported_format(self):
+        self.assertRaises(ValueError, SeqIO.index, "Fasta/f002", "fasta",
+                          lazy=True)
+
+
+if sqlite3:
+    class IndexCacheTests(unittest.TestCase):
+        """Bio.SeqIO.index(...) with an on disk cache of the offsets."""
+        def setUp(self):
+            self.temp_dir = tempfile.mkdtemp(prefix="biopython-test")
+            self.filename = os.path.join(self.temp_dir, "example.fasta")
+            self.cache = self.filename + ".idx"
+
+        def tearDown(self):
+            for name in os.listdir(self.temp_dir):
+                os.remove(os.path.join(self.temp_dir, name))
+            os.rmdir(self.temp_dir)
+
+        def write(self, records):
+            with open(self.filename, "w") as handle:
+                for name, seq in records:
+                    handle.write(">%s\n%s\n" % (name, seq))
+
+        def cached_offsets(self):
+            con = sqlite3.dbapi2.connect(self.cache)
+            offsets = con.execute("SELECT key, offset FROM offset_data;").fetchall()
+            con.close()
+            return offsets
+
+        def test_reuse(self):
+            """Reuse a cache, even with a different key function."""
+            self.write([("alpha", "ACGT"), ("beta", "GGCC")])
+            d = SeqIO.index(self.filename, "fasta", cache=True)
+            self.assertEqual(["alpha", "beta"], sorted(d))
+            d.close()
+            self.assertEqual([("alpha", 0), ("beta", 12)], self.cached_offsets())
+            # Tamper with the cache to prove it gets used
+            con = sqlite3.dbapi2.connect(self.cache)
+            con.execute("UPDATE offset_data SET key='gamma' WHERE key='beta';")
+            con.commit()
+            con.close()
+            d = SeqIO.index(self.filename, "fasta", cache=self.cache)
+            self.assertEqual(["alpha", "gamma"], sorted(d))
+            d.close()
+            d = SeqIO.index(self.filename, "fasta", cache=True,
+                            key_function=add_prefix)
+            self.assertEqual(["id_alpha", "id_gamma"], sorted(d))
+            d.close()
+
+        def test_stale(self):
+            """Rebuild the cache if the file changes."""
+            self.write([("alpha", "ACGT"), ("beta", "GGCC")])
+            d = SeqIO.index(self.filename, "fasta", cache=True)
+            d.close()
+            # Same size, and force the same modification time
+            mtime = os.path.getmtime(self.filename)
+            self.write([("alpha", "ACGT"), ("delta", "GC")])
+            os.utime(self.filename, (mtime, mtime))
+            d = SeqIO.index(self.filename, "fasta", cache=True)
+            self.assertEqual(["alpha", "delta"], sorted(d))
+            self.assertEqual("GC", str(d["delta"].seq))
+            d.close()
+            # Different size
+            self.write([("alpha", "ACGT"), ("delta", "GC"), ("pi", "T")])
+            d = SeqIO.index(self.filename, "fasta", cache=True)
+            self.assertEqual(["alpha", "delta", "pi"], sorted(d))
+            d.close()
+            self.assertEqual(3, len(self.cached_offsets()))
+
+        def test_not_an_index(self):
+            """Refuse to overwrite a file which is not an index cache."""
+            self.write([("alpha", "ACGT")])
+            with open(self.cache, "w") as handle:
+                handle.write("Something important\n")
+            self.assertRaises(ValueError, SeqIO.index, self.filename,
+                              "fasta", cache=True)
+            with open(self.cache) as handle:
+                self.assertEqual("Something important\n", handle.read())
+
+        def test_index_db_not_overwritten(self):
+            """Refuse to overwrite an index_db database."""
+            self.write([("alpha", "ACGT"), ("beta", "GGCC")])
+            db = SeqIO.index_db(self.cache, self.filename, "fasta")
+            db.close()
+            self.assertRaises(ValueError, SeqIO.index, self.filename,
+                              "fasta", cache=True)
+            self.assertRaises(ValueError, SeqIO.index, self.filename,
+                              "fastq", cache=self.cache)
+            con = sqlite3.dbapi2.connect(self.cache)
+            count = con.execute("SELECT COUNT(*) FROM offset_data;").fetchone()
+            self.assertEqual(2, count[0])
+            self.assertEqual(1, len(con.execute("SELECT * FROM file_data;")
+                                    .fetchall()))
+            con.close()
+            db = SeqIO.index_db(self.cache)
+            self.assertEqual(["alpha", "beta"], sorted(db))
+            db.close()
+
+        def test_bad_cache_arg(self):
+            self.write([("alpha", "ACGT")])
+            self.assertRaises(TypeError, SeqIO.index, self.filename,
+                              "fasta", cache=1.5)
+
+
 tests = [
     ("Ace/contig1.ace", "ace", generic_dna),
     ("Ace/consed_sample.ace", "ace", None),
@@ -0,0 +1,99 @@
+# Copyright 2016 by Peter Cock.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Unit tests for Bio.SeqIO.parse(...) in lightweight mode."""
+
+import unittest
+
+from Bio import SeqIO
+from Bio.Seq import UnknownSeq
+from Bio.SeqIO import _lightweight
+
+
+class LightweightTests(unittest.TestCase):
+
+    def check(self, filename, format):
+        """Check lightweight parsing matches the full parser."""
+        expected = list(SeqIO.parse(filename, format))
+        records = list(SeqIO.parse(filename, format, lightweight=True))
+        self.assertEqual(len(expected), len(records), filename)
+        for old, new in zip(expected, records):
+            self.assertTrue(isinstance(new, _lightweight.SimpleRecord))
+            self.assertEqual(old.id, new.id, filename)
+            self.assertEqual(old.description, new.description, filename)
+            if isinstance(old.seq, UnknownSeq):
+                self.assertTrue(new.seq is None or new.seq == str(old.seq),
+                                filename)
+            else:
+                self.assertEqual(str(old.seq), new.seq, filename)
+            qualities = old.letter_annotations.get(
+                "phred_quality", old.letter_annotations.get("solexa_quality"))
+            self.assertEqual(qualities, new.qualities, filename)
+
+    def test_fasta(self):
+        self.check("Fasta/f002", "fasta")
+        self.check("Fasta/aster.pro", "fasta")
+        self.check("Fasta/fa01", "fasta")
+
+    def test_fastq(self):
+        self.check("Quality/example.fastq", "fastq")
+        self.check("Quality/tricky.fastq", "fastq")
+        self.check("Quality/zero_length.fastq", "fastq")
+        self.check("Quality/solexa_faked.fastq", "fastq-solexa")
+        self.check("Quality/illumina_faked.fastq", "fastq-illumina")
+
+    def test_tab(self):
+        self.check("GenBank/NC_005816.tsv", "tab")
+
+    def test_genbank(self):
+        for name in ["cor6_6.gb", "NC_005816.gb", "iro.gb", "no_end_marker.gb",
+                     "blank_seq.gb", "dbsource_wrap.gb", "gbvrl1_start.seq",
+                     "DS830848.gb", "NT_019265.gb"]:
+            self.check("GenBank/" + name, "gb")
+
+    def test_embl(self):
+        for name in ["TRBG361.embl", "DD231055_edited.embl", "SC10H5.embl",
+                     "U87107.embl", "AAA03323.embl", "AE017046.embl",
+                     "Human_contigs.embl", "location_wrap.embl",
+                     "epo_prt_selection.embl", "patents.embl"]:
+            self.check("EMBL/" + name, "embl")
+        self.check("EMBL/A04195.imgt", "imgt")
+
+    def test_swiss(self):
+        self.check("SwissProt/sp001", "swiss")
+        self.check("SwissProt/multi_ex.txt", "swiss")
+
+    def test_stockholm(self):
+        self.check("Stockholm/simple.sth", "stockholm")
+        self.check("Stockholm/funny.sth", "stockholm")
+
+    def test_sff(self):
+        for name in ["E3MFGYR02_random_10_reads.sff",
+                     "E3MFGYR02_index_in_middle.sff",
+                     "E3MFGYR02_alt_index_at_start.sff",
+                     "E3MFGYR02_no_manifest.sff"]:
+            self.check("Roche/" + name, "sff")
+            self.check("Roche/" + name, "sff-trim")
+
+    def test_abi(self):
+        for name in ["310.ab1", "3100.ab1", "3730.ab1"]:
+            self.check("Abi/" + name, "abi")
+
+    def test_fallback(self):
+        """Formats without a dedicated parser use the full parser."""
+        self.check("Quality/example.qual", "qual")
+        self.check("Clustalw/opuntia.aln", "clustal")
+
+    def test_parallel(self):
+        expected = list(SeqIO.parse("Quality/tricky.fastq", "fastq",
+                                    lightweight=True))
+        records = list(SeqIO.parse("Quality/tricky.fastq", "fastq",
+                                   workers=2, lightweight=True))
+        self.assertEqual(expected, records)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
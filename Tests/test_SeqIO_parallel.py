@@ -0,0 +1,100 @@
+# Copyright 2016 by Peter Cock.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Unit tests for Bio.SeqIO.parse(...) with multiple worker processes."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from Bio import SeqIO
+from Bio import bgzf
+from Bio.SeqIO import _parallel
+from Bio.Alphabet import generic_dna
+
+from seq_tests_common import compare_record
+
+
+class ParallelParseTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="biopython-test")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def check_chunks(self, filename, format, alphabet=None, original=None):
+        """Check parsing in small chunks matches a simple parse."""
+        expected = list(SeqIO.parse(original or filename, format, alphabet))
+        for chunk_size in [1, 7, 50, 333, 1000000]:
+            records = []
+            for offset, length in _parallel._chunk_offsets(filename, chunk_size):
+                records.extend(_parallel._parse_chunk(filename, format, alphabet,
+                                                      offset, length))
+            self.assertEqual(len(expected), len(records),
+                             "Chunk size %i" % chunk_size)
+            for old, new in zip(expected, records):
+                self.assertTrue(compare_record(old, new))
+
+    def test_fasta(self):
+        self.check_chunks("Fasta/f002", "fasta")
+        self.check_chunks("GenBank/NC_005816.ffn", "fasta", generic_dna)
+
+    def test_fastq(self):
+        self.check_chunks("Quality/example.fastq", "fastq")
+        self.check_chunks("Quality/example_dos.fastq", "fastq")
+        self.check_chunks("Quality/tricky.fastq", "fastq")
+        self.check_chunks("Quality/zero_length.fastq", "fastq")
+        self.check_chunks("Quality/wrapping_original_sanger.fastq", "fastq")
+        self.check_chunks("Quality/solexa_faked.fastq", "fastq-solexa")
+        self.check_chunks("Quality/illumina_faked.fastq", "fastq-illumina")
+
+    def test_bgzf(self):
+        """Chunks of a BGZF file are runs of whole blocks."""
+        filename = os.path.join(self.temp_dir, "wrapping.fastq.bgz")
+        with open("Quality/wrapping_original_sanger.fastq", "rb") as handle:
+            data = handle.read()
+        # Write tiny blocks to get lots of chunks
+        writer = bgzf.BgzfWriter(filename, "wb")
+        for i in range(0, len(data), 30):
+            writer.write(data[i:i + 30])
+            writer.flush()
+        writer.close()
+        chunks = _parallel._chunk_offsets(filename, 100)
+        self.assertTrue(len(chunks) > 5)
+        for offset, length in chunks:
+            self.assertEqual(0, bgzf.split_virtual_offset(offset)[1])
+        self.check_chunks(filename, "fastq",
+                          original="Quality/wrapping_original_sanger.fastq")
+
+    def test_workers(self):
+        for filename, format in [("Quality/tricky.fastq", "fastq"),
+                                 ("Fasta/f002", "fasta")]:
+            expected = list(SeqIO.parse(filename, format))
+            old_size = _parallel._CHUNK_SIZE
+            try:
+                _parallel._CHUNK_SIZE = 100
+                records = list(SeqIO.parse(filename, format, workers=3))
+            finally:
+                _parallel._CHUNK_SIZE = old_size
+            self.assertEqual(len(expected), len(records))
+            for old, new in zip(expected, records):
+                self.assertTrue(compare_record(old, new))
+
+    def test_bad_args(self):
+        with open("Quality/example.fastq") as handle:
+            self.assertRaises(TypeError, list,
+                              SeqIO.parse(handle, "fastq", workers=2))
+        self.assertRaises(ValueError, list,
+                          SeqIO.parse("GenBank/cor6_6.gb", "gb", workers=2))
+        self.assertRaises(ValueError, list,
+                          SeqIO.parse("Quality/example.fastq", "fastq",
+                                      workers=0))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -18,12 +18,14 @@ if sys.version_info < (2, 7):
         raise MissingPythonDependencyError("Under Python 2.6 this test needs the unittest2 library")
 else:
     import unittest
+import pickle
 
 from Bio import SeqIO
 from Bio.Alphabet import generic_dna, generic_protein
 from Bio.Seq import Seq, MutableSeq
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqFeature import SeqFeature, FeatureLocation, ExactPosition
+from Bio.SeqFeature import CompoundLocation
 from Bio.SeqFeature import WithinPosition, BeforePosition, AfterPosition, OneOfPosition
 
 
@@ -369,6 +371,119 @@ Seq('ABCDEFGHIJKLMNOPQRSTUVWZYX', ProteinAlphabet())"""
         self.assertRaises(NotImplementedError, ge)
 
 
+class FeaturesInTests(unittest.TestCase):
+    """Test the SeqRecord features_in method."""
+
+    def brute_force(self, record, start, end, strand=None, type=None):
+        answer = []
+        for f in record.features:
+            if type is not None and f.type != type:
+                continue
+            for part in f.location.parts:
+                if strand is not None and part.strand != strand:
+                    continue
+                if part.start < end and start < part.end:
+                    answer.append(f)
+                    break
+        return answer
+
+    def test_genbank(self):
+        record = SeqIO.read("GenBank/NC_005816.gb", "gb")
+        length = len(record)
+        for start in range(0, length, 250):
+            for end in [start, start + 1, start + 500, start + 5000]:
+                self.assertEqual(self.brute_force(record, start, end),
+                                 record.features_in(start, end))
+                for strand in [+1, -1]:
+                    self.assertEqual(
+                        self.brute_force(record, start, end, strand),
+                        record.features_in(start, end, strand))
+                self.assertEqual(
+                    self.brute_force(record, start, end, type="CDS"),
+                    record.features_in(start, end, type="CDS"))
+
+    def test_compound(self):
+        record = SeqRecord(Seq("ACGT" * 25))
+        f1 = SeqFeature(CompoundLocation([FeatureLocation(10, 20, +1),
+                                          FeatureLocation(50, 60, +1)]),
+                        type="CDS")
+        f2 = SeqFeature(FeatureLocation(5, 95, -1), type="gene")
+        f3 = SeqFeature(FeatureLocation(15, 18, -1), type="misc_feature")
+        record.features = [f1, f2, f3]
+        self.assertEqual([f1, f2, f3], record.features_in(16, 17))
+        self.assertEqual([f2], record.features_in(30, 40))
+        self.assertEqual([f1, f2], record.features_in(55, 70))
+        self.assertEqual([], record.features_in(60, 70, +1))
+        self.assertEqual([], record.features_in(0, 5))
+        self.assertEqual([], record.features_in(95, 100))
+        self.assertEqual([f2, f3], record.features_in(0, 100, strand=-1))
+        self.assertEqual([f3], record.features_in(0, 100, type="misc_feature"))
+
+    def test_modified(self):
+        record = SeqRecord(Seq("ACGT" * 25))
+        f1 = SeqFeature(FeatureLocation(10, 20, +1), type="gene")
+        record.features.append(f1)
+        self.assertEqual([f1], record.features_in(0, 50))
+        f2 = SeqFeature(FeatureLocation(30, 40, +1), type="gene")
+        record.features.append(f2)
+        self.assertEqual([f1, f2], record.features_in(0, 50))
+        f1.location = FeatureLocation(60, 70, +1)
+        self.assertEqual([f2], record.features_in(0, 50))
+        f1.strand = -1
+        self.assertEqual([f1], record.features_in(0, 100, strand=-1))
+        record.features[1] = f1
+        self.assertEqual([], record.features_in(0, 50))
+        record.features.pop()
+        record.features.append(f2)
+        self.assertEqual([f2], record.features_in(0, 50))
+        record.features[:] = [f2, f1]
+        self.assertEqual([f2, f1], record.features_in(0, 100))
+        record.features.sort(key=lambda f: f.location.start)
+        self.assertEqual([f2, f1], record.features_in(0, 100))
+        record.features.reverse()
+        self.assertEqual([f1, f2], record.features_in(0, 100))
+        del record.features[0]
+        self.assertEqual([f2], record.features_in(0, 100))
+        record.features += [f1]
+        self.assertEqual([f2, f1], record.features_in(0, 100))
+        record.features = [f1]
+        self.assertEqual([f1], record.features_in(0, 100))
+        record.features = []
+        self.assertEqual([], record.features_in(0, 100))
+
+    def test_shared_feature(self):
+        f1 = SeqFeature(FeatureLocation(10, 20, +1), type="gene")
+        f2 = SeqFeature(FeatureLocation(30, 40, +1), type="gene")
+        record1 = SeqRecord(Seq("ACGT" * 25), features=[f1, f2])
+        record2 = SeqRecord(Seq("ACGT" * 25), features=[f2])
+        self.assertEqual([f1, f2], record1.features_in(0, 50))
+        self.assertEqual([f2], record2.features_in(0, 50))
+        f2.location = FeatureLocation(60, 70, +1)
+        self.assertEqual([f1], record1.features_in(0, 50))
+        self.assertEqual([], record2.features_in(0, 50))
+        self.assertEqual([f2], record2.features_in(50, 100))
+
+    def test_pickle(self):
+        record = SeqRecord(Seq("ACGT" * 25))
+        record.features.append(SeqFeature(FeatureLocation(10, 20, +1)))
+        self.assertEqual(1, len(record.features_in(0, 50)))
+        new = pickle.loads(pickle.dumps(record))
+        self.assertEqual(list, type(pickle.loads(pickle.dumps(new.features))))
+        self.assertEqual(1, len(new.features_in(0, 50)))
+        new.features[0].location = FeatureLocation(60, 70)
+        self.assertEqual(0, len(new.features_in(0, 50)))
+        self.assertEqual(1, len(record.features_in(0, 50)))
+        # As pickled by older versions, with a plain list of features
+        state = new.__getstate__()
+        self.assertTrue(isinstance(state["features"], list))
+        self.assertFalse("_feature_index" in state)
+        self.assertEqual(FeatureLocation(60, 70).start,
+                         state["features"][0].__getstate__()["location"].start)
+        old = SeqRecord.__new__(SeqRecord)
+        old.__setstate__(state)
+        self.assertEqual(1, len(old.features_in(50, 100)))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -11,6 +11,7 @@ See also the doctests in bgzf.py which are called via run_tests.py
 import unittest
 import gzip
 import os
+import struct
 from random import shuffle
 
 from Bio._py3k import _as_bytes, _as_string
@@ -51,6 +52,8 @@ class BgzfTests(unittest.TestCase):
     def tearDown(self):
         if os.path.isfile(self.temp_file):
             os.remove(self.temp_file)
+        if os.path.isfile(self.temp_file + ".gzi"):
+            os.remove(self.temp_file + ".gzi")
 
     def rewrite(self, compressed_input_file, output_file):
         h = gzip.open(compressed_input_file, "rb")
@@ -129,8 +132,9 @@ class BgzfTests(unittest.TestCase):
                 old = _as_string(old)
             h.close()
 
-            for cache in [1, 10]:
-                h = bgzf.BgzfReader(new_file, mode, max_cache=cache)
+            for cache, threads in [(1, None), (10, None), (1, 3)]:
+                h = bgzf.BgzfReader(new_file, mode, max_cache=cache,
+                                    threads=threads)
                 if "b" in mode:
                     new = _empty_bytes_string.join(line for line in h)
                 else:
@@ -178,6 +182,35 @@ class BgzfTests(unittest.TestCase):
                                  "%r vs %r, mode %r" % (old[:10], new[:10], mode))
                 self.assertEqual(old, new)
 
+    def check_threads(self, filename):
+        """Check reading with threads matches reading without"""
+        for mode in ["r", "rb"]:
+            with bgzf.BgzfReader(filename, mode) as h:
+                expected = []
+                while True:
+                    line = h.readline()
+                    expected.append((h.tell(), line))
+                    if not line:
+                        break
+            with bgzf.BgzfReader(filename, mode, threads=3) as h:
+                lines = []
+                while True:
+                    line = h.readline()
+                    lines.append((h.tell(), line))
+                    if not line:
+                        break
+                self.assertEqual(expected, lines)
+                # Now jump around, forcing the read ahead to restart
+                following = dict((offset, next_line) for (offset, line),
+                                 (next_offset, next_line)
+                                 in zip(expected, expected[1:]))
+                offsets = list(following)
+                shuffle(offsets)
+                for offset in offsets[:50]:
+                    h.seek(offset)
+                    self.assertEqual(offset, h.tell())
+                    self.assertEqual(following[offset], h.readline())
+
     def check_random(self, filename):
         """Check BGZF random access by reading blocks in forward & reverse order"""
         h = gzip.open(filename, "rb")
@@ -321,6 +354,67 @@ class BgzfTests(unittest.TestCase):
         self.check_by_line("GenBank/NC_000932.gb", "GenBank/NC_000932.gb.bgz")
         self.check_by_char("GenBank/NC_000932.gb", "GenBank/NC_000932.gb.bgz")
 
+    def test_threads(self):
+        """Check reading with threads"""
+        self.check_threads("GenBank/NC_000932.gb.bgz")
+        self.check_threads("Quality/example.fastq.bgz")
+        self.check_threads("SamBam/ex1.bam")
+
+    def check_seek_uncompressed(self, filename):
+        h = gzip.open(filename, "rb")
+        data = h.read()
+        h.close()
+        offsets = list(range(0, len(data), 997)) + [len(data)]
+        shuffle(offsets)
+        with bgzf.BgzfReader(filename, "rb") as h:
+            for offset in offsets:
+                v_offset = h.seek_uncompressed(offset)
+                self.assertEqual(v_offset, h.tell())
+                self.assertEqual(data[offset:offset + 50], h.read(50))
+            self.assertRaises(ValueError, h.seek_uncompressed, len(data) + 1)
+            self.assertRaises(ValueError, h.seek_uncompressed, -1)
+
+    def test_gzi(self):
+        """Check writing and reading a .gzi index"""
+        with open("GenBank/NC_000932.gb.bgz", "rb") as h:
+            data = h.read()
+            h.seek(0)
+            blocks = [(raw_start, data_start) for raw_start, raw_len,
+                      data_start, data_len in bgzf.BgzfBlocks(h)]
+        with open(self.temp_file, "wb") as h:
+            h.write(data)
+        entries = bgzf.write_gzi(self.temp_file)
+        self.assertEqual(blocks, entries)
+        self.assertEqual(blocks, bgzf.read_gzi(self.temp_file + ".gzi"))
+        # One entry per block except the first, see samtools bgzip -i
+        with open(self.temp_file + ".gzi", "rb") as h:
+            self.assertEqual(8 + 16 * (len(blocks) - 1), len(h.read()))
+        self.check_seek_uncompressed(self.temp_file)
+
+    def test_gzi_bad_offsets(self):
+        """Check a .gzi index with bad block offsets is not hidden"""
+        with open("GenBank/NC_000932.gb.bgz", "rb") as h:
+            data = h.read()
+        with open(self.temp_file, "wb") as h:
+            h.write(data)
+        entries = bgzf.write_gzi(self.temp_file)
+        # Point the last block one byte into the real block
+        entries[-1] = (entries[-1][0] + 1, entries[-1][1])
+        with open(self.temp_file + ".gzi", "wb") as h:
+            h.write(struct.pack("<Q", len(entries) - 1))
+            for compressed, uncompressed in entries[1:]:
+                h.write(struct.pack("<QQ", compressed, uncompressed))
+        with bgzf.BgzfReader(self.temp_file, "rb") as h:
+            with self.assertRaises(ValueError) as cm:
+                h.seek_uncompressed(0)
+            self.assertTrue("should start with" in str(cm.exception))
+
+    def test_seek_uncompressed(self):
+        """Check seeking by uncompressed offset without a .gzi index"""
+        self.check_seek_uncompressed("GenBank/NC_000932.gb.bgz")
+        self.check_seek_uncompressed("Quality/example.fastq.bgz")
+        self.check_seek_uncompressed("SamBam/ex1.bam")
+
     def test_bam_ex1(self):
         """Reproduce BGZF compression for BAM file"""
         temp_file = self.temp_file
@@ -361,6 +455,27 @@ class BgzfTests(unittest.TestCase):
         self.rewrite("Blast/wnts.xml.bgz", temp_file)
         self.check_blocks("Blast/wnts.xml.bgz", temp_file)
 
+    def test_write_threads(self):
+        """Check BGZF writing with threads gives the same file"""
+        h = gzip.open("SamBam/ex1.bam", "rb")
+        data = h.read()
+        h.close()
+        results = []
+        for threads in [None, 3]:
+            offsets = []
+            with bgzf.BgzfWriter(self.temp_file, "wb", threads=threads) as h:
+                for i in range(0, len(data), 10000):
+                    h.write(data[i:i + 10000])
+                    if i % 70000 == 0:
+                        offsets.append(h.tell())
+                    if i % 150000 == 0:
+                        h.flush()
+            with open(self.temp_file, "rb") as h:
+                results.append((offsets, h.read()))
+        self.assertEqual(results[0], results[1])
+        with bgzf.BgzfReader(self.temp_file, "rb") as h:
+            self.assertEqual(data, h.read(len(data) + 1))
+
     def test_write_tell(self):
         """Check offset works during BGZF writing"""
         temp_file = self.temp_file
@@ -5,7 +5,9 @@
 # as part of this package.
 
 import unittest
+import warnings
 
+from Bio import BiopythonWarning
 from Bio import pairwise2
 
 
@@ -328,6 +330,29 @@ ATAT
   Score=3
 """)
 
+    def test_match_dictionary_matrix(self):
+        match_fn = pairwise2.dictionary_match(self.match_dict)
+        self.assertEqual(match_fn.alphabet, ["A", "T"])
+        self.assertEqual(match_fn.matrix, [[1.5, 0.5], [0.5, 1.0]])
+        self.assertEqual(match_fn.encode("TAT"), [1, 0, 1])
+        self.assertRaises(KeyError, match_fn.encode, "ATG")
+        match_fn = pairwise2.dictionary_match(self.match_dict, symmetric=0)
+        self.assertEqual(match_fn.matrix, None)
+        self.assertRaises(KeyError, pairwise2.align.localds,
+                          "ATGT", "ATT", self.match_dict, -1, 0)
+
+    def test_match_dictionary_blosum62(self):
+        from Bio.SubsMat import MatrixInfo
+        for function in (pairwise2.align.globalds, pairwise2.align.localds):
+            alignments = function("KEVLAWRT", "EVLTWRAT", MatrixInfo.blosum62,
+                                  -10, -1)
+            generic = function("KEVLAWRT", "EVLTWRAT", MatrixInfo.blosum62,
+                               -10, -1, force_generic=True)
+            self.assertEqual(alignments, generic)
+            score = function("KEVLAWRT", "EVLTWRAT", MatrixInfo.blosum62,
+                             -10, -1, score_only=True)
+            self.assertEqual(score, alignments[0][2])
+
 
 class TestPairwiseOneCharacter(unittest.TestCase):
 
@@ -427,6 +452,159 @@ AAAABBBAAAACCCCCCCCCCCCCCAAAABBBAAAA
 """)
 
 
+class TestPairwiseLinearSpace(unittest.TestCase):
+    """Check the score_only and linear_space modes use less memory correctly."""
+
+    seq1 = "GAACTTGACCGTAACGGTAACCAGTTGAACT"
+    seq2 = "GAATTGACCGTAAGGTAACCCAGTTAACT"
+
+    def test_score_only(self):
+        for function in (pairwise2.align.globalms, pairwise2.align.localms):
+            for args in [(1, 0, 0, 0), (2, -1, -0.5, -0.1), (5, -4, -10, -1)]:
+                alignments = function(self.seq1, self.seq2, *args)
+                score = function(self.seq1, self.seq2, *args, score_only=True)
+                self.assertAlmostEqual(score, alignments[0][2])
+                score = function(self.seq1, self.seq2, *args, score_only=True,
+                                 penalize_end_gaps=(True, False))
+                alignments = function(self.seq1, self.seq2, *args,
+                                      penalize_end_gaps=(True, False))
+                self.assertAlmostEqual(score, alignments[0][2])
+
+    def test_linear_space_global(self):
+        alignments = pairwise2.align.globalms(self.seq1, self.seq2,
+                                              2, -1, -3, -1)
+        linear = pairwise2.align.globalms(self.seq1, self.seq2,
+                                          2, -1, -3, -1,
+                                          one_alignment_only=True,
+                                          linear_space=True)
+        self.assertEqual(len(linear), 1)
+        self.assertEqual(linear[0], alignments[0])
+        alignments = pairwise2.align.globalxx("GAACT", "GAT")
+        linear = pairwise2.align.globalxx("GAACT", "GAT",
+                                          one_alignment_only=True,
+                                          linear_space=True)
+        self.assertTrue(linear[0] in alignments)
+
+    def test_linear_space_local(self):
+        alignments = pairwise2.align.localxs("AxBx", "zABz", -0.1, 0)
+        linear = pairwise2.align.localxs("AxBx", "zABz", -0.1, 0,
+                                         one_alignment_only=True,
+                                         linear_space=True)
+        self.assertEqual(len(linear), 1)
+        self.assertTrue(linear[0] in alignments)
+        alignments = pairwise2.align.localms(self.seq1, "TTTACCGTAAGGTAAT",
+                                             5, -4, -10, -1)
+        linear = pairwise2.align.localms(self.seq1, "TTTACCGTAAGGTAAT",
+                                         5, -4, -10, -1,
+                                         one_alignment_only=True,
+                                         linear_space=True)
+        self.assertTrue(linear[0] in alignments)
+
+    def test_linear_space_errors(self):
+        self.assertRaises(ValueError, pairwise2.align.globalxx,
+                          "GAACT", "GAT", linear_space=True)
+        gap = lambda x, y: -2 - y
+        self.assertRaises(ValueError, pairwise2.align.globalxc,
+                          "GAACT", "GAT", gap, gap,
+                          one_alignment_only=True, linear_space=True)
+
+
+class TestPairwiseBand(unittest.TestCase):
+    """Check the banded alignments against the full dynamic programming."""
+
+    seq1 = "GAACTTGACCGTAACGGTAACCAGTTGAACT"
+    seq2 = "GAATTGACCGTAAGGTAACCCAGTTAACT"
+
+    def test_band_wide(self):
+        for function in (pairwise2.align.globalms, pairwise2.align.localms):
+            alignments = function(self.seq1, self.seq2, 2, -1, -3, -1)
+            banded = function(self.seq1, self.seq2, 2, -1, -3, -1,
+                              band=len(self.seq1))
+            self.assertEqual(banded, alignments)
+            score = function(self.seq1, self.seq2, 2, -1, -3, -1,
+                             score_only=True, band=len(self.seq1))
+            self.assertAlmostEqual(score, alignments[0][2])
+
+    def test_band_narrow(self):
+        alignments = pairwise2.align.globalms(self.seq1, self.seq2,
+                                              2, -1, -3, -1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", BiopythonWarning)
+            banded = pairwise2.align.globalms(self.seq1, self.seq2,
+                                              2, -1, -3, -1, band=5)
+        self.assertEqual(banded[0][2], alignments[0][2])
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always", BiopythonWarning)
+            banded = pairwise2.align.globalms("GAACTTGACCGT", "CGTGAACTTGAC",
+                                              2, -1, -3, -1, band=1)
+            self.assertEqual(len(w), 1)
+            self.assertTrue(issubclass(w[0].category, BiopythonWarning))
+
+    def test_band_divergent(self):
+        # One substitution in ten, with a band wide enough for no warning
+        seq1 = "TTAGTTGTGCCGCAGCGAAGTAGTGCTTGAAATATGCGACCCCTAAGTAGGAGCGTATGC"
+        seq2 = "TTCGTTGTGCCTGAGCGATGTAGTGCTTGAAATATGCGACCCCTAAGTAGGACCGTATAC"
+        alignments = pairwise2.align.globalms(seq1, seq2, 2, -1, -3, -1)
+        match_fn = lambda x, y: 2 if x == y else -1
+        gap = pairwise2.affine_penalty(-3, -1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", BiopythonWarning)
+            banded = pairwise2.align.globalms(seq1, seq2, 2, -1, -3, -1,
+                                              band=4)
+            self.assertEqual(banded, alignments)
+            # The best match score of a callback is found from the residues
+            banded = pairwise2.align.globalcc(seq1, seq2, match_fn, gap, gap,
+                                              band=4)
+            self.assertEqual(banded, alignments)
+
+    def test_band_errors(self):
+        self.assertRaises(ValueError, pairwise2.align.globalxx,
+                          "GAACT", "GAT", band=-1)
+        self.assertRaises(ValueError, pairwise2.align.globalxx,
+                          "GAACT", "GAT", band=2,
+                          one_alignment_only=True, linear_space=True)
+        gap = lambda x, y: -2 - y
+        self.assertRaises(ValueError, pairwise2.align.globalxc,
+                          "GAACT", "GAT", gap, gap, band=2)
+
+
+class TestPairwiseAlignMany(unittest.TestCase):
+    """Check align_many gives the same results as separate alignments."""
+
+    queries = ["GAACTTGACCGT", "TTGACCGTAACGG", "A"]
+    targets = ["GAATTGACCGTAA", "CGTAAGGTAACCC"]
+
+    def test_align_many_score_only(self):
+        expected = [(i, j, pairwise2.align.globalms(q, t, 2, -1, -3, -1,
+                                                    score_only=True))
+                    for i, q in enumerate(self.queries)
+                    for j, t in enumerate(self.targets)]
+        for workers in (1, 2):
+            results = list(pairwise2.align_many(self.queries, self.targets,
+                                                "globalms", 2, -1, -3, -1,
+                                                score_only=True,
+                                                workers=workers))
+            self.assertEqual(results, expected)
+
+    def test_align_many_alignments(self):
+        results = list(pairwise2.align_many(self.queries, self.targets,
+                                            "localxx", workers=2))
+        self.assertEqual(len(results), 6)
+        for i, j, score, alignments in results:
+            expected = pairwise2.align.localxx(self.queries[i],
+                                               self.targets[j])
+            self.assertEqual(alignments, expected)
+            self.assertEqual(score, expected[0][2])
+
+    def test_align_many_errors(self):
+        self.assertRaises(ValueError, list,
+                          pairwise2.align_many(self.queries, self.targets,
+                                               "globalxx", workers=0))
+        self.assertRaises(TypeError, list,
+                          pairwise2.align_many(self.queries, self.targets,
+                                               "globalmx", 2))
+
+
 if __name__ == '__main__':
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
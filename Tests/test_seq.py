@@ -5,7 +5,9 @@
 from __future__ import print_function
 import array
 import copy
+import mmap
 import sys
+import tempfile
 import warnings
 
 # Remove unittest2 import after dropping support for Python2.6
@@ -18,8 +20,10 @@ if sys.version_info < (2, 7):
 else:
     import unittest
 
+from Bio._py3k import _as_bytes
 from Bio import Alphabet
 from Bio import Seq
+from Bio.Data import CodonTable
 from Bio.Alphabet import IUPAC, Gapped
 from Bio.Data.IUPACData import ambiguous_dna_complement, ambiguous_rna_complement
 from Bio.Data.IUPACData import ambiguous_dna_values, ambiguous_rna_values
@@ -426,6 +430,86 @@ class TestSeqAddition(unittest.TestCase):
                 self.assertEqual(str(c), str(a) + str(b))
 
 
+class TestBufferSeq(unittest.TestCase):
+    def setUp(self):
+        self.data = "GATCRYWSMKHBVDN-acgtnTAGGCCATTGTAATGGGCCGCTGAAAGGGTGCCCGATAG"
+        self.temp_file = tempfile.TemporaryFile()
+        self.temp_file.write(_as_bytes(self.data))
+        self.temp_file.flush()
+        self.mmap = mmap.mmap(self.temp_file.fileno(), 0,
+                              access=mmap.ACCESS_READ)
+
+    def tearDown(self):
+        self.mmap.close()
+        self.temp_file.close()
+
+    def buffers(self):
+        data = _as_bytes(self.data)
+        return [data, bytearray(data), memoryview(data), self.mmap]
+
+    def check(self, seq, expected):
+        self.assertEqual(str(expected), str(seq))
+        self.assertEqual(len(expected), len(seq))
+        self.assertEqual(repr(expected).replace("Seq(", "BufferSeq(", 1),
+                         repr(seq))
+        for sub in ["A", "TA", "GCC", "", "Z", Seq.Seq("AT")]:
+            for start, end in [(0, sys.maxsize), (3, 30), (-20, -2),
+                               (10, 5), (70, 80)]:
+                self.assertEqual(expected.count(sub, start, end),
+                                 seq.count(sub, start, end))
+                self.assertEqual(expected.find(sub, start, end),
+                                 seq.find(sub, start, end))
+                self.assertEqual(expected.rfind(sub, start, end),
+                                 seq.rfind(sub, start, end))
+            self.assertEqual(sub in expected, sub in seq)
+        for index in [0, 5, -1, -len(expected)]:
+            self.assertEqual(expected[index], seq[index])
+        self.assertRaises(IndexError, seq.__getitem__, len(expected))
+        for index in [slice(5, 20), slice(None, None, -1), slice(3, 30, 4),
+                      slice(40, 2, -3), slice(20, 5), slice(-10, None)]:
+            self.assertEqual(str(expected[index]), str(seq[index]))
+        self.assertEqual(str(expected.complement()), str(seq.complement()))
+        self.assertEqual(str(expected.reverse_complement()),
+                         str(seq.reverse_complement()))
+        self.assertEqual(expected, seq)
+        self.assertEqual(str(expected + "ACGT"), str(seq + "ACGT"))
+        self.assertEqual(str("ACGT" + expected), str("ACGT" + seq))
+
+    def test_buffers(self):
+        for data in self.buffers():
+            seq = Seq.BufferSeq(data, Alphabet.generic_dna)
+            expected = Seq.Seq(self.data, Alphabet.generic_dna)
+            self.check(seq, expected)
+            # Slices share the buffer
+            self.assertTrue(seq[10:50]._buffer is data)
+            self.assertTrue(seq[10:50][5:20]._buffer is data)
+            self.check(seq[10:50], expected[10:50])
+            self.check(seq[10:50][5:20], expected[10:50][5:20])
+            self.check(seq[20:], expected[20:])
+
+    def test_translate(self):
+        seq = Seq.BufferSeq(self.mmap)[21:]
+        expected = Seq.Seq(self.data)[21:]
+        self.assertEqual(str(expected.translate()), str(seq.translate()))
+        self.assertEqual(str(expected.translate(to_stop=True)),
+                         str(seq.translate(to_stop=True)))
+
+    def test_alphabets(self):
+        seq = Seq.BufferSeq(b"ACGU", Alphabet.generic_rna)
+        self.assertEqual("ACGU", str(seq.reverse_complement()))
+        self.assertEqual("ACGU", str(Seq.BufferSeq(b"ACGU").reverse_complement()))
+        self.assertRaises(ValueError, Seq.BufferSeq(b"ACGUT").complement)
+        self.assertRaises(ValueError,
+                          Seq.BufferSeq(b"MKL", IUPAC.protein).complement)
+        self.assertRaises(TypeError, seq.find,
+                          Seq.Seq("ACG", Alphabet.generic_dna))
+
+    def test_bad_data(self):
+        self.assertRaises(TypeError, Seq.BufferSeq, Seq.Seq("ACGT"))
+        if sys.version_info[0] == 3:
+            self.assertRaises(TypeError, Seq.BufferSeq, "ACGT")
+
+
 class TestMutableSeq(unittest.TestCase):
     def setUp(self):
         self.s = Seq.Seq("TCAAAAGGATGCATCATG", IUPAC.unambiguous_dna)
@@ -806,6 +890,20 @@ class TestReverseComplement(unittest.TestCase):
         seq = "ATGAAACTG"
         self.assertEqual("CAGTTTCAT", Seq.reverse_complement(seq))
 
+    def test_reverse_complement_many(self):
+        seqs = ["ATGAAACTG", "AUGAAACUG", "acgtRYKMN-", "", "gauuaca"]
+        expected = [Seq.reverse_complement(s) for s in seqs]
+        self.assertEqual(expected, Seq.reverse_complement_many(seqs))
+        self.assertEqual([_as_bytes(s) for s in expected],
+                         Seq.reverse_complement_many(_as_bytes(s) for s in seqs))
+        seq = Seq.Seq("ATGAAACTG", IUPAC.unambiguous_dna)
+        self.assertEqual(repr(seq.reverse_complement()),
+                         repr(Seq.reverse_complement_many([seq])[0]))
+        self.assertRaises(ValueError, Seq.reverse_complement_many,
+                          ["ACGT", "AUGAAACTG"])
+        self.assertRaises(ValueError, Seq.reverse_complement_many,
+                          [b"AUGAAACTG"])
+
     def test_reverse_complement_on_proteins(self):
         """Test reverse complement shouldn't work on a protein!"""
         for s in protein_seqs:
@@ -1039,6 +1137,51 @@ class TestTranslating(unittest.TestCase):
         self.assertEqual("HasStopCodon(Gapped(ExtendedIUPACProtein(), '-'), '@')",
                          repr(seq.translate(gap="-", stop_symbol="@").alphabet))
 
+    def test_translation_of_all_codons(self):
+        """Test translating whole sequences matches codon by codon"""
+        for table in [CodonTable.unambiguous_dna_by_id[1],
+                      CodonTable.ambiguous_dna_by_id[2],
+                      CodonTable.ambiguous_rna_by_id[11],
+                      CodonTable.ambiguous_generic_by_id[1]]:
+            codons = sorted(Seq._codon_translator(table))
+            expected = []
+            for codon in codons:
+                try:
+                    expected.append(table.forward_table[codon])
+                except (KeyError, TranslationError):
+                    if codon in table.stop_codons:
+                        expected.append("@")
+                    else:
+                        expected.append("#")
+            expected = "".join(expected)
+            sequence = "".join(codons)
+            self.assertEqual(expected, Seq._translate_str(
+                sequence, table, stop_symbol="@", pos_stop="#"))
+            self.assertEqual(expected, Seq._translate_str(
+                sequence.lower(), table, stop_symbol="@", pos_stop="#"))
+            self.assertEqual(expected.split("@")[0].replace("#", "X"),
+                             Seq._translate_str(sequence, table, to_stop=True))
+
+    def test_translate_many(self):
+        seqs = ["GTGGCCATTGTAATGGGCCGCTGAAAGGGTGCCCGATAG", "AUGAAACUG",
+                "atgnnntan", "", "ATG---AAA"]
+        for table in ["Standard", 2, CodonTable.ambiguous_generic_by_id[11]]:
+            expected = [Seq.translate(s, table, gap="-") for s in seqs]
+            self.assertEqual(expected,
+                             Seq.translate_many(seqs, table, gap="-"))
+            self.assertEqual([_as_bytes(s) for s in expected],
+                             Seq.translate_many([_as_bytes(s) for s in seqs],
+                                                table, gap="-"))
+        self.assertEqual(["VAIVMGR", "MKL"],
+                         Seq.translate_many(seqs[:2], to_stop=True))
+        self.assertEqual(["MAIVMGRWKGAR"],
+                         Seq.translate_many(seqs[:1], table=2, cds=True))
+        seq = Seq.Seq("ATGAAACTG", IUPAC.unambiguous_dna)
+        self.assertEqual(repr(seq.translate()),
+                         repr(Seq.translate_many([seq])[0]))
+        self.assertRaises(TranslationError, Seq.translate_many, seqs)
+        self.assertRaises(ValueError, Seq.translate_many, seqs, table=None)
+
     def test_translation_wrong_type(self):
         """Test translation table cannot be CodonTable"""
         seq = Seq.Seq("ATCGTA")